@@ -0,0 +1,46 @@
+# Helpers for the artifact directories served memory-mapped by the API (interaction
+# matrix, top-K index, forecast cube). An artifact is built in a staging directory, which
+# then becomes a version directory next to the final path; the final path is a symlink
+# switched to the new version atomically, so API workers always find a complete
+# artifact and those still mapping the previous files keep reading intact data.
+import os
+import shutil
+import time
+
+_VERSION_INFIX = ".v"
+
+
+def staging_directory(final_dir):
+    """Creates an empty staging directory next to ``final_dir`` and returns its path."""
+    staging_dir = final_dir.rstrip("/") + ".staging"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    return staging_dir
+
+
+def swap_directory(staging_dir, final_dir):
+    """
+    Makes ``staging_dir`` the current version of ``final_dir``. The version it replaces is
+    kept until the next swap, for workers still loading it; older ones are deleted.
+    """
+    final_dir = final_dir.rstrip("/")
+    parent, name = os.path.split(os.path.abspath(final_dir))
+    version_dir = f"{final_dir}{_VERSION_INFIX}{time.time_ns()}"
+    os.rename(staging_dir, version_dir)
+
+    if os.path.isdir(final_dir) and not os.path.islink(final_dir):
+        # A directory written before artifacts were versioned: moved to a version of its
+        # own, which leaves the path missing once, until the link below is created
+        os.rename(final_dir, f"{final_dir}{_VERSION_INFIX}0")
+    current = os.path.realpath(final_dir) if os.path.islink(final_dir) else None
+
+    link = final_dir + ".link"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(version_dir), link)
+    os.replace(link, final_dir)
+
+    keep = {os.path.basename(version_dir), current and os.path.basename(current)}
+    for entry in os.listdir(parent):
+        if entry.startswith(name + _VERSION_INFIX) and entry not in keep:
+            shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
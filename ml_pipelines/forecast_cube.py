@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import pickle
+from datetime import datetime, timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from artifacts import staging_directory, swap_directory
+from forecast_features import FEATURE_COLUMNS, feature_matrix, future_dates
+from processed_data import open_processed_dataset
+
+# Files of a forecast cube directory, all read memory-mapped by the API
+# (hashiramart.domains.forecasting.cube). Bump FORMAT_VERSION on any change.
+FORMAT_VERSION = 1
+FORECAST_FILE = "forecast.npy"
+CATEGORY_FORECAST_FILE = "category_forecast.npy"
+GLOBAL_FORECAST_FILE = "global_forecast.npy"
+PRODUCT_CATEGORIES_FILE = "product_categories.npy"
+PRODUCT_IDS_FILE = "product_ids.arrow"
+CATEGORY_IDS_FILE = "category_ids.arrow"
+META_FILE = "meta.json"
+
+
+def _write_dictionary(path, name, dictionary):
+    table = pa.table({name: dictionary})
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def read_products(input_path):
+    """
+    Reads the products of the processed forecasting dataset.
+
+    :return: The sorted product IDs, the category code of every product, the sorted
+        category names, and the last date in the data.
+    """
+    table = open_processed_dataset(input_path).to_table(columns=["product_id", "category", "date"])
+    last_date = pc.max(table["date"]).as_py()
+    pairs = table.group_by(["product_id"]).aggregate([("category", "min")]).sort_by("product_id")
+    product_ids = pairs["product_id"].combine_chunks()
+    categories = pairs["category_min"].fill_null("unknown")
+    category_ids = pc.unique(categories).sort()
+    category_codes = pc.index_in(categories, value_set=category_ids).to_numpy(zero_copy_only=False).astype(np.int32)
+    return product_ids, category_codes, category_ids, last_date
+
+
+def build_forecast_cube(input_path, model, output_dir, horizon=365, start=None, batch_products=1024, model_name=None):
+    """
+    Forecasts the daily sales of every product for ``horizon`` days and writes them,
+    with their per-category and global sums, as dense float32 arrays.
+
+    :param input_path: The processed forecasting dataset written by get_data.py.
+    :param model: The forecaster; ``model.predict(X)`` must return one value per row of
+        a forecast_features.feature_matrix.
+    :param output_dir: The cube directory; built next to it and swapped in whole.
+    :param horizon: The number of days forecast.
+    :param start: The first forecast day (YYYY-MM-DD); by default the day after the data ends.
+    :param batch_products: Products predicted per model call.
+    :param model_name: Recorded in the metadata.
+    :return: The cube metadata.
+    """
+    print(f"Reading from: {input_path}")
+    product_ids, category_codes, category_ids, last_date = read_products(input_path)
+    if start is None:
+        start = (np.datetime64(last_date, "D") + 1).astype(str)
+    dates = future_dates(start, horizon)
+    num_products, num_categories = len(product_ids), len(category_ids)
+
+    final_dir = output_dir
+    output_dir = staging_directory(final_dir)
+    forecast = np.lib.format.open_memmap(
+        os.path.join(output_dir, FORECAST_FILE), mode="w+", dtype=np.float32, shape=(num_products, horizon)
+    )
+    for first in range(0, num_products, batch_products):
+        codes = np.arange(first, min(first + batch_products, num_products))
+        predictions = np.asarray(model.predict(feature_matrix(codes, dates)), dtype=np.float32)
+        forecast[codes] = predictions.reshape(len(codes), horizon)
+        print(f"Forecast products {first} to {codes[-1]} of {num_products}")
+    forecast.flush()
+
+    # The aggregates are precomputed, so a category or global series is one row read
+    category_forecast = np.zeros((num_categories, horizon), dtype=np.float64)
+    np.add.at(category_forecast, category_codes, forecast)
+    np.save(os.path.join(output_dir, CATEGORY_FORECAST_FILE), category_forecast.astype(np.float32))
+    np.save(os.path.join(output_dir, GLOBAL_FORECAST_FILE), category_forecast.sum(axis=0).astype(np.float32))
+    np.save(os.path.join(output_dir, PRODUCT_CATEGORIES_FILE), category_codes)
+    _write_dictionary(os.path.join(output_dir, PRODUCT_IDS_FILE), "product_id", product_ids)
+    _write_dictionary(os.path.join(output_dir, CATEGORY_IDS_FILE), "category", category_ids)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "start_date": str(dates[0]),
+        "horizon": horizon,
+        "num_products": num_products,
+        "num_categories": num_categories,
+        "feature_columns": FEATURE_COLUMNS,
+        "model": model_name,
+        "source": input_path,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(output_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    swap_directory(output_dir, final_dir)
+
+    print(f"Wrote a {num_products} x {horizon} day forecast from {meta['start_date']} to: {final_dir}")
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the forecast cube served by /forecasts/sales.")
+    parser.add_argument(
+        "--input",
+        type=str,
+        default="data/processed/forecasting_features.parquet",
+        help="The processed forecasting dataset."
+    )
+    parser.add_argument("--model", type=str, default="models/forecaster.pkl", help="The pickled forecaster model.")
+    parser.add_argument("--output", type=str, default="models/forecast_cube", help="The cube directory to write.")
+    parser.add_argument("--horizon", type=int, default=365, help="The number of days to forecast.")
+    parser.add_argument("--start", type=str, default=None, help="The first forecast day; the day after the data by default.")
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as f:
+        forecaster = pickle.load(f)
+    build_forecast_cube(args.input, forecaster, args.output, horizon=args.horizon, start=args.start, model_name=args.model)
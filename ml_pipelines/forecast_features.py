@@ -0,0 +1,45 @@
+# The forecaster's feature matrix for future dates. The calendar features are computed
+# as get_data.py computes them for training (dates in UTC, Spark's day_of_week with
+# Sunday = 1); the API builds the same matrix in hashiramart.domains.forecasting.
+import numpy as np
+
+# Columns of the feature matrix passed to ``model.predict``; product_code is the
+# product's position in the sorted product dictionary of the training data
+FEATURE_COLUMNS = ["product_code", "year", "month", "day_of_week", "day_of_year"]
+
+
+def future_dates(start, horizon):
+    """Returns the ``horizon`` consecutive days from ``start`` as datetime64[D]."""
+    return np.datetime64(start, "D") + np.arange(horizon)
+
+
+def calendar_features(dates):
+    """
+    Computes year, month, day_of_week and day_of_year of datetime64[D] dates.
+
+    :return: An int32 (len(dates), 4) array.
+    """
+    days = dates.astype("datetime64[D]")
+    years = days.astype("datetime64[Y]")
+    epoch_days = days.astype(np.int64)
+    return np.column_stack([
+        years.astype(np.int64) + 1970,
+        days.astype("datetime64[M]").astype(np.int64) % 12 + 1,
+        # 1970-01-01 was a Thursday, day 5 when counting from Sunday = 1
+        (epoch_days + 4) % 7 + 1,
+        (days - years).astype(np.int64) + 1,
+    ]).astype(np.int32)
+
+
+def feature_matrix(product_codes, dates):
+    """
+    Builds the rows for every (product, date) pair, product-major: the rows of product
+    ``i`` are ``i * len(dates)`` to ``(i + 1) * len(dates)``.
+
+    :return: A float32 (len(product_codes) * len(dates), len(FEATURE_COLUMNS)) array.
+    """
+    calendar = calendar_features(dates)
+    matrix = np.empty((len(product_codes) * len(dates), len(FEATURE_COLUMNS)), dtype=np.float32)
+    matrix[:, 0] = np.repeat(np.asarray(product_codes), len(dates))
+    matrix[:, 1:] = np.tile(calendar, (len(product_codes), 1))
+    return matrix
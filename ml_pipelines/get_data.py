@@ -1,68 +1,650 @@
+import json
+import math
+import time
+import urllib.request
 import yaml
 import argparse
+from contextlib import contextmanager
+from datetime import datetime
+from functools import reduce
+from pyspark import StorageLevel
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import col, count, year, month, dayofweek, dayofyear
+from pyspark.sql.functions import (
+    col, count, crc32, hash as hash_, lit, pmod, sum as sum_, when, year, month, dayofweek, dayofyear
+)
 
+from pipeline_config import (
+    CREATED_MARKER, DEFAULT_LOCAL_MAX_INPUT_MB, MANIFEST_FILE, MB, REPLACED_SUFFIX, STAGING_SUFFIX, diff_manifest,
+    new_manifest, output_layout, task_paths
+)
 
-def process_recommender_data(spark, config):
+
+# --- Input manifest (the incremental watermark) ---
+
+def _hadoop_path(spark, path):
+    """Returns the Hadoop FileSystem serving a path, and the path as a Hadoop Path."""
+    hadoop_path = spark._jvm.org.apache.hadoop.fs.Path(path)
+    return hadoop_path.getFileSystem(spark._jsc.hadoopConfiguration()), hadoop_path
+
+
+def list_input_files(spark, path):
+    """
+    Lists the data files below a raw input path (a single file or a directory tree).
+
+    :return: A dict of file URI -> {"size", "modified"}.
+    """
+    fs, root = _hadoop_path(spark, path)
+    if not fs.exists(root):
+        return {}
+    files = {}
+    iterator = fs.listFiles(root, True)
+    while iterator.hasNext():
+        status = iterator.next()
+        if status.getPath().getName().startswith(("_", ".")):
+            continue
+        files[status.getPath().toString()] = {"size": status.getLen(), "modified": status.getModificationTime()}
+    return files
+
+
+def read_manifest(spark, output_path):
+    """Reads the manifest of a processed dataset, or returns None if it has none."""
+    fs, manifest_path = _hadoop_path(spark, f"{output_path.rstrip('/')}/{MANIFEST_FILE}")
+    if not fs.exists(manifest_path):
+        return None
+    jvm = spark._jvm
+    reader = jvm.java.io.BufferedReader(jvm.java.io.InputStreamReader(fs.open(manifest_path), "UTF-8"))
+    try:
+        lines = []
+        line = reader.readLine()
+        while line is not None:
+            lines.append(line)
+            line = reader.readLine()
+    finally:
+        reader.close()
+    return json.loads("\n".join(lines))
+
+
+def write_manifest(spark, output_path, input_path, files):
+    """Records the input files a processed dataset now covers."""
+    fs, manifest_path = _hadoop_path(spark, f"{output_path.rstrip('/')}/{MANIFEST_FILE}")
+    stream = fs.create(manifest_path, True)
+    try:
+        stream.write(bytearray(new_manifest(input_path, files).encode("utf-8")))
+    finally:
+        stream.close()
+
+
+def plan_incremental_run(spark, input_path, output_path):
+    """
+    Compares the raw input files with the manifest of the processed output.
+
+    :return: (files to process, all current input files); see ``diff_manifest``.
+    """
+    current = list_input_files(spark, input_path)
+    return diff_manifest(read_manifest(spark, output_path), input_path, current), current
+
+
+# --- Output layout ---
+
+def _records_per_file(layout):
+    return max(1, layout['target_file_size_mb'] * MB // layout['estimated_row_bytes'])
+
+
+def hot_partition_salts(df, layout, sample_fraction):
+    """
+    Finds the partitions too big for one write task, from a sample of ``df``.
+
+    Without salting, ``repartition(*partition_by)`` sends every row of a partition to one
+    task, so a bucket holding a few heavy users, or a peak month, becomes a straggler.
+
+    :return: The partition values -> the number of tasks (one per target-size file) to
+        spread the partition over, for the partitions that need more than one.
+    """
+    partition_by = layout['partition_by']
+    records_per_file = _records_per_file(layout)
+    sampled = df.sample(fraction=sample_fraction, seed=17).groupBy(*partition_by).count().collect()
+
+    salts = {}
+    for row in sampled:
+        tasks = math.ceil(row['count'] / sample_fraction / records_per_file)
+        if tasks > 1:
+            salts[tuple(row[c] for c in partition_by)] = tasks
+    if salts:
+        print(f"Salting {len(salts)} hot partition(s) across up to {max(salts.values())} write tasks each.")
+    return salts
+
+
+def layout_writer(df, layout, num_files=None, salts=None):
+    """
+    Returns a DataFrameWriter that lays ``df`` out as configured.
+
+    Rows are clustered by partition and sorted by the sort keys, so each partition is
+    written as few files as possible and every row group has narrow min/max statistics.
+
+    :param num_files: The exact number of files to write per partition value range; by
+        default each partition is written by one task and split by the estimated row count
+        of the target file size.
+    :param salts: Hot partitions to spread over several tasks; see ``hot_partition_salts``.
+    """
+    partition_by, sort_by = layout['partition_by'], layout['sort_by']
+    writer_options = {"parquet.block.size": str(layout['row_group_size_mb'] * MB)}
+
+    if num_files:
+        df = df.repartitionByRange(num_files, *partition_by, *sort_by)
+    else:
+        if partition_by and salts:
+            # Rows of a hot partition are split by a hash of the first sort key, so each
+            # key's rows still land in one file
+            salt = lit(0)
+            for values, tasks in salts.items():
+                in_partition = reduce(lambda a, b: a & b, (col(c) == lit(v) for c, v in zip(partition_by, values)))
+                salt = when(in_partition, pmod(hash_(col((sort_by or df.columns)[0])), lit(tasks))).otherwise(salt)
+            df = df.withColumn("_salt", salt).repartition(*partition_by, "_salt").drop("_salt")
+        elif partition_by:
+            df = df.repartition(*partition_by)
+        writer_options["maxRecordsPerFile"] = str(_records_per_file(layout))
+
+    df = df.sortWithinPartitions(*partition_by, *sort_by)
+    return df.write.options(**writer_options).partitionBy(*partition_by)
+
+
+def write_with_layout(df, path, layout, num_files=None, skew=None, **options):
+    """
+    Writes ``df`` to ``path`` in the configured layout, replacing what is there.
+
+    :param skew: The ``tuning.skew`` settings; when enabled, ``df`` is persisted once to
+        sample it for hot partitions before the write.
+    :param options: Extra writer options.
+    """
+    salts = None
+    if skew and skew['enabled'] and layout['partition_by'] and not num_files:
+        df = df.persist(StorageLevel.MEMORY_AND_DISK)
+        salts = hot_partition_salts(df, layout, skew['sample_fraction'])
+    try:
+        layout_writer(df, layout, num_files, salts).mode("overwrite").options(**options).parquet(path)
+    finally:
+        if salts is not None:
+            df.unpersist()
+
+
+def _partition_filter(df, partition_columns):
+    """Builds a predicate on the partition columns matching the partitions present in ``df``."""
+    partitions = df.select(*partition_columns).distinct().collect()
+    return reduce(
+        lambda a, b: a | b,
+        (reduce(lambda a, b: a & b, (col(c) == lit(row[c]) for c in partition_columns)) for row in partitions),
+    ), len(partitions)
+
+
+def _data_files_by_partition(fs, root):
+    """Maps each directory holding data files below ``root`` to the sizes of its files."""
+    partitions = {}
+    iterator = fs.listFiles(root, True)
+    while iterator.hasNext():
+        status = iterator.next()
+        if status.getPath().getName().startswith(("_", ".")):
+            continue
+        partitions.setdefault(status.getPath().getParent().toString(), []).append(status.getLen())
+    return partitions
+
+
+def _rename(fs, source, target):
+    """Renames a path; Hadoop reports most rename failures by returning False."""
+    if not fs.rename(source, target):
+        raise IOError(f"Could not rename {source} to {target}")
+
+
+def _swap_partition(spark, fs, staged, target, aside):
+    """Renames the old partition ``target`` to ``aside`` and the staged one to ``target``."""
+    Path = spark._jvm.org.apache.hadoop.fs.Path
+    fs.mkdirs(aside.getParent())
+    if fs.exists(target):
+        _rename(fs, target, aside)
+    else:
+        fs.mkdirs(aside)
+        fs.create(Path(aside, CREATED_MARKER), True).close()
+    fs.mkdirs(target.getParent())
+    _rename(fs, staged, target)
+
+
+def _roll_back_partition(spark, fs, target, aside):
+    """Puts back the partition ``_swap_partition`` set aside, or removes a created one."""
+    Path = spark._jvm.org.apache.hadoop.fs.Path
+    if fs.exists(Path(aside, CREATED_MARKER)):
+        fs.delete(target, True)
+        fs.delete(aside, True)
+        return
+    if fs.exists(target):
+        fs.delete(target, True)
+    _rename(fs, aside, target)
+
+
+def _set_aside_partitions(fs, replaced):
+    """Lists the partition directories below ``replaced``, including created-partition markers."""
+    partitions = set()
+    iterator = fs.listFiles(replaced, True)
+    while iterator.hasNext():
+        path = iterator.next().getPath()
+        partitions.add(path.getParent().toString())
+    return partitions
+
+
+def _recover_interrupted_swap(spark, fs, replaced, output_root):
+    """
+    Rolls back the partition swaps of an overwrite_partitions run that was interrupted,
+    so the output is back to the state its manifest describes.
+    """
+    if not fs.exists(replaced):
+        return
+    Path = spark._jvm.org.apache.hadoop.fs.Path
+    replaced_root = fs.makeQualified(replaced).toString()
+    for directory in _set_aside_partitions(fs, replaced):
+        target = Path(output_root + directory[len(replaced_root):])
+        print(f"Rolling back partition swapped by an interrupted run: {target}")
+        _roll_back_partition(spark, fs, target, Path(directory))
+    fs.delete(replaced, True)
+
+
+def recover_output(spark, output_path):
+    """
+    Rolls back the partition swaps an interrupted run left in ``<output>_replaced``. Runs
+    before every write, full rebuilds included: a leftover set-aside directory would
+    otherwise be restored over the data written since.
+    """
+    fs, replaced = _hadoop_path(spark, output_path.rstrip("/") + REPLACED_SUFFIX)
+    output_root = fs.makeQualified(_hadoop_path(spark, output_path)[1]).toString()
+    _recover_interrupted_swap(spark, fs, replaced, output_root)
+
+
+def overwrite_partitions(spark, df, output_path, layout, num_files=None, skew=None):
+    """
+    Replaces only the partitions present in ``df``; the rest of the dataset is left untouched.
+
+    ``df`` usually reads from ``output_path`` itself, which Spark cannot overwrite in
+    place, so it is first written to a staging directory. Each old partition is then
+    renamed aside and the staged one renamed in; the old partitions are deleted only
+    once every swap succeeded. A failure rolls back every swap already made, and the
+    swaps of a run that died halfway are rolled back by the next run, so the output
+    always matches its manifest.
+    """
+    staging_path = output_path.rstrip("/") + STAGING_SUFFIX
+    fs, staging = _hadoop_path(spark, staging_path)
+    _, replaced = _hadoop_path(spark, output_path.rstrip("/") + REPLACED_SUFFIX)
+    output_root = fs.makeQualified(_hadoop_path(spark, output_path)[1]).toString()
+    Path = spark._jvm.org.apache.hadoop.fs.Path
+    # Before the write, since df may read partitions an interrupted run left swapped
+    recover_output(spark, output_path)
+
+    write_with_layout(df, staging_path, layout, num_files, skew)
+    staging_root = fs.makeQualified(staging).toString()
+    replaced_root = fs.makeQualified(replaced).toString()
+
+    try:
+        for directory in _data_files_by_partition(fs, staging):
+            partition = directory[len(staging_root):]
+            target, aside = Path(output_root + partition), Path(replaced_root + partition)
+            _swap_partition(spark, fs, Path(directory), target, aside)
+    except Exception:
+        # Includes a partition whose swap failed halfway
+        _recover_interrupted_swap(spark, fs, replaced, output_root)
+        raise
+
+    fs.delete(replaced, True)
+    fs.delete(staging, True)
+
+
+def write_full(spark, df, output_path, layout, skew=None):
+    """Replaces the whole processed dataset."""
+    recover_output(spark, output_path)
+    write_with_layout(df, output_path, layout, skew=skew, partitionOverwriteMode="static")
+
+
+def compact_output(spark, output_path, layout):
+    """
+    Rewrites the partitions made of more files than their size needs, e.g. after many
+    incremental runs, into files of about the target size sorted by the sort keys.
+    """
+    if not layout['partition_by']:
+        print("Compaction needs a partitioned layout; skipping.")
+        return
+
+    recover_output(spark, output_path)
+    fs, root = _hadoop_path(spark, output_path)
+    if not fs.exists(root):
+        return
+    target_bytes = layout['target_file_size_mb'] * MB
+
+    fragmented = {}
+    for directory, sizes in _data_files_by_partition(fs, root).items():
+        wanted = max(1, -(-sum(sizes) // target_bytes))
+        if len(sizes) > wanted:
+            fragmented[directory] = wanted
+
+    print(f"Compacting {len(fragmented)} partition(s) in: {output_path}")
+    for directory, wanted in fragmented.items():
+        partition_df = spark.read.option("basePath", output_path).parquet(directory)
+        overwrite_partitions(spark, partition_df, output_path, layout, num_files=wanted)
+
+
+# --- Tuning and run summary ---
+
+# Defaults for the ``tuning`` section of spark_config.yaml
+DEFAULT_TUNING = {
+    # Passed to the SparkSession builder as-is
+    "spark": {},
+    "shuffle": {
+        # spark.sql.shuffle.partitions is set per run to the input size divided by this
+        "partition_size_mb": 128,
+        "min_partitions": 8,
+        "max_partitions": 2000,
+    },
+    "skew": {
+        "enabled": True,
+        "sample_fraction": 0.01,
+    },
+}
+
+# (phase name, seconds) of the current run, in order
+RUN_PHASES = []
+
+
+def tuning_settings(config, section):
+    """Returns a ``tuning`` section of the config merged over its defaults."""
+    return {**DEFAULT_TUNING[section], **((config.get('tuning') or {}).get(section) or {})}
+
+
+def total_bytes(spark, paths):
+    """Sums the sizes of files and directory trees."""
+    total = 0
+    for path in paths:
+        fs, hadoop_path = _hadoop_path(spark, path)
+        total += fs.getContentSummary(hadoop_path).getLength()
+    return total
+
+
+def size_shuffle_partitions(spark, config, input_bytes):
+    """
+    Sets spark.sql.shuffle.partitions from the size of the input, instead of the fixed 200.
+    Adaptive query execution can still coalesce the partitions that turn out small.
+    """
+    shuffle = tuning_settings(config, 'shuffle')
+    partitions = math.ceil(input_bytes / (shuffle['partition_size_mb'] * MB))
+    partitions = min(max(partitions, shuffle['min_partitions']), shuffle['max_partitions'])
+    spark.conf.set("spark.sql.shuffle.partitions", str(partitions))
+    print(f"Input is {input_bytes / MB:.1f} MB; using {partitions} shuffle partitions.")
+
+
+@contextmanager
+def phase(spark, name):
+    """Times a phase of the run and labels the Spark jobs it starts with its name."""
+    spark.sparkContext.setJobDescription(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        RUN_PHASES.append((name, time.perf_counter() - started))
+        spark.sparkContext.setJobDescription(None)
+
+
+def _spark_ui_json(spark, endpoint):
+    app_id = spark.sparkContext.applicationId
+    url = f"{spark.sparkContext.uiWebUrl}/api/v1/applications/{app_id}/{endpoint}"
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def _ui_time(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%Z")
+
+
+def log_run_summary(spark):
+    """
+    Logs the wall-clock time of each phase, then the duration, task count, I/O and task
+    time spread of every completed stage, read from the driver's monitoring REST API.
+    A max/median task time far above 1 points at skew.
+    """
+    print("--- Run Summary ---")
+    for name, seconds in RUN_PHASES:
+        print(f"{name}: {seconds:.1f}s")
+
+    if not spark.sparkContext.uiWebUrl:
+        print("Spark UI disabled; no stage timings.")
+        return
+    try:
+        stages = _spark_ui_json(spark, "stages?status=complete")
+        for stage in sorted(stages, key=lambda s: s['stageId']):
+            duration = (_ui_time(stage['completionTime']) - _ui_time(stage['submissionTime'])).total_seconds()
+            summary = _spark_ui_json(
+                spark, f"stages/{stage['stageId']}/{stage['attemptId']}/taskSummary?quantiles=0.5,1.0"
+            )
+            median, longest = summary['executorRunTime']
+            print(
+                f"stage {stage['stageId']} [{stage.get('description') or stage['name']}]: {duration:.1f}s, "
+                f"{stage['numTasks']} tasks, "
+                f"in {stage['inputBytes'] / MB:.1f} MB, "
+                f"shuffle read {stage['shuffleReadBytes'] / MB:.1f} MB / write {stage['shuffleWriteBytes'] / MB:.1f} MB, "
+                f"out {stage['outputBytes'] / MB:.1f} MB, "
+                f"task time median {median / 1000:.1f}s / max {longest / 1000:.1f}s"
+            )
+    except (OSError, ValueError, KeyError) as e:
+        # The summary is informational; never fail a finished run over it
+        print(f"Could not read stage timings from the Spark UI: {e}")
+
+
+# --- Recommender ---
+
+def build_implicit_ratings(raw_df, user_buckets):
+    """
+    Creates an implicit rating by counting user-product purchases, tagged with the
+    user's hash bucket the output is partitioned by.
+    """
+    return raw_df.groupBy("user_id", "product_id").agg(
+        count("*").alias("purchase_count_rating")
+    ).withColumn("user_bucket", pmod(crc32(col("user_id")), lit(user_buckets)).cast("int"))
+
+
+def process_recommender_data(spark, config, incremental=False, compact=False):
     """
     Reads raw recommender data from HDFS, creates implicit ratings,
     and writes the cleaned data to MinIO.
+
+    In incremental mode only the input files not yet listed in the output's manifest are
+    read; their counts are added to the existing ratings of the affected user buckets,
+    and only those buckets are rewritten.
     """
     print("--- Starting Recommender Data Processing ---")
 
     # Define paths from config
-    hdfs_base_path = config['hdfs']['base_path']
-    recommender_raw_path = config['paths']['recommender_raw']
-    minio_base_path = f"s3a://{config['minio']['bucket']}"
-    recommender_processed_path = config['paths']['recommender_processed']
+    input_path, output_path = task_paths(config, "recommender")
+    layout = output_layout(config, "recommender")
+    user_buckets = layout['buckets']
+    skew = tuning_settings(config, 'skew')
 
-    # Read the raw parquet file from HDFS
-    print(f"Reading from: {hdfs_base_path + recommender_raw_path}")
-    raw_df = spark.read.parquet(hdfs_base_path + recommender_raw_path)
+    # Before anything reads the output; Spark lists a dataset's files when it is opened
+    recover_output(spark, output_path)
+    if incremental and not layout['partition_by']:
+        print("Incremental runs need a partitioned layout; running a full rebuild.")
+        incremental = False
+    with phase(spark, "plan"):
+        new_files, input_files = plan_incremental_run(spark, input_path, output_path) if incremental else (None, None)
 
-    # Create an implicit rating by counting user-product purchases
-    clean_df = raw_df.groupBy("user_id", "product_id").agg(
-        count("*").alias("purchase_count_rating")
-    )
+    if new_files is None:
+        # Read the raw parquet file from HDFS
+        print(f"Reading from: {input_path}")
+        # In incremental mode read exactly the files the manifest will record, so files
+        # landing during the run are picked up by the next one instead of counted twice
+        raw_df = spark.read.parquet(*input_files) if input_files else spark.read.parquet(input_path)
+        size_shuffle_partitions(spark, config, sum(f["size"] for f in input_files.values())
+                                if input_files else total_bytes(spark, [input_path]))
+        clean_df = build_implicit_ratings(raw_df, user_buckets)
+
+        # Write the cleaned recommender data to MinIO
+        print(f"Writing to: {output_path}")
+        with phase(spark, "full rebuild"):
+            write_full(spark, clean_df, output_path, layout, skew)
+
+    elif new_files:
+        size_shuffle_partitions(spark, config, sum(input_files[f]["size"] for f in new_files))
+        new_df = build_implicit_ratings(spark.read.parquet(*new_files), user_buckets).cache()
+        bucket_filter, changed = _partition_filter(new_df, layout['partition_by'])
+
+        # Add the new counts to the existing ratings of the affected buckets only
+        existing_df = spark.read.parquet(output_path).where(bucket_filter)
+        merged_df = existing_df.unionByName(new_df) \
+            .groupBy("user_id", "product_id", "user_bucket") \
+            .agg(sum_("purchase_count_rating").alias("purchase_count_rating")) \
+            .select("user_id", "product_id", "purchase_count_rating", "user_bucket")
+
+        print(f"Rewriting {changed} of {user_buckets} user buckets in: {output_path}")
+        with phase(spark, "incremental merge"):
+            overwrite_partitions(spark, merged_df, output_path, layout, skew=skew)
+        new_df.unpersist()
 
-    # Write the cleaned recommender data to MinIO
-    print(f"Writing to: {minio_base_path + recommender_processed_path}")
-    clean_df.write.mode("overwrite").parquet(minio_base_path + recommender_processed_path)
+    else:
+        print("Nothing new to process.")
+
+    if incremental:
+        write_manifest(spark, output_path, input_path, input_files)
+
+    if compact:
+        with phase(spark, "compaction"):
+            compact_output(spark, output_path, layout)
 
     print("--- Recommender Data Processing Complete ---")
 
 
-def process_forecasting_data(spark, config):
+# --- Forecasting ---
+
+def build_forecasting_features(raw_df):
+    """Engineers date-based features for the time-series model."""
+    return raw_df.withColumn("year", year(col("date"))) \
+        .withColumn("month", month(col("date"))) \
+        .withColumn("day_of_week", dayofweek(col("date"))) \
+        .withColumn("day_of_year", dayofyear(col("date")))
+
+
+def process_forecasting_data(spark, config, incremental=False, compact=False):
     """
     Reads raw forecasting data from HDFS, engineers date-based features,
     and writes the cleaned data to MinIO.
+
+    In incremental mode only the input files not yet listed in the output's manifest are
+    read, and only the year/month partitions they fall into are rewritten.
     """
     print("--- Starting Forecasting Data Processing ---")
 
     # Define paths from config
-    hdfs_base_path = config['hdfs']['base_path']
-    forecasting_raw_path = config['paths']['forecasting_raw']
-    minio_base_path = f"s3a://{config['minio']['bucket']}"
-    forecasting_processed_path = config['paths']['forecasting_processed']
+    input_path, output_path = task_paths(config, "forecasting")
+    layout = output_layout(config, "forecasting")
+    skew = tuning_settings(config, 'skew')
 
-    # Read the raw parquet file from HDFS
-    print(f"Reading from: {hdfs_base_path + forecasting_raw_path}")
-    raw_df = spark.read.parquet(hdfs_base_path + forecasting_raw_path)
+    # Before anything reads the output; Spark lists a dataset's files when it is opened
+    recover_output(spark, output_path)
+    if incremental and not layout['partition_by']:
+        print("Incremental runs need a partitioned layout; running a full rebuild.")
+        incremental = False
+    with phase(spark, "plan"):
+        new_files, input_files = plan_incremental_run(spark, input_path, output_path) if incremental else (None, None)
 
-    # Engineer date-based features for the time-series model
-    clean_df = raw_df.withColumn("year", year(col("date"))) \
-        .withColumn("month", month(col("date"))) \
-        .withColumn("day_of_week", dayofweek(col("date"))) \
-        .withColumn("day_of_year", dayofyear(col("date")))
+    if new_files is None:
+        # Read the raw parquet file from HDFS
+        print(f"Reading from: {input_path}")
+        # In incremental mode read exactly the files the manifest will record, so files
+        # landing during the run are picked up by the next one instead of counted twice
+        raw_df = spark.read.parquet(*input_files) if input_files else spark.read.parquet(input_path)
+        size_shuffle_partitions(spark, config, sum(f["size"] for f in input_files.values())
+                                if input_files else total_bytes(spark, [input_path]))
+        clean_df = build_forecasting_features(raw_df)
+
+        # Write the cleaned forecasting data to MinIO
+        print(f"Writing to: {output_path}")
+        with phase(spark, "full rebuild"):
+            write_full(spark, clean_df, output_path, layout, skew)
+
+    elif new_files:
+        size_shuffle_partitions(spark, config, sum(input_files[f]["size"] for f in new_files))
+        new_df = build_forecasting_features(spark.read.parquet(*new_files)).cache()
+        month_filter, changed = _partition_filter(new_df, layout['partition_by'])
+
+        # Keep the rows already processed for the affected months, add the new ones
+        existing_df = spark.read.parquet(output_path).where(month_filter)
+        merged_df = existing_df.unionByName(new_df)
 
-    # Write the cleaned forecasting data to MinIO
-    print(f"Writing to: {minio_base_path + forecasting_processed_path}")
-    clean_df.write.mode("overwrite").parquet(minio_base_path + forecasting_processed_path)
+        print(f"Rewriting {changed} month partition(s) in: {output_path}")
+        with phase(spark, "incremental merge"):
+            overwrite_partitions(spark, merged_df, output_path, layout, skew=skew)
+        new_df.unpersist()
+
+    else:
+        print("Nothing new to process.")
+
+    if incremental:
+        write_manifest(spark, output_path, input_path, input_files)
+
+    if compact:
+        with phase(spark, "compaction"):
+            compact_output(spark, output_path, layout)
 
     print("--- Forecasting Data Processing Complete ---")
 
 
+# --- Entry points ---
+
+def run_spark(task, config, incremental=False, compact=False):
+    """Runs a task on a Spark session configured for MinIO."""
+    minio_cfg = config['minio']
+
+    # Initialize the Spark Session with MinIO S3 configuration and the tuning profile
+    builder = SparkSession.builder \
+        .appName(f"HashiraMart-{task.capitalize()}") \
+        .config("spark.hadoop.fs.s3a.endpoint", minio_cfg['endpoint']) \
+        .config("spark.hadoop.fs.s3a.access.key", minio_cfg['access_key']) \
+        .config("spark.hadoop.fs.s3a.secret.key", minio_cfg['secret_key']) \
+        .config("spark.hadoop.fs.s3a.path.style.access", "true") \
+        .config("spark.hadoop.fs.s3a.impl", "org.apache.hadoop.fs.s3a.S3AFileSystem") \
+        .config("spark.sql.session.timeZone", "UTC")
+    for key, value in tuning_settings(config, 'spark').items():
+        builder = builder.config(key, str(value).lower() if isinstance(value, bool) else str(value))
+    spark = builder.getOrCreate()
+
+    print(f"Spark session created. Running task: {task}")
+
+    # Execute the correct function based on the --task argument
+    if task == "recommender":
+        process_recommender_data(spark, config, incremental=incremental, compact=compact)
+    elif task == "forecasting":
+        process_forecasting_data(spark, config, incremental=incremental, compact=compact)
+
+    log_run_summary(spark)
+    spark.stop()
+    print("Spark session stopped.")
+
+
+def select_engine(requested, task, config, incremental=False):
+    """
+    Picks the engine for a run: the local engine when the data it would read fits within
+    ``engine.local_max_input_mb``, Spark otherwise, or when the local engine is unavailable.
+    """
+    if requested != "auto":
+        return requested
+    try:
+        import local_engine
+    except ImportError as e:
+        print(f"Local engine unavailable ({e}); using Spark.")
+        return "spark"
+
+    limit = (config.get('engine') or {}).get('local_max_input_mb', DEFAULT_LOCAL_MAX_INPUT_MB) * MB
+    try:
+        work_bytes = local_engine.estimate_work_bytes(task, config, incremental)
+    except (OSError, ValueError) as e:
+        print(f"Could not size the input without Spark ({e}); using Spark.")
+        return "spark"
+
+    engine = "local" if work_bytes <= limit else "spark"
+    print(f"The run reads about {work_bytes / MB:.1f} MB; using the {engine} engine.")
+    return engine
+
+
 if __name__ == "__main__":
     # Setup command-line argument parsing
     parser = argparse.ArgumentParser(description="Process data for HashiraMart models.")
@@ -73,6 +655,23 @@ if __name__ == "__main__":
         choices=["recommender", "forecasting"],
         help="The processing task to run ('recommender' or 'forecasting')."
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process raw input files added since the last run and rewrite the partitions they touch."
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Afterwards, rewrite output partitions made of many small files into files of the target size."
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="auto",
+        choices=["auto", "spark", "local"],
+        help="'spark' runs on the cluster, 'local' in this process with Arrow; 'auto' picks by input size."
+    )
     args = parser.parse_args()
 
     # Load the configuration from the YAML file
@@ -80,25 +679,9 @@ if __name__ == "__main__":
     with open('/app/config/spark_config.yaml', 'r') as f:
         config = yaml.safe_load(f)
 
-    minio_cfg = config['minio']
-
-    # Initialize the Spark Session with MinIO S3 configuration
-    spark = SparkSession.builder \
-        .appName(f"HashiraMart-{args.task.capitalize()}") \
-        .config("spark.hadoop.fs.s3a.endpoint", minio_cfg['endpoint']) \
-        .config("spark.hadoop.fs.s3a.access.key", minio_cfg['access_key']) \
-        .config("spark.hadoop.fs.s3a.secret.key", minio_cfg['secret_key']) \
-        .config("spark.hadoop.fs.s3a.path.style.access", "true") \
-        .config("spark.hadoop.fs.s3a.impl", "org.apache.hadoop.fs.s3a.S3AFileSystem") \
-        .getOrCreate()
-
-    print(f"Spark session created. Running task: {args.task}")
-
-    # Execute the correct function based on the --task argument
-    if args.task == "recommender":
-        process_recommender_data(spark, config)
-    elif args.task == "forecasting":
-        process_forecasting_data(spark, config)
-
-    spark.stop()
-    print("Spark session stopped.")
\ No newline at end of file
+    engine = select_engine(args.engine, args.task, config, args.incremental)
+    if engine == "local":
+        import local_engine
+        local_engine.run(args.task, config, incremental=args.incremental, compact=args.compact)
+    else:
+        run_spark(args.task, config, incremental=args.incremental, compact=args.compact)
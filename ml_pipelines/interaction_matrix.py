@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from artifacts import staging_directory, swap_directory
+from processed_data import open_processed_dataset
+
+# Files of an interaction matrix artifact directory. The .npy arrays and the .arrow
+# dictionaries can all be memory-mapped, so loading the artifact reads no data up front.
+INDPTR_FILE = "indptr.npy"
+INDICES_FILE = "indices.npy"
+DATA_FILE = "data.npy"
+USER_IDS_FILE = "user_ids.arrow"
+PRODUCT_IDS_FILE = "product_ids.arrow"
+ITEM_VECTORS_FILE = "item_vectors.npy"
+META_FILE = "meta.json"
+
+# Users whose ratings are projected at once when building the item vectors
+_PROJECTION_BATCH_USERS = 65536
+
+
+def encode_ids(values):
+    """
+    Assigns dense int32 IDs to string IDs, in sorted order.
+
+    :return: The dictionary (dense ID -> string ID) and the dense ID of every value.
+    """
+    dictionary = pc.unique(values).sort()
+    return dictionary, pc.index_in(values, value_set=dictionary).to_numpy(zero_copy_only=False).astype(np.int32)
+
+
+def build_csr(rows, cols, values, num_rows):
+    """
+    Builds CSR arrays from coordinates, summing duplicate (row, col) pairs.
+
+    :return: indptr (int64, num_rows + 1), indices (int32) and data (float32), with the
+        column indices of every row sorted.
+    """
+    order = np.lexsort((cols, rows))
+    rows, cols, values = rows[order], cols[order], values[order].astype(np.float32)
+
+    # A processed dataset has one row per pair, but sum duplicates rather than trust it
+    if len(rows) > 1:
+        starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])])
+        if len(starts) < len(rows):
+            values = np.add.reduceat(values, starts)
+            rows, cols = rows[starts], cols[starts]
+
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
+    return indptr, cols.astype(np.int32), values
+
+
+def item_vectors(indptr, indices, data, num_products, dim=64, seed=0):
+    """
+    Builds one unit-length vector per product: a random projection of the product's
+    column of ratings (which users bought it, and how much). Dot products of these
+    vectors approximate the cosine similarity of the columns, i.e. of the products'
+    co-purchase patterns, at a fixed ``dim`` floats per product.
+
+    :return: A float32 (num_products, dim) array.
+    """
+    num_users = len(indptr) - 1
+    rng = np.random.default_rng(seed)
+    vectors = np.zeros((num_products, dim), dtype=np.float32)
+    for start in range(0, num_users, _PROJECTION_BATCH_USERS):
+        stop = min(start + _PROJECTION_BATCH_USERS, num_users)
+        projection = rng.standard_normal((stop - start, dim), dtype=np.float32)
+        begin, end = indptr[start], indptr[stop]
+        rows = np.repeat(np.arange(stop - start), np.diff(indptr[start:stop + 1]))
+        # Sum the projected rows of every product's ratings, grouped by product
+        order = np.argsort(indices[begin:end], kind="stable")
+        products = indices[begin:end][order]
+        contributions = projection[rows[order]] * data[begin:end][order, np.newaxis]
+        if len(products):
+            starts = np.flatnonzero(np.r_[True, products[1:] != products[:-1]])
+            vectors[products[starts]] += np.add.reduceat(contributions, starts, axis=0)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def _write_dictionary(path, name, dictionary):
+    table = pa.table({name: dictionary})
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def build_interaction_matrix(input_path, output_dir, vector_dim=64):
+    """
+    Builds the user x product matrix of ``purchase_count_rating`` from the processed
+    recommender dataset, with dense int32 user and product IDs, and the item vectors
+    used for real-time item-item similarity.
+
+    :param input_path: The processed recommender dataset written by get_data.py.
+    :param output_dir: The artifact directory. It is built next to it and swapped in whole,
+        so readers still mapping the previous artifact keep reading intact files.
+    :param vector_dim: Floats per item vector.
+    :return: The artifact metadata.
+    """
+    print(f"Reading from: {input_path}")
+    table = open_processed_dataset(input_path).to_table(columns=["user_id", "product_id", "purchase_count_rating"])
+    table = table.filter(pc.and_(pc.is_valid(table["user_id"]), pc.is_valid(table["product_id"])))
+
+    user_dictionary, user_index = encode_ids(table["user_id"])
+    product_dictionary, product_index = encode_ids(table["product_id"])
+    ratings = table["purchase_count_rating"].to_numpy()
+
+    indptr, indices, data = build_csr(user_index, product_index, ratings, len(user_dictionary))
+
+    final_dir = output_dir
+    output_dir = staging_directory(final_dir)
+    np.save(os.path.join(output_dir, INDPTR_FILE), indptr)
+    np.save(os.path.join(output_dir, INDICES_FILE), indices)
+    np.save(os.path.join(output_dir, DATA_FILE), data)
+    np.save(os.path.join(output_dir, ITEM_VECTORS_FILE), item_vectors(indptr, indices, data, len(product_dictionary), vector_dim))
+    _write_dictionary(os.path.join(output_dir, USER_IDS_FILE), "user_id", user_dictionary)
+    _write_dictionary(os.path.join(output_dir, PRODUCT_IDS_FILE), "product_id", product_dictionary)
+
+    meta = {
+        "num_users": len(user_dictionary),
+        "num_products": len(product_dictionary),
+        "nnz": int(len(indices)),
+        "indptr_dtype": str(indptr.dtype),
+        "indices_dtype": str(indices.dtype),
+        "data_dtype": str(data.dtype),
+        "vector_dim": vector_dim,
+        "source": input_path,
+    }
+    with open(os.path.join(output_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    swap_directory(output_dir, final_dir)
+
+    print(f"Wrote a {meta['num_users']} x {meta['num_products']} matrix with {meta['nnz']} ratings to: {final_dir}")
+    return meta
+
+
+class InteractionMatrix:
+    """
+    A memory-mapped interaction matrix artifact.
+
+    ``indptr``, ``indices`` and ``data`` are the CSR arrays; row ``u`` holds the ratings of
+    the user with dense ID ``u``. Pages are read from disk only when touched and are shared
+    between processes mapping the same files.
+    """
+
+    def __init__(self, artifact_dir, mmap=True):
+        """
+        :param artifact_dir: A directory written by ``build_interaction_matrix``.
+        :param mmap: Whether to memory-map the arrays instead of reading them into memory.
+        """
+        mode = "r" if mmap else None
+        with open(os.path.join(artifact_dir, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.shape = (self.meta["num_users"], self.meta["num_products"])
+        self.indptr = np.load(os.path.join(artifact_dir, INDPTR_FILE), mmap_mode=mode)
+        self.indices = np.load(os.path.join(artifact_dir, INDICES_FILE), mmap_mode=mode)
+        self.data = np.load(os.path.join(artifact_dir, DATA_FILE), mmap_mode=mode)
+        self.user_ids = _read_dictionary(os.path.join(artifact_dir, USER_IDS_FILE), mmap)
+        self.product_ids = _read_dictionary(os.path.join(artifact_dir, PRODUCT_IDS_FILE), mmap)
+        self._user_index = None
+        self._product_index = None
+
+    def row(self, user):
+        """Returns the (product dense IDs, ratings) of a user's dense ID."""
+        start, end = self.indptr[user], self.indptr[user + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def user_index(self, user_id):
+        """Returns the dense ID of a user, or None if the user has no ratings."""
+        if self._user_index is None:
+            self._user_index = {value: i for i, value in enumerate(self.user_ids.to_pylist())}
+        return self._user_index.get(user_id)
+
+    def product_index(self, product_id):
+        """Returns the dense ID of a product, or None if it was never purchased."""
+        if self._product_index is None:
+            self._product_index = {value: i for i, value in enumerate(self.product_ids.to_pylist())}
+        return self._product_index.get(product_id)
+
+    def to_scipy(self):
+        """Wraps the arrays, without copying, in a scipy.sparse.csr_matrix."""
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape, copy=False)
+
+
+def _read_dictionary(path, mmap):
+    source = pa.memory_map(path) if mmap else pa.OSFile(path)
+    return pa.ipc.open_file(source).read_all().column(0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mappable interaction matrix for the recommender.")
+    parser.add_argument(
+        "--input",
+        type=str,
+        default="data/processed/recommender_features.parquet",
+        help="The processed recommender dataset."
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="data/features/interactions",
+        help="The artifact directory to write."
+    )
+    parser.add_argument(
+        "--vector-dim",
+        type=int,
+        default=64,
+        help="Floats per item vector for item-item similarity."
+    )
+    args = parser.parse_args()
+    build_interaction_matrix(args.input, args.output, args.vector_dim)
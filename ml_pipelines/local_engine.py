@@ -0,0 +1,423 @@
+import json
+import posixpath
+import uuid
+import zlib
+from functools import reduce
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from pipeline_config import (
+    CREATED_MARKER, MANIFEST_FILE, MB, REPLACED_SUFFIX, STAGING_SUFFIX, diff_manifest, new_manifest, output_layout,
+    task_paths
+)
+
+# The same transforms as the Spark path of get_data.py, run in-process with Arrow for
+# inputs small enough that starting a Spark application would take longer than the work.
+# The output is laid out and typed exactly like Spark's, so either engine can continue
+# the other's incremental runs.
+
+# The physical Parquet schema Spark writes: timestamps as INT96, every column nullable
+_WRITE_OPTIONS = ds.ParquetFileFormat().make_write_options(use_deprecated_int96_timestamps=True)
+
+
+# --- Storage ---
+
+def arrow_filesystem(uri, config):
+    """
+    Resolves a URI to a pyarrow FileSystem and the path on it.
+
+    ``s3a://`` URIs go to MinIO with the credentials of the config; anything else
+    (``hdfs://``, local paths) is resolved by pyarrow.
+    """
+    if uri.startswith("s3a://"):
+        minio_cfg = config['minio']
+        scheme, _, host = minio_cfg['endpoint'].rpartition("://")
+        fs = pafs.S3FileSystem(
+            access_key=minio_cfg['access_key'],
+            secret_key=minio_cfg['secret_key'],
+            endpoint_override=host,
+            scheme=scheme or "http",
+        )
+        return fs, uri[len("s3a://"):]
+    return pafs.FileSystem.from_uri(uri)
+
+
+def list_input_files(uri, config):
+    """
+    Lists the data files below a raw input path, keyed like the Spark engine's listing.
+
+    :return: A dict of file URI -> {"size", "modified"}.
+    """
+    fs, path = arrow_filesystem(uri, config)
+    info = fs.get_file_info(path)
+    if info.type == pafs.FileType.NotFound:
+        return {}
+    infos = [info] if info.type == pafs.FileType.File else fs.get_file_info(pafs.FileSelector(path, recursive=True))
+
+    # Hadoop lists fully qualified URIs; pyarrow lists paths on the file system
+    prefix = uri[:-len(path)] if path and uri.endswith(path) else ""
+    files = {}
+    for info in infos:
+        if info.type != pafs.FileType.File or info.base_name.startswith(("_", ".")):
+            continue
+        key = info.path if "://" in info.path else prefix + info.path
+        files[key] = {"size": info.size, "modified": info.mtime_ns // 1_000_000}
+    return files
+
+
+def read_manifest(output_uri, config):
+    """Reads the manifest of a processed dataset, or returns None if it has none."""
+    fs, path = arrow_filesystem(output_uri, config)
+    manifest_path = posixpath.join(path, MANIFEST_FILE)
+    if fs.get_file_info(manifest_path).type == pafs.FileType.NotFound:
+        return None
+    with fs.open_input_stream(manifest_path) as stream:
+        return json.loads(stream.read().decode("utf-8"))
+
+
+def write_manifest(output_uri, input_path, files, config):
+    """Records the input files a processed dataset now covers."""
+    fs, path = arrow_filesystem(output_uri, config)
+    with fs.open_output_stream(posixpath.join(path, MANIFEST_FILE)) as stream:
+        stream.write(new_manifest(input_path, files).encode("utf-8"))
+
+
+def _dataset_bytes(uri, config):
+    fs, path = arrow_filesystem(uri, config)
+    if fs.get_file_info(path).type != pafs.FileType.Directory:
+        return 0
+    return sum(info.size for info in fs.get_file_info(pafs.FileSelector(path, recursive=True))
+               if info.type == pafs.FileType.File)
+
+
+def estimate_work_bytes(task, config, incremental=False):
+    """
+    Estimates how many bytes a run reads: the whole raw input for a full run; the new
+    input files plus the existing output, at most, for an incremental run.
+
+    :raises OSError: If a file system cannot be reached.
+    """
+    input_path, output_path = task_paths(config, task)
+    current = list_input_files(input_path, config)
+    if incremental:
+        manifest = read_manifest(output_path, config)
+        processed = manifest["files"] if manifest and manifest.get("input_path") == input_path else None
+        if processed is not None and all(current.get(path) == info for path, info in processed.items()):
+            new_bytes = sum(info["size"] for path, info in current.items() if path not in processed)
+            return new_bytes + _dataset_bytes(output_path, config)
+    return sum(info["size"] for info in current.values())
+
+
+def read_input(files, config):
+    """Reads raw Parquet files into one table, with string columns as Spark reads them."""
+    tables = []
+    for uri in files:
+        fs, path = arrow_filesystem(uri, config)
+        tables.append(ds.dataset(path, filesystem=fs, format="parquet").to_table())
+    table = pa.concat_tables(tables, promote_options="permissive")
+
+    # Spark has a single string type; decode dictionary and large strings to it
+    for i, field in enumerate(table.schema):
+        value_type = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+        if pa.types.is_large_string(value_type) or pa.types.is_string(value_type):
+            if field.type != pa.string():
+                table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+    return table
+
+
+def read_partitions(output_uri, config, partition_table):
+    """Reads the rows of the output partitions listed in ``partition_table``."""
+    fs, path = arrow_filesystem(output_uri, config)
+    dataset = ds.dataset(path, filesystem=fs, format="parquet", partitioning="hive")
+    predicate = reduce(
+        lambda a, b: a | b,
+        (reduce(lambda a, b: a & b, (ds.field(name) == value for name, value in row.items()))
+         for row in partition_table.to_pylist()),
+    )
+    return dataset.to_table(filter=predicate)
+
+
+def write_table(table, output_uri, layout, config, *, rows_per_file=None):
+    """
+    Writes a table in the configured layout, replacing everything at ``output_uri``: hive
+    partitions, rows sorted by the sort keys, files of the target size.
+
+    :param rows_per_file: Overrides the row count derived from the target file size.
+    """
+    partition_by, sort_by = layout['partition_by'], layout['sort_by']
+    fs, path = arrow_filesystem(output_uri, config)
+
+    table = table.sort_by([(c, "ascending") for c in partition_by + sort_by])
+
+    rows_per_file = rows_per_file or max(1, layout['target_file_size_mb'] * MB // layout['estimated_row_bytes'])
+    rows_per_group = max(1, min(rows_per_file, layout['row_group_size_mb'] * MB // layout['estimated_row_bytes']))
+
+    fs.delete_dir_contents(path, missing_dir_ok=True)
+    ds.write_dataset(
+        table,
+        path,
+        filesystem=fs,
+        format="parquet",
+        file_options=_WRITE_OPTIONS,
+        partitioning=partition_by or None,
+        partitioning_flavor="hive" if partition_by else None,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        max_rows_per_file=rows_per_file,
+        max_rows_per_group=rows_per_group,
+        existing_data_behavior="overwrite_or_ignore",
+        preserve_order=True,
+    )
+
+
+# --- Partition swaps (the same protocol and directories as get_data.overwrite_partitions) ---
+
+def _exists(fs, path):
+    return fs.get_file_info(path).type != pafs.FileType.NotFound
+
+
+def _data_directories(fs, root):
+    """Lists the directories holding files below ``root``, markers included."""
+    return sorted({
+        posixpath.dirname(info.path)
+        for info in fs.get_file_info(pafs.FileSelector(root, recursive=True))
+        if info.type == pafs.FileType.File
+    })
+
+
+def _move(fs, source, target):
+    """Moves a directory; object stores cannot rename one, so its files are moved one by one."""
+    try:
+        fs.move(source, target)
+    except (NotImplementedError, pa.ArrowNotImplementedError):
+        for info in fs.get_file_info(pafs.FileSelector(source, recursive=True)):
+            if info.type == pafs.FileType.File:
+                destination = posixpath.join(target, posixpath.relpath(info.path, source))
+                fs.create_dir(posixpath.dirname(destination))
+                fs.move(info.path, destination)
+        fs.delete_dir(source)
+
+
+def _swap_partition(fs, staged, target, aside):
+    """Moves the old partition ``target`` to ``aside`` and the staged one to ``target``."""
+    fs.create_dir(posixpath.dirname(aside))
+    if _exists(fs, target):
+        _move(fs, target, aside)
+    else:
+        fs.create_dir(aside)
+        with fs.open_output_stream(posixpath.join(aside, CREATED_MARKER)):
+            pass
+    fs.create_dir(posixpath.dirname(target))
+    _move(fs, staged, target)
+
+
+def _roll_back_partition(fs, target, aside):
+    """Puts back the partition ``_swap_partition`` set aside, or removes a created one."""
+    if _exists(fs, posixpath.join(aside, CREATED_MARKER)):
+        if _exists(fs, target):
+            fs.delete_dir(target)
+        fs.delete_dir(aside)
+        return
+    if _exists(fs, target):
+        fs.delete_dir(target)
+    _move(fs, aside, target)
+
+
+def recover_output(output_uri, config):
+    """
+    Rolls back the partition swaps an interrupted run of either engine left in
+    ``<output>_replaced``, so the output matches its manifest again. Runs before every
+    write, full rebuilds included.
+    """
+    fs, path = arrow_filesystem(output_uri, config)
+    replaced = path.rstrip("/") + REPLACED_SUFFIX
+    if fs.get_file_info(replaced).type != pafs.FileType.Directory:
+        return
+    for directory in _data_directories(fs, replaced):
+        target = posixpath.join(path, posixpath.relpath(directory, replaced))
+        print(f"Rolling back partition swapped by an interrupted run: {target}")
+        _roll_back_partition(fs, target, directory)
+    fs.delete_dir(replaced)
+
+
+def overwrite_partitions(table, output_uri, layout, config, rows_per_file=None):
+    """
+    Replaces only the partitions present in ``table``, like get_data.overwrite_partitions:
+    they are written to a staging directory, then each old partition is moved aside and
+    the staged one moved in. The old partitions are deleted once every swap succeeded; a
+    failure rolls back the swaps already made.
+    """
+    recover_output(output_uri, config)
+    fs, path = arrow_filesystem(output_uri, config)
+    staging = path.rstrip("/") + STAGING_SUFFIX
+    replaced = path.rstrip("/") + REPLACED_SUFFIX
+    write_table(table, output_uri.rstrip("/") + STAGING_SUFFIX, layout, config, rows_per_file=rows_per_file)
+
+    try:
+        for directory in _data_directories(fs, staging):
+            partition = posixpath.relpath(directory, staging)
+            _swap_partition(fs, directory, posixpath.join(path, partition), posixpath.join(replaced, partition))
+    except Exception:
+        # Includes a partition whose swap failed halfway
+        recover_output(output_uri, config)
+        raise
+
+    if _exists(fs, replaced):
+        fs.delete_dir(replaced)
+    fs.delete_dir(staging)
+
+
+# --- Transforms (same results as build_implicit_ratings / build_forecasting_features in get_data.py) ---
+
+def user_buckets_of(user_ids, buckets):
+    """Computes pmod(crc32(user_id), buckets) like Spark, hashing each distinct user once."""
+    encoded = pc.dictionary_encode(user_ids.combine_chunks() if isinstance(user_ids, pa.ChunkedArray) else user_ids)
+    codes = np.fromiter(
+        (zlib.crc32(user_id.encode("utf-8")) % buckets for user_id in encoded.dictionary.to_pylist()),
+        dtype=np.int32,
+        count=len(encoded.dictionary),
+    )
+    return pc.take(pa.array(codes, type=pa.int32()), encoded.indices)
+
+
+def build_implicit_ratings(table, user_buckets):
+    """Counts user-product purchases into an implicit rating, tagged with the user's bucket."""
+    counts = table.group_by(["user_id", "product_id"]).aggregate([([], "count_all")])
+    return pa.table({
+        "user_id": counts["user_id"],
+        "product_id": counts["product_id"],
+        "purchase_count_rating": counts["count_all"],
+        "user_bucket": user_buckets_of(counts["user_id"], user_buckets),
+    })
+
+
+def build_forecasting_features(table):
+    """Adds the date-based features; dates are taken in UTC, like the Spark session."""
+    dates = table["date"]
+    features = {
+        "year": pc.year(dates),
+        "month": pc.month(dates),
+        # Spark's dayofweek counts from Sunday = 1 to Saturday = 7
+        "day_of_week": pc.day_of_week(dates, count_from_zero=False, week_start=7),
+        "day_of_year": pc.day_of_year(dates),
+    }
+    for name, values in features.items():
+        table = table.append_column(name, values.cast(pa.int32()))
+    return table
+
+
+# --- Runs ---
+
+def process_recommender_data(config, incremental=False, compact=False):
+    """The local-engine version of get_data.process_recommender_data."""
+    print("--- Starting Recommender Data Processing (local engine) ---")
+    input_path, output_path = task_paths(config, "recommender")
+    layout = output_layout(config, "recommender")
+
+    def merge(existing, new):
+        merged = pa.concat_tables([existing.select(new.column_names), new], promote_options="permissive") \
+            .group_by(["user_id", "product_id", "user_bucket"]) \
+            .aggregate([("purchase_count_rating", "sum")])
+        return pa.table({
+            "user_id": merged["user_id"],
+            "product_id": merged["product_id"],
+            "purchase_count_rating": merged["purchase_count_rating_sum"],
+            "user_bucket": merged["user_bucket"],
+        })
+
+    _run(config, input_path, output_path, layout, incremental, compact,
+         transform=lambda table: build_implicit_ratings(table, layout['buckets']), merge=merge)
+    print("--- Recommender Data Processing Complete ---")
+
+
+def process_forecasting_data(config, incremental=False, compact=False):
+    """The local-engine version of get_data.process_forecasting_data."""
+    print("--- Starting Forecasting Data Processing (local engine) ---")
+    input_path, output_path = task_paths(config, "forecasting")
+    layout = output_layout(config, "forecasting")
+
+    _run(config, input_path, output_path, layout, incremental, compact,
+         transform=build_forecasting_features,
+         merge=lambda existing, new: pa.concat_tables([existing.select(new.column_names), new], promote_options="permissive"))
+    print("--- Forecasting Data Processing Complete ---")
+
+
+def _run(config, input_path, output_path, layout, incremental, compact, *, transform, merge):
+    """Runs a full or incremental rebuild of one processed dataset, like the Spark engine does."""
+    recover_output(output_path, config)
+    if incremental and not layout['partition_by']:
+        print("Incremental runs need a partitioned layout; running a full rebuild.")
+        incremental = False
+
+    input_files = list_input_files(input_path, config)
+    new_files = diff_manifest(read_manifest(output_path, config), input_path, input_files) if incremental else None
+
+    if new_files is None:
+        if not input_files:
+            raise FileNotFoundError(f"No input files found at: {input_path}")
+        print(f"Reading from: {input_path}")
+        clean = transform(read_input(sorted(input_files), config))
+        print(f"Writing to: {output_path}")
+        write_table(clean, output_path, layout, config)
+
+    elif new_files:
+        new = transform(read_input(new_files, config))
+        changed = new.select(layout['partition_by']).group_by(layout['partition_by']).aggregate([])
+        existing = read_partitions(output_path, config, changed)
+        print(f"Rewriting {changed.num_rows} partition(s) in: {output_path}")
+        overwrite_partitions(merge(existing, new), output_path, layout, config)
+
+    else:
+        print("Nothing new to process.")
+
+    if incremental:
+        write_manifest(output_path, input_path, input_files, config)
+
+    if compact:
+        compact_output(output_path, layout, config)
+
+
+def compact_output(output_uri, layout, config):
+    """
+    Rewrites the partitions made of more files than their size needs into files of about
+    the target size, like get_data.compact_output.
+    """
+    if not layout['partition_by']:
+        print("Compaction needs a partitioned layout; skipping.")
+        return
+
+    recover_output(output_uri, config)
+    fs, path = arrow_filesystem(output_uri, config)
+    if fs.get_file_info(path).type != pafs.FileType.Directory:
+        return
+    target_bytes = layout['target_file_size_mb'] * MB
+
+    sizes_by_directory = {}
+    for info in fs.get_file_info(pafs.FileSelector(path, recursive=True)):
+        if info.type == pafs.FileType.File and not info.base_name.startswith(("_", ".")):
+            sizes_by_directory.setdefault(posixpath.dirname(info.path), []).append(info.size)
+
+    dataset = ds.dataset(path, filesystem=fs, format="parquet", partitioning="hive")
+    fragmented = {d: -(-sum(sizes) // target_bytes) for d, sizes in sizes_by_directory.items()}
+    fragmented = {d: wanted for d, wanted in fragmented.items() if len(sizes_by_directory[d]) > wanted}
+
+    print(f"Compacting {len(fragmented)} partition(s) in: {output_uri}")
+    for directory, wanted in fragmented.items():
+        # "user_bucket=3" or "year=2024/month=5", relative to the dataset root
+        values = dict(part.split("=", 1) for part in posixpath.relpath(directory, path).split("/"))
+        predicate = reduce(lambda a, b: a & b, (
+            ds.field(name) == pa.scalar(value).cast(dataset.schema.field(name).type) for name, value in values.items()
+        ))
+        table = dataset.to_table(filter=predicate)
+        overwrite_partitions(table, output_uri, layout, config, rows_per_file=max(1, -(-table.num_rows // wanted)))
+
+
+def run(task, config, incremental=False, compact=False):
+    """Runs a get_data.py task with the local engine."""
+    if task == "recommender":
+        process_recommender_data(config, incremental=incremental, compact=compact)
+    elif task == "forecasting":
+        process_forecasting_data(config, incremental=incremental, compact=compact)
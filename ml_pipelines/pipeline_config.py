@@ -0,0 +1,88 @@
+# Settings and bookkeeping shared by the Spark and the local engine of get_data.py.
+# Nothing here imports Spark or Arrow, so either engine can use it on its own.
+import json
+from datetime import datetime, timezone
+
+# Written next to the processed data; lists the raw input files already folded into it.
+# Spark ignores files starting with "_" when reading the output back.
+MANIFEST_FILE = "_incremental_manifest.json"
+
+MB = 1024 * 1024
+
+# Partition swaps (overwrite_partitions in either engine): new partitions are written to
+# <output>_staging, old ones are moved to <output>_replaced until every swap succeeded,
+# and a set-aside partition that did not exist before holds an empty CREATED_MARKER
+STAGING_SUFFIX = "_staging"
+REPLACED_SUFFIX = "_replaced"
+CREATED_MARKER = "_CREATED"
+
+# Defaults for the ``layout`` section of spark_config.yaml, per task
+DEFAULT_LAYOUTS = {
+    "recommender": {
+        "partition_by": ["user_bucket"],
+        # user_bucket = crc32(user_id) % buckets
+        "buckets": 32,
+        "sort_by": ["user_id", "product_id"],
+        "target_file_size_mb": 128,
+        "row_group_size_mb": 32,
+        # Compressed bytes per output row, used to turn the target file size into a row count
+        "estimated_row_bytes": 12,
+    },
+    "forecasting": {
+        "partition_by": ["year", "month"],
+        "sort_by": ["product_id", "date"],
+        "target_file_size_mb": 128,
+        "row_group_size_mb": 32,
+        "estimated_row_bytes": 20,
+    },
+}
+
+# Inputs up to this size are processed in-process by the local engine when --engine is auto
+DEFAULT_LOCAL_MAX_INPUT_MB = 1024
+
+
+def output_layout(config, task):
+    """Returns the output layout of a task: the defaults overridden by ``layout.<task>`` in the config."""
+    return {**DEFAULT_LAYOUTS[task], **(config.get('layout') or {}).get(task, {})}
+
+
+def task_paths(config, task):
+    """Returns the raw input URI on HDFS and the processed output URI on MinIO of a task."""
+    input_path = config['hdfs']['base_path'] + config['paths'][f'{task}_raw']
+    output_path = f"s3a://{config['minio']['bucket']}" + config['paths'][f'{task}_processed']
+    return input_path, output_path
+
+
+def new_manifest(input_path, files):
+    """Builds the manifest recording that the output now covers ``files`` of ``input_path``."""
+    return json.dumps({
+        "input_path": input_path,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "files": files,
+    }, indent=2)
+
+
+def diff_manifest(manifest, input_path, current):
+    """
+    Compares the current raw input files with the manifest of the processed output.
+
+    :param manifest: The parsed manifest, or None if the output has none.
+    :param input_path: The raw input URI.
+    :param current: The current input files, as file URI -> {"size", "modified"}.
+    :return: The files to process, or None when a full rebuild is needed: there is no
+        manifest yet, or a file that was already processed has since changed or
+        disappeared (its old rows cannot be subtracted).
+    """
+    if manifest is None or manifest.get("input_path") != input_path:
+        print("No manifest for this input yet; running a full rebuild.")
+        return None
+
+    processed = manifest["files"]
+    changed = [path for path, info in processed.items() if current.get(path) != info]
+    if changed:
+        print(f"{len(changed)} already processed input file(s) changed or disappeared; running a full rebuild.")
+        return None
+
+    new_files = sorted(path for path in current if path not in processed)
+    print(f"{len(new_files)} new input file(s) since the last run.")
+    return new_files
@@ -0,0 +1,50 @@
+import zlib
+
+import pyarrow.dataset as ds
+
+
+def open_processed_dataset(path):
+    """
+    Opens a processed dataset written by get_data.py as a pyarrow dataset.
+
+    The hive-style partition directories (``user_bucket=3``, ``year=2024/month=5``) become
+    columns, so filters on them skip whole directories, and filters on the sort keys skip
+    row groups through their min/max statistics.
+
+    :param path: The dataset directory, e.g. "data/processed/recommender_features.parquet".
+    """
+    return ds.dataset(path, format="parquet", partitioning="hive")
+
+
+def user_bucket(user_id, buckets):
+    """Returns the user_bucket partition of a user; the same value as Spark's pmod(crc32(user_id), buckets)."""
+    return zlib.crc32(user_id.encode("utf-8")) % buckets
+
+
+def read_user_ratings(path, user_id, buckets=32):
+    """
+    Reads the implicit ratings of one user, scanning only the user's bucket.
+
+    :param buckets: The ``layout.recommender.buckets`` the dataset was written with.
+    :return: The user's rows as a pyarrow Table.
+    """
+    dataset = open_processed_dataset(path)
+    return dataset.to_table(
+        filter=(ds.field("user_bucket") == user_bucket(user_id, buckets)) & (ds.field("user_id") == user_id)
+    )
+
+
+def read_forecasting_months(path, start, end):
+    """
+    Reads the forecasting features of the months from ``start`` to ``end`` inclusive,
+    scanning only those month partitions.
+
+    :param start: The first (year, month).
+    :param end: The last (year, month).
+    :return: The rows as a pyarrow Table.
+    """
+    dataset = open_processed_dataset(path)
+    month_key = ds.field("year") * 100 + ds.field("month")
+    return dataset.to_table(
+        filter=(month_key >= start[0] * 100 + start[1]) & (month_key <= end[0] * 100 + end[1])
+    )
@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import pickle
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from artifacts import staging_directory, swap_directory
+from interaction_matrix import PRODUCT_IDS_FILE, InteractionMatrix
+
+# Files of a top-K index directory, all read memory-mapped by the API
+# (hashiramart.domains.recommendations.topk_index). Bump FORMAT_VERSION on any change.
+FORMAT_VERSION = 1
+PRODUCTS_FILE = "topk_products.npy"
+SCORES_FILE = "topk_scores.npy"
+USER_KEYS_FILE = "user_keys.npy"
+POPULAR_PRODUCTS_FILE = "popular_products.npy"
+POPULAR_SCORES_FILE = "popular_scores.npy"
+META_FILE = "meta.json"
+
+# Empty slots of a row, for users with fewer than k candidate products
+PAD = -1
+
+
+def top_k(scores, k):
+    """
+    Selects the k best products of every row of a score matrix.
+
+    :param scores: A (users, products) float array; -inf marks products to skip.
+    :return: The product dense IDs (int32, PAD-filled) and scores (float32) of every row,
+        best first.
+    """
+    k = min(k, scores.shape[1])
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    products = np.take_along_axis(candidates, order, axis=1).astype(np.int32)
+    best = np.take_along_axis(candidate_scores, order, axis=1).astype(np.float32)
+    products[~np.isfinite(best)] = PAD
+    return products, best
+
+
+def build_topk_index(matrix_dir, model, output_dir, k=100, batch_size=2048, exclude_seen=True, model_name=None):
+    """
+    Scores every user of the interaction matrix with the recommender model and writes
+    each user's k best products to fixed-width arrays indexed by dense user ID.
+
+    :param matrix_dir: The interaction matrix artifact written by interaction_matrix.py.
+    :param model: The recommender; ``model.score(users)`` must return a
+        (len(users), num_products) array for an array of dense user IDs.
+    :param output_dir: The index directory. It is built next to it and swapped in whole,
+        so API workers still mapping the previous index keep reading intact files.
+    :param k: Products kept per user.
+    :param batch_size: Users scored per model call.
+    :param exclude_seen: Whether to drop the products a user already bought.
+    :param model_name: Recorded in the metadata.
+    :return: The index metadata.
+    """
+    matrix = InteractionMatrix(matrix_dir)
+    num_users, num_products = matrix.shape
+    k = min(k, num_products)
+    final_dir = output_dir
+    output_dir = staging_directory(final_dir)
+
+    # Written through memory maps, so the index is never held in memory as a whole
+    products = open_memmap(os.path.join(output_dir, PRODUCTS_FILE), mode="w+", dtype=np.int32, shape=(num_users, k))
+    scores = open_memmap(os.path.join(output_dir, SCORES_FILE), mode="w+", dtype=np.float32, shape=(num_users, k))
+
+    for start in range(0, num_users, batch_size):
+        users = np.arange(start, min(start + batch_size, num_users), dtype=np.int32)
+        batch = np.asarray(model.score(users), dtype=np.float32)
+        if exclude_seen:
+            begin, end = matrix.indptr[users[0]], matrix.indptr[users[-1] + 1]
+            rows = np.repeat(np.arange(len(users)), np.diff(matrix.indptr[users[0]:users[-1] + 2]))
+            batch[rows, matrix.indices[begin:end]] = -np.inf
+        products[users], scores[users] = top_k(batch, k)
+        print(f"Scored users {start} to {users[-1]} of {num_users}")
+    products.flush()
+    scores.flush()
+
+    # Cold-start fallback: the most bought products overall
+    popularity = np.bincount(matrix.indices, weights=matrix.data, minlength=num_products)
+    popular_products, popular_scores = top_k(popularity[np.newaxis, :], k)
+    np.save(os.path.join(output_dir, POPULAR_PRODUCTS_FILE), popular_products[0])
+    np.save(os.path.join(output_dir, POPULAR_SCORES_FILE), popular_scores[0])
+
+    # Fixed-width keys in the dictionary's sorted order, so the API finds a user's dense
+    # ID with a binary search over the mapped file instead of a per-worker hash map
+    user_keys = np.array([user_id.encode("utf-8") for user_id in matrix.user_ids.to_pylist()], dtype=np.bytes_)
+    if len(user_keys) > 1 and not np.all(user_keys[1:] > user_keys[:-1]):
+        raise ValueError("User IDs of the interaction matrix are not sorted and unique.")
+    np.save(os.path.join(output_dir, USER_KEYS_FILE), user_keys)
+    shutil.copyfile(os.path.join(matrix_dir, PRODUCT_IDS_FILE), os.path.join(output_dir, PRODUCT_IDS_FILE))
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "num_users": num_users,
+        "num_products": num_products,
+        "k": k,
+        "model": model_name,
+        "source": matrix_dir,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(output_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    swap_directory(output_dir, final_dir)
+
+    print(f"Wrote the top {k} products of {num_users} users to: {final_dir}")
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the per-user top-K recommendation index served by the API.")
+    parser.add_argument("--matrix", type=str, default="data/features/interactions", help="The interaction matrix artifact.")
+    parser.add_argument("--model", type=str, default="models/recommender.pkl", help="The pickled recommender model.")
+    parser.add_argument("--output", type=str, default="models/topk_index", help="The index directory to write.")
+    parser.add_argument("--k", type=int, default=100, help="Products kept per user.")
+    parser.add_argument("--batch-size", type=int, default=2048, help="Users scored per model call.")
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as f:
+        recommender = pickle.load(f)
+    build_topk_index(args.matrix, recommender, args.output, k=args.k, batch_size=args.batch_size, model_name=args.model)
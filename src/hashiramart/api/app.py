@@ -1,8 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from hashiramart.api.routers import auth, users, products, recommendations, forecasting, bigdata_hdfs, synthetic
+from hashiramart.api.routers import auth, users, products, recommendations, forecasting, bigdata_hdfs, synthetic, spark_jobs, models
+from hashiramart.config.settings import settings
+from hashiramart.domains.forecasting.services import get_forecaster_manager
+from hashiramart.domains.recommendations.services import get_recommender_manager
+from hashiramart.infrastructure.database.connection import close_async_engine
+from hashiramart.infrastructure.hdfs.client import close_hdfs_client
+from hashiramart.infrastructure.yarn.tracker import close_job_tracker
+from hashiramart.ml.mlflow_client import close_model_managers
+
+MODEL_MANAGERS = {
+    "forecaster": get_forecaster_manager,
+    "recommender": get_recommender_manager,
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load, warm up and then keep polling for new versions of the served models
+    for name in filter(None, (name.strip() for name in settings.SERVED_MODELS.split(","))):
+        MODEL_MANAGERS[name]().start()
+    yield
+    # Release pooled connections to shared backends on shutdown
+    await close_hdfs_client()
+    await close_job_tracker()
+    await close_model_managers()
+    await close_async_engine()
+
 
-app = FastAPI(title="HashiraMart AI System")
+app = FastAPI(title="HashiraMart AI System", lifespan=lifespan)
 
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -10,4 +38,6 @@ app.include_router(products.router)
 app.include_router(recommendations.router)
 app.include_router(forecasting.router)
 app.include_router(bigdata_hdfs.router)
-app.include_router(synthetic.router)
\ No newline at end of file
+app.include_router(synthetic.router)
+app.include_router(spark_jobs.router)
+app.include_router(models.router)
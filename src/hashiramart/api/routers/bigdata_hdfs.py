@@ -1,81 +1,281 @@
-import requests
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query, status
+import asyncio
+import json
+import posixpath
+import re
+import tempfile
+from typing import List, Optional, Tuple
+
+import httpx
+from fastapi import APIRouter, Depends, Header, UploadFile, File, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from hashiramart.infrastructure.hdfs.bulk_upload import (
+    UploadSource,
+    bulk_upload,
+    directory_sources,
+    extract_archive,
+    safe_relative_path,
+)
+from hashiramart.infrastructure.hdfs.client import WebHDFSClient, WebHDFSError, get_hdfs_client
+from hashiramart.infrastructure.hdfs.listing_cache import ListingCache, get_listing_cache
 
 router = APIRouter(prefix="/big-data", tags=["Big Data Operations"])
 
-# The internal address for the HDFS NameNode service from docker-compose
-HDFS_API_URL = "http://namenode:9870/webhdfs/v1"
-HDFS_USER = "root"
+# Size of the pieces an upload is read and forwarded in, so memory stays flat for large files
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Size of the pieces a download is relayed to the client in
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+async def _iter_upload(file: UploadFile):
+    """Yields the uploaded file in chunks of UPLOAD_CHUNK_SIZE bytes."""
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
 
 
 @router.post("/upload", status_code=status.HTTP_201_CREATED)
 async def upload_to_hdfs(
         file: UploadFile = File(...),
-        hdfs_path: str = Query(default="/user/hashiramart")
+        hdfs_path: str = Query(default="/user/hashiramart"),
+        hdfs: WebHDFSClient = Depends(get_hdfs_client),
+        listing_cache: ListingCache = Depends(get_listing_cache),
 ):
     """
     Uploads a file to HDFS by proxying the request through the FastAPI app.
+    The file is streamed to the DataNode chunk by chunk instead of being read into memory.
     """
-    file_content = await file.read()
     target_path = f"{hdfs_path.rstrip('/')}/{file.filename}"
-    create_url = f"{HDFS_API_URL}{target_path}?op=CREATE&user.name={HDFS_USER}&overwrite=true"
 
     try:
-        # Step 1: Send a CREATE request to the NameNode.
-        create_response = requests.put(create_url, allow_redirects=False)
-        create_response.raise_for_status()
+        await hdfs.create(target_path, _iter_upload(file), length=file.size)
+        listing_cache.invalidate(target_path)
+        return {"message": f"Successfully uploaded {file.filename} to {target_path} in HDFS."}
 
-        # Extract the redirect URL for the DataNode.
-        datanode_url = create_response.headers.get('Location')
-        if not datanode_url:
-            raise HTTPException(status_code=500, detail="HDFS did not provide a DataNode URL.")
+    except (WebHDFSError, httpx.HTTPError) as e:
+        raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
 
-        # Step 2: Send the actual file content to the DataNode URL.
-        write_response = requests.put(datanode_url, data=file_content)
-        write_response.raise_for_status()
 
-        return {"message": f"Successfully uploaded {file.filename} to {target_path} in HDFS."}
+@router.post("/upload/bulk")
+async def bulk_upload_to_hdfs(
+        files: List[UploadFile] = File(default=[]),
+        archive: Optional[UploadFile] = File(default=None, description="A .zip or .tar(.gz) of the files to upload"),
+        hdfs_path: str = Query(default="/user/hashiramart"),
+        max_concurrency: int = Query(default=8, ge=1, le=64),
+        hdfs: WebHDFSClient = Depends(get_hdfs_client),
+        listing_cache: ListingCache = Depends(get_listing_cache),
+):
+    """
+    Uploads many files (and/or the contents of an archive) to HDFS concurrently.
+    Relative paths in the file names are kept below hdfs_path. Files already present in HDFS
+    with the same size and checksum are skipped.
+    """
+    with tempfile.TemporaryDirectory() as extract_dir:
+        sources = []
+        for file in files:
+            relative_path = safe_relative_path(file.filename or "")
+            if relative_path is None:
+                raise HTTPException(status_code=400, detail=f"Invalid file name: {file.filename!r}")
+            sources.append(UploadSource.from_fileobj(relative_path, file.file))
+
+        if archive is not None:
+            try:
+                await asyncio.to_thread(extract_archive, archive.file, archive.filename, extract_dir)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            sources.extend(directory_sources(extract_dir))
+
+        try:
+            report = await bulk_upload(hdfs, sources, hdfs_path, max_concurrency=max_concurrency)
+        except (WebHDFSError, httpx.HTTPError) as e:
+            raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
+        finally:
+            listing_cache.invalidate(hdfs_path)
 
-    except requests.exceptions.RequestException as e:
+    return {
+        "message": f"Uploaded {len(report.uploaded)} and skipped {len(report.skipped)} unchanged files "
+                   f"to {hdfs_path} in HDFS.",
+        "uploaded": report.uploaded,
+        "skipped": report.skipped,
+        "failed": report.failed,
+    }
+
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Resolves a single-range HTTP Range header against the file size.
+
+    :return: The inclusive (first, last) byte positions, or None to send the whole file.
+    :raises HTTPException: 416 if the range lies outside the file.
+    """
+    if not range_header:
+        return None
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        # Multiple or malformed ranges: ignore the header and send the whole file
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        first, last = max(size - int(last), 0), size - 1
+    else:
+        first, last = int(first), min(int(last), size - 1) if last else size - 1
+
+    if first >= size or first > last:
+        raise HTTPException(
+            status_code=416,
+            detail=f"Range {range_header} is outside the file of {size} bytes.",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return first, last
+
+
+@router.get("/download")
+async def download_from_hdfs(
+        hdfs_path: str = Query(..., description="The full path of the file to download from HDFS"),
+        range_header: Optional[str] = Header(default=None, alias="Range"),
+        hdfs: WebHDFSClient = Depends(get_hdfs_client),
+):
+    """
+    Streams a file (or a byte range of it, via the HTTP Range header) from HDFS to the client.
+    The DataNode response is relayed chunk by chunk without being buffered.
+    """
+    try:
+        file_status = await hdfs.file_status(hdfs_path)
+        if file_status["type"] != "FILE":
+            raise HTTPException(status_code=400, detail=f"{hdfs_path} is a directory, not a file.")
+
+        size = file_status["length"]
+        byte_range = _parse_range(range_header, size)
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Disposition": f'attachment; filename="{posixpath.basename(hdfs_path)}"',
+        }
+
+        if byte_range is None:
+            response = await hdfs.open(hdfs_path)
+            status_code, headers["Content-Length"] = status.HTTP_200_OK, str(size)
+        else:
+            first, last = byte_range
+            response = await hdfs.open(hdfs_path, offset=first, length=last - first + 1)
+            status_code, headers["Content-Length"] = status.HTTP_206_PARTIAL_CONTENT, str(last - first + 1)
+            headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+
+    except WebHDFSError as e:
+        if e.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"File not found at {hdfs_path}")
         raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
+
+    return StreamingResponse(
+        response.aiter_raw(DOWNLOAD_CHUNK_SIZE),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/octet-stream",
+        background=BackgroundTask(response.aclose),
+    )
 
 
 @router.get("/status")
-def hdfs_status(hdfs_path: str = Query(default="/user/hashiramart")):
-    """Gets the status and file listing for a directory in HDFS."""
-    status_url = f"{HDFS_API_URL}{hdfs_path}?op=LISTSTATUS&user.name={HDFS_USER}"
+async def hdfs_status(
+        hdfs_path: str = Query(default="/user/hashiramart"),
+        hdfs: WebHDFSClient = Depends(get_hdfs_client),
+        listing_cache: ListingCache = Depends(get_listing_cache),
+):
+    """Gets the status and file listing for a directory in HDFS, served from a short-lived cache."""
+    statuses = listing_cache.get(hdfs_path)
+    if statuses is None:
+        try:
+            statuses = await hdfs.list_status(hdfs_path)
+        except (WebHDFSError, httpx.HTTPError) as e:
+            raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
+        listing_cache.put(hdfs_path, statuses)
+    return {"FileStatuses": {"FileStatus": statuses}}
+
+
+@router.get("/status/page")
+async def hdfs_status_page(
+        hdfs_path: str = Query(default="/user/hashiramart"),
+        start_after: Optional[str] = Query(default=None, description="The next_start_after of the previous page"),
+        hdfs: WebHDFSClient = Depends(get_hdfs_client),
+        listing_cache: ListingCache = Depends(get_listing_cache),
+):
+    """
+    Gets one page of a directory listing (LISTSTATUS_BATCH), for directories too large to list at once.
+    Pass the returned next_start_after to fetch the following page; it is null on the last page.
+    """
+    page = listing_cache.get(hdfs_path, variant=("page", start_after))
+    if page is None:
+        try:
+            statuses, remaining = await hdfs.list_status_batch(hdfs_path, start_after)
+        except WebHDFSError as e:
+            if e.status_code == 404:
+                raise HTTPException(status_code=404, detail=f"Directory not found at {hdfs_path}")
+            raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
+
+        page = {
+            "FileStatuses": {"FileStatus": statuses},
+            "remaining_entries": remaining,
+            "next_start_after": statuses[-1]["pathSuffix"] if remaining and statuses else None,
+        }
+        listing_cache.put(hdfs_path, page, variant=("page", start_after))
+    return page
+
+
+@router.get("/status/walk")
+async def hdfs_walk(
+        hdfs_path: str = Query(default="/user/hashiramart"),
+        hdfs: WebHDFSClient = Depends(get_hdfs_client),
+):
+    """
+    Recursively lists a directory tree as newline-delimited JSON, one FileStatus (plus its
+    full "path") per line, streamed while the tree is walked page by page.
+    """
     try:
-        response = requests.get(status_url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        await hdfs.file_status(hdfs_path)
+    except WebHDFSError as e:
+        if e.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Directory not found at {hdfs_path}")
+        raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
 
+    async def iter_lines():
+        async for path, file_status in hdfs.walk(hdfs_path):
+            yield json.dumps({"path": path, **file_status}) + "\n"
+
+    return StreamingResponse(iter_lines(), media_type="application/x-ndjson")
+
 
 @router.delete("/delete")
-def delete_from_hdfs(
+async def delete_from_hdfs(
         hdfs_path: str = Query(default="/user/hashiramart", description="The full path of the file or directory to delete in HDFS"),
-        recursive: bool = Query(default=False, description="Set to true to delete non-empty directories")
+        recursive: bool = Query(default=False, description="Set to true to delete non-empty directories"),
+        hdfs: WebHDFSClient = Depends(get_hdfs_client),
+        listing_cache: ListingCache = Depends(get_listing_cache),
 ):
     """Deletes a file or directory from HDFS."""
-    delete_url = f"{HDFS_API_URL}{hdfs_path}?op=DELETE&user.name={HDFS_USER}&recursive={str(recursive).lower()}"
-
     try:
-        response = requests.delete(delete_url)
-        response.raise_for_status()  # Raises an error for non-2xx responses
-
-        # A successful delete returns {"boolean": true}
-        if response.json().get("boolean"):
-            return {"message": f"Successfully deleted {hdfs_path} from HDFS."}
-        else:
-            raise HTTPException(status_code=500, detail="HDFS reported a failure but did not return an error.")
-
-    except requests.exceptions.RequestException as e:
-        # If the file is not found, HDFS returns a 404, which raise_for_status will catch.
-        if e.response and e.response.status_code == 404:
+        deleted = await hdfs.delete(hdfs_path, recursive=recursive)
+        listing_cache.invalidate(hdfs_path)
+    except WebHDFSError as e:
+        if e.status_code == 404:
             raise HTTPException(status_code=404, detail=f"File or directory not found at {hdfs_path}")
         raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Error communicating with HDFS: {e}")
 
+    # A successful delete returns {"boolean": true}
+    if deleted:
+        return {"message": f"Successfully deleted {hdfs_path} from HDFS."}
+    raise HTTPException(status_code=500, detail="HDFS reported a failure but did not return an error.")
 
 
 
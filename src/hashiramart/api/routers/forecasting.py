@@ -1,10 +1,79 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional
 
+import numpy as np
+
+from hashiramart.api.schemas.forecasting import BatchForecastRequest, SalesForecastResponse
+from hashiramart.config.settings import settings
+from hashiramart.domains.forecasting.cube import ForecastCube, get_forecast_cube
+from hashiramart.domains.forecasting.services import (
+    FORECAST_SCHEMA,
+    get_forecaster,
+    iter_forecast_chunks,
+    iter_ndjson,
+    resolve_products,
+)
+from hashiramart.domains.synthetic.services import iter_arrow_stream
+from hashiramart.ml.mlflow_client import ModelNotLoadedError
+
 router = APIRouter(prefix="/forecasts", tags=["Forecasting"])
 
-@router.get("/sales")
-def get_sales_forecast(days: int = 30, category: Optional[str] = None):
-    # ... logic to generate a sales forecast for the next 'days'
-    # ... optionally filtered by 'category'
-    return {"forecast_period_days": days, "category": category, "forecast": [...]}
\ No newline at end of file
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def get_cube() -> ForecastCube:
+    """Returns the forecast cube, or a 503 until the forecaster stage has produced one."""
+    try:
+        return get_forecast_cube()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Forecast cube is not available: {e}")
+
+
+@router.get("/sales", response_model=SalesForecastResponse)
+def get_sales_forecast(
+    days: int = Query(30, ge=1),
+    category: Optional[str] = None,
+    cube: ForecastCube = Depends(get_cube),
+):
+    """
+    Get the daily sales forecast for the next 'days', optionally for one category,
+    sliced from the precomputed forecast cube.
+    """
+    try:
+        return cube.sales_forecast(days, category)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Category not found: {category}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/batch")
+def forecast_batch(request: BatchForecastRequest, cube: ForecastCube = Depends(get_cube)):
+    """
+    Forecasts many products for 'horizon' days with one vectorized model call per chunk
+    of products, streaming each chunk as soon as it is predicted: one JSON line per
+    product, or an Arrow IPC stream with one row per product and day.
+    """
+    if not request.product_ids and not request.categories:
+        raise HTTPException(status_code=400, detail="Provide product_ids, categories or both")
+    if request.horizon > settings.FORECAST_BATCH_MAX_HORIZON:
+        raise HTTPException(
+            status_code=400, detail=f"horizon must be at most {settings.FORECAST_BATCH_MAX_HORIZON}"
+        )
+
+    product_codes, unknown = resolve_products(cube, request.product_ids, request.categories)
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown products or categories: {unknown[:20]}")
+    try:
+        model = get_forecaster()
+    except (OSError, ModelNotLoadedError) as e:
+        raise HTTPException(status_code=503, detail=f"Forecaster model is not available: {e}")
+
+    start = np.datetime64(request.start_date, "D") if request.start_date else cube.start_date
+    dates = start + np.arange(request.horizon)
+    chunks = iter_forecast_chunks(model, cube, product_codes, dates, settings.FORECAST_BATCH_CHUNK_PRODUCTS)
+    if request.format == "arrow":
+        return StreamingResponse(iter_arrow_stream(chunks, FORECAST_SCHEMA), media_type=ARROW_STREAM_MEDIA_TYPE)
+    return StreamingResponse(iter_ndjson(chunks, request.horizon), media_type=NDJSON_MEDIA_TYPE)
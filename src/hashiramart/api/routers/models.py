@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException
+
+from hashiramart.ml.mlflow_client import ModelManager, ModelNotLoadedError, model_managers
+
+router = APIRouter(prefix="/models", tags=["Models"])
+
+
+def _manager(name: str) -> ModelManager:
+    for manager in model_managers():
+        if manager.name == name:
+            return manager
+    raise HTTPException(status_code=404, detail=f"Model not served: {name}")
+
+
+@router.get("/")
+def list_models():
+    """
+    Get the versions served by this worker, with the previous version kept for rollback.
+    """
+    return [manager.status() for manager in model_managers()]
+
+
+@router.post("/{name}/refresh")
+def refresh_model(name: str):
+    """
+    Check for a new version now instead of waiting for the next poll; a new version is
+    loaded and warmed up before it is swapped in.
+    """
+    manager = _manager(name)
+    swapped = manager.refresh()
+    return {"swapped": swapped, **manager.status()}
+
+
+@router.post("/{name}/rollback")
+def rollback_model(name: str):
+    """
+    Serve the previous version again in this worker. To roll back every worker, move the
+    previous version back into the served registry stage instead.
+    """
+    manager = _manager(name)
+    try:
+        manager.rollback()
+    except ModelNotLoadedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return manager.status()
@@ -1,13 +1,76 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from hashiramart.api.schemas.recommendations import (
+    BatchRecommendationRequest,
+    BatchRecommendationResponse,
+    RecommendationResponse,
+)
+from hashiramart.config.settings import settings
+from hashiramart.domains.recommendations.cache import RecommendationCache, get_recommendation_cache
+from hashiramart.domains.recommendations.services import recommend_for_user
+from hashiramart.domains.recommendations.topk_index import TopKIndex, get_topk_index
 from hashiramart.infrastructure.database.connection import get_db
 from hashiramart.security.authentication import get_current_user
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
 
-@router.get("/me")
-def get_my_recommendations():
-    current_user: dict = get_current_user(get_db())
-    user_name = current_user.get("username")
-    # ... logic to generate recommendations for user_name
-    return {"user": user_name, "recommendations": [...]}
\ No newline at end of file
+
+def get_index() -> TopKIndex:
+    """Returns the top-K index, or a 503 until the offline build has produced one."""
+    try:
+        return get_topk_index()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Recommendation index is not available: {e}")
+
+
+@router.get("/me", response_model=RecommendationResponse)
+def get_my_recommendations(
+    limit: int = Query(10, ge=1),
+    category: Optional[str] = None,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+    cache: RecommendationCache = Depends(get_recommendation_cache),
+):
+    """
+    Get recommendations for the currently authenticated user, optionally within one category.
+    Users who interacted with products since the last index build are scored in real time.
+    Results are cached per user until the TTL expires or the user's interactions change.
+    """
+    try:
+        return cache.get_or_compute(
+            current_user.id, (limit, category), lambda: recommend_for_user(db, current_user, limit, category)
+        )
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Recommendation index is not available: {e}")
+
+
+@router.get("/users/{user_id}", response_model=RecommendationResponse)
+def get_user_recommendations(user_id: str, limit: int = Query(10, ge=1), index: TopKIndex = Depends(get_index)):
+    """
+    Get the precomputed recommendations of a user, by their ID in the training data.
+    """
+    return index.recommend(user_id, limit)
+
+
+@router.post("/batch", response_model=BatchRecommendationResponse)
+def get_batch_recommendations(request: BatchRecommendationRequest, index: TopKIndex = Depends(get_index)):
+    """
+    Get the precomputed recommendations of many users in one lookup.
+    """
+    if len(request.user_ids) > settings.RECOMMENDATION_BATCH_MAX_USERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.RECOMMENDATION_BATCH_MAX_USERS} users can be requested at once",
+        )
+    return {"results": index.recommend_many(request.user_ids, request.limit)}
+
+
+@router.get("/cache/stats")
+def get_cache_stats(cache: RecommendationCache = Depends(get_recommendation_cache)):
+    """
+    Get the hit ratio, size and eviction counters of this worker's recommendation cache.
+    """
+    return cache.stats()
@@ -1,17 +1,23 @@
-import requests
 import uuid
-from fastapi import APIRouter, HTTPException, status
+from typing import List
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from hashiramart.infrastructure.yarn.tracker import JobTracker, get_job_tracker
 
 router = APIRouter(prefix="/jobs", tags=["Spark Jobs"])
 
-# The internal address for the YARN ResourceManager's REST API
-YARN_API_URL = "http://resourcemanager:8088/ws/v1/cluster/apps"
 SPARK_SCRIPT_PATH = "/app/process_data.py"  # The path to your script in the spark-master container
+SPARK_PY_FILES = "/app/pipeline_config.py"  # Modules the script imports, shipped with it to the cluster
 
 
-def submit_spark_job(task_name: str):
+def build_spark_payload(task_name: str, incremental: bool = False) -> dict:
     """
-    Constructs a JSON payload and submits a Spark application to the YARN REST API.
+    Constructs the JSON payload the YARN REST API expects for a Spark application.
+
+    :param task_name: The get_data.py task, "recommender" or "forecasting".
+    :param incremental: Whether only raw files added since the last run are processed.
     """
     # This is the spark-submit command that YARN will execute on the cluster.
     # Note that it still runs your process_data.py script, which reads the yaml config.
@@ -19,12 +25,14 @@ def submit_spark_job(task_name: str):
         f"/opt/spark/bin/spark-submit "
         f"--master yarn "
         f"--deploy-mode cluster "
+        f"--py-files {SPARK_PY_FILES} "
         f"{SPARK_SCRIPT_PATH} "
-        f"--task {task_name}"
+        f"--task {task_name} "
+        f"--engine spark"
+        f"{' --incremental' if incremental else ''}"
     )
 
-    # This is the JSON payload that the YARN REST API expects
-    payload = {
+    return {
         "application-id": f"hashiramart-{task_name}-{uuid.uuid4()}",
         "application-name": f"HashiraMart-{task_name}-Processing",
         "am-container-spec": {
@@ -35,25 +43,75 @@ def submit_spark_job(task_name: str):
         "application-type": "SPARK"
     }
 
-    try:
-        response = requests.post(YARN_API_URL, json=payload, headers={'Content-Type': 'application/json'})
-        response.raise_for_status()
 
-        # YARN API returns a 202 Accepted on success and includes the app ID in the headers
-        app_id = response.headers.get('Location', '').split('/')[-1]
-        return {"message": f"{task_name.capitalize()} processing job submitted successfully.", "application_id": app_id}
+async def submit_spark_job(task_name: str, tracker: JobTracker, incremental: bool = False):
+    """
+    Submits a Spark application to YARN through the job tracker.
 
-    except requests.exceptions.RequestException as e:
+    A submission for a task whose previous application is still unfinished returns that
+    application instead of starting a second one. Both modes write the same output, so a
+    submission in the other mode (full rebuild vs incremental) is rejected with 409.
+    """
+    try:
+        job = await tracker.submit(
+            task_name, lambda: build_spark_payload(task_name, incremental), task_name=task_name, incremental=incremental
+        )
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Failed to submit job to YARN: {str(e)}")
 
+    if job["deduplicated"] and job.get("incremental") != incremental:
+        running = "an incremental run" if job.get("incremental") else "a full rebuild"
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{task_name.capitalize()} processing is already running as {running} ({job['application_id']}).",
+        )
+    if job["deduplicated"]:
+        message = f"{task_name.capitalize()} processing job is already running."
+    else:
+        message = f"{task_name.capitalize()} processing job submitted successfully."
+    return {"message": message, "application_id": job["application_id"], "deduplicated": job["deduplicated"]}
+
 
 @router.post("/process/recommender", status_code=status.HTTP_202_ACCEPTED)
-def process_recommender_data():
+async def process_recommender_data(incremental: bool = False, tracker: JobTracker = Depends(get_job_tracker)):
     """Submits a Spark job to clean data for the recommender model."""
-    return submit_spark_job(task_name="recommender")
+    return await submit_spark_job("recommender", tracker, incremental)
 
 
 @router.post("/process/forecasting", status_code=status.HTTP_202_ACCEPTED)
-def process_forecasting_data():
+async def process_forecasting_data(incremental: bool = False, tracker: JobTracker = Depends(get_job_tracker)):
     """Submits a Spark job to clean data for the forecasting model."""
-    return submit_spark_job(task_name="forecasting")
\ No newline at end of file
+    return await submit_spark_job("forecasting", tracker, incremental)
+
+
+@router.get("")
+async def list_jobs(tracker: JobTracker = Depends(get_job_tracker)):
+    """Lists the tracked jobs with their cached statuses, most recent first."""
+    return {"jobs": tracker.jobs()}
+
+
+@router.get("/status")
+async def job_statuses(
+        application_ids: List[str] = Query(..., description="The YARN application IDs to look up."),
+        tracker: JobTracker = Depends(get_job_tracker),
+):
+    """
+    Returns the statuses of many applications in one request, from the tracker's cache.
+    Unknown IDs are null.
+    """
+    try:
+        return {"statuses": await tracker.statuses(application_ids)}
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Error communicating with YARN: {e}")
+
+
+@router.get("/{application_id}")
+async def job_status(application_id: str, tracker: JobTracker = Depends(get_job_tracker)):
+    """Returns the cached status of one application."""
+    try:
+        job = (await tracker.statuses([application_id]))[application_id]
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Error communicating with YARN: {e}")
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Application {application_id} not found.")
+    return job
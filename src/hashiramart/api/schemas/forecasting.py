@@ -0,0 +1,28 @@
+from datetime import date
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+
+class SalesForecastPoint(BaseModel):
+    date: str  # YYYY-MM-DD
+    sales: float
+
+
+class SalesForecastResponse(BaseModel):
+    forecast_period_days: int
+    category: Optional[str] = None
+    start_date: str
+    total_sales: float
+    forecast: List[SalesForecastPoint]
+
+
+class BatchForecastRequest(BaseModel):
+    """
+    Products to forecast in one call: explicit product IDs, every product of some
+    categories, or both.
+    """
+    product_ids: Optional[List[str]] = None
+    categories: Optional[List[str]] = None
+    horizon: int = Field(30, ge=1)
+    start_date: Optional[date] = None  # the forecast cube's start date by default
+    format: Literal["ndjson", "arrow"] = "ndjson"
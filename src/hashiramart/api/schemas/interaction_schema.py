@@ -0,0 +1,25 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+# --- Base Schema ---
+class InteractionBase(BaseModel):
+    user_id: int
+    product_id: int
+    event_type: str
+
+# --- Create Schema ---
+class InteractionCreate(InteractionBase):
+    pass
+
+# --- Update Schema ---
+class InteractionUpdate(BaseModel):
+    event_type: Optional[str] = None
+
+# --- Read Schema ---
+class InteractionSchema(InteractionBase):
+    id: int
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal
+
+
+class RecommendedProduct(BaseModel):
+    product_id: str
+    score: float
+
+
+class RecommendationResponse(BaseModel):
+    user_id: str
+    # "personalized" from the precomputed index, "realtime" from the latest interactions,
+    # "popular" for users without any history
+    source: Literal["personalized", "realtime", "popular"]
+    recommendations: List[RecommendedProduct]
+
+
+class BatchRecommendationRequest(BaseModel):
+    """
+    Users to look up in one call, with their IDs as in the training data.
+    """
+    user_ids: List[str] = Field(..., min_length=1)
+    limit: int = Field(10, ge=1)
+
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[RecommendationResponse]
@@ -0,0 +1,53 @@
+import math
+
+from pydantic import BaseModel, field_validator
+from typing import Dict, List, Literal, Optional
+
+
+class RecommenderParams(BaseModel):
+    """
+    Parameters for the synthetic user-product purchase dataset.
+    """
+    num_users: int = 100
+    num_products: int = 50
+    avg_purchases_per_user: int = 10
+    max_purchases_per_user: Optional[int] = 20
+    start_date: Optional[str] = "01-01-2024"
+    end_date: Optional[str] = "31-12-2024"
+    categories: Optional[List[str]] = None
+    sparsity: float = 0.9  # fraction of no-purchase
+    popularity: Literal["uniform", "zipf"] = "uniform"  # product popularity distribution
+    popularity_exponent: float = 1.0  # Zipf exponent; product_0 is the most popular
+    category_weights: Optional[Dict[str, float]] = None  # e.g. {"category_0": 3.0}
+    seed: Optional[int] = 42
+    stream: bool = False  # write chunk by chunk to keep memory flat
+    workers: int = 1  # > 1 writes a sharded Parquet dataset directory from a process pool
+
+    @field_validator("category_weights")
+    @classmethod
+    def check_category_weights(cls, weights: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+        if weights:
+            if any(not math.isfinite(w) or w < 0 for w in weights.values()):
+                raise ValueError("category weights must be finite and non-negative")
+            if not any(w > 0 for w in weights.values()):
+                raise ValueError("at least one category weight must be positive")
+        return weights
+
+
+class ForecastingParams(BaseModel):
+    """
+    Parameters for the synthetic daily sales time-series dataset.
+    """
+    start_date: str = "01-01-2024"
+    end_date: str = "31-12-2024"
+    num_products: int = 50
+    categories: Optional[List[str]] = None
+    holidays: Optional[List[str]] = None
+    trend_strength: float = 1.0
+    seasonality_strength: float = 1.0
+    noise_level: float = 5.0
+    promotion_effect: float = 1.5
+    promotion_days: Optional[List[str]] = None
+    seed: Optional[int] = 42
+    stream: bool = False  # write chunk by chunk to keep memory flat
+    workers: int = 1  # > 1 writes a sharded Parquet dataset directory from a process pool
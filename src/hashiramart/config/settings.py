@@ -21,6 +21,47 @@ class Settings(BaseModel):
     AIRFLOW_LAST: str = os.getenv("AIRFLOW_LAST")
     AIRFLOW_EMAIL: str = os.getenv("AIRFLOW_EMAIL")
     AIRFLOW_PASS: str = os.getenv("AIRFLOW_PASS")
+    HDFS_API_URL: str = os.getenv("HDFS_API_URL", "http://namenode:9870/webhdfs/v1")
+    HDFS_USER: str = os.getenv("HDFS_USER", "root")
+    HDFS_CONNECT_TIMEOUT: float = float(os.getenv("HDFS_CONNECT_TIMEOUT", 5))
+    HDFS_READ_TIMEOUT: float = float(os.getenv("HDFS_READ_TIMEOUT", 60))
+    HDFS_MAX_CONNECTIONS: int = int(os.getenv("HDFS_MAX_CONNECTIONS", 32))
+    HDFS_MAX_RETRIES: int = int(os.getenv("HDFS_MAX_RETRIES", 3))
+    HDFS_RETRY_BACKOFF: float = float(os.getenv("HDFS_RETRY_BACKOFF", 0.2))
+    HDFS_LISTING_CACHE_TTL: float = float(os.getenv("HDFS_LISTING_CACHE_TTL", 5))
+    YARN_API_URL: str = os.getenv("YARN_API_URL", "http://resourcemanager:8088/ws/v1/cluster")
+    YARN_TIMEOUT: float = float(os.getenv("YARN_TIMEOUT", 10))
+    YARN_POLL_INTERVAL: float = float(os.getenv("YARN_POLL_INTERVAL", 5))
+    # Seconds a finished application, or one only looked up, stays in the job tracker
+    YARN_JOB_RETENTION: float = float(os.getenv("YARN_JOB_RETENTION", 3600))
+    RECOMMENDATION_INDEX_DIR: str = os.getenv("RECOMMENDATION_INDEX_DIR", "/data/models/topk_index")
+    RECOMMENDATION_BATCH_MAX_USERS: int = int(os.getenv("RECOMMENDATION_BATCH_MAX_USERS", 1000))
+    RECOMMENDATION_MATRIX_DIR: str = os.getenv("RECOMMENDATION_MATRIX_DIR", "/data/features/interactions")
+    RECOMMENDATION_HISTORY_LIMIT: int = int(os.getenv("RECOMMENDATION_HISTORY_LIMIT", 200))
+    RECOMMENDATION_SCORING_BLOCK: int = int(os.getenv("RECOMMENDATION_SCORING_BLOCK", 65536))
+    RECOMMENDATION_CACHE_TTL: float = float(os.getenv("RECOMMENDATION_CACHE_TTL", 60))
+    RECOMMENDATION_CACHE_MAX_ENTRIES: int = int(os.getenv("RECOMMENDATION_CACHE_MAX_ENTRIES", 10000))
+    FORECAST_CUBE_DIR: str = os.getenv("FORECAST_CUBE_DIR", "/data/models/forecast_cube")
+    FORECASTER_MODEL_PATH: str = os.getenv("FORECASTER_MODEL_PATH", "/data/models/forecaster.pkl")
+    RECOMMENDER_MODEL_PATH: str = os.getenv("RECOMMENDER_MODEL_PATH", "/data/models/recommender.pkl")
+    MODEL_SOURCE: str = os.getenv("MODEL_SOURCE", "local")  # "local" pickles or the "mlflow" registry
+    MLFLOW_TRACKING_URI: str = os.getenv("MLFLOW_TRACKING_URI", "http://mlflow:5000")
+    MLFLOW_MODEL_STAGE: str = os.getenv("MLFLOW_MODEL_STAGE", "Production")
+    MODEL_POLL_INTERVAL: float = float(os.getenv("MODEL_POLL_INTERVAL", 30))
+    SERVED_MODELS: str = os.getenv("SERVED_MODELS", "forecaster")  # comma-separated, loaded at startup
+    FORECAST_BATCH_CHUNK_PRODUCTS: int = int(os.getenv("FORECAST_BATCH_CHUNK_PRODUCTS", 1024))
+    FORECAST_BATCH_MAX_HORIZON: int = int(os.getenv("FORECAST_BATCH_MAX_HORIZON", 730))
+    MINIO_ENDPOINT: str = os.getenv("MINIO_ENDPOINT", "minio:9000")
+    MINIO_SECURE: bool = os.getenv("MINIO_SECURE", "false").lower() == "true"
+    ARTIFACT_CACHE_DIR: str = os.getenv("ARTIFACT_CACHE_DIR", "/data/artifact_cache")
+    ARTIFACT_CACHE_MAX_GB: float = float(os.getenv("ARTIFACT_CACHE_MAX_GB", 20))
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL")  # derived from DATABASE_URL if unset
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", 10))
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", 20))
+    DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", 30))
+    DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", 1800))
+    DATABASE_POOL_PRE_PING: bool = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+    DATABASE_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DATABASE_STATEMENT_TIMEOUT_MS", 0))  # 0 leaves the server's default
 
 
 
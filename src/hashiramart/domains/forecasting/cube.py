@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from hashiramart.config.settings import settings
+
+# Layout of the cube directory written by ml_pipelines/forecast_cube.py
+FORMAT_VERSION = 1
+FORECAST_FILE = "forecast.npy"
+CATEGORY_FORECAST_FILE = "category_forecast.npy"
+GLOBAL_FORECAST_FILE = "global_forecast.npy"
+PRODUCT_CATEGORIES_FILE = "product_categories.npy"
+PRODUCT_IDS_FILE = "product_ids.arrow"
+CATEGORY_IDS_FILE = "category_ids.arrow"
+META_FILE = "meta.json"
+
+
+def _read_dictionary(path: str) -> List[str]:
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().column(0).to_pylist()
+
+
+class ForecastCube:
+    """
+    Precomputed daily sales forecasts, served from memory-mapped files.
+
+    ``forecast`` is a dense (products, horizon) float32 array starting at ``start_date``;
+    the per-category and global series are precomputed sums of its rows. Any
+    (days, category) question is answered by slicing one row, with no model call.
+    """
+
+    def __init__(self, cube_dir: str):
+        """
+        :param cube_dir: A directory written by ml_pipelines/forecast_cube.py.
+        """
+        with open(os.path.join(cube_dir, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported forecast cube format: {self.meta.get('format_version')}")
+        self.horizon = self.meta["horizon"]
+        self.start_date = np.datetime64(self.meta["start_date"], "D")
+        self.forecast = np.load(os.path.join(cube_dir, FORECAST_FILE), mmap_mode="r")
+        self.category_forecast = np.load(os.path.join(cube_dir, CATEGORY_FORECAST_FILE), mmap_mode="r")
+        self.global_forecast = np.load(os.path.join(cube_dir, GLOBAL_FORECAST_FILE), mmap_mode="r")
+        self.product_categories = np.load(os.path.join(cube_dir, PRODUCT_CATEGORIES_FILE), mmap_mode="r")
+        self.product_ids = _read_dictionary(os.path.join(cube_dir, PRODUCT_IDS_FILE))
+        self.categories = _read_dictionary(os.path.join(cube_dir, CATEGORY_IDS_FILE))
+        self.category_codes = {name: code for code, name in enumerate(self.categories)}
+        self._product_codes = None
+
+    def product_code(self, product_id: str) -> Optional[int]:
+        """Returns the row of a product, or None if the forecaster does not know it."""
+        if self._product_codes is None:
+            self._product_codes = {value: code for code, value in enumerate(self.product_ids)}
+        return self._product_codes.get(product_id)
+
+    def dates(self, days: int) -> List[str]:
+        """Returns the first ``days`` forecast dates as YYYY-MM-DD strings."""
+        return (self.start_date + np.arange(days)).astype(str).tolist()
+
+    def series(self, days: int, category: Optional[str] = None) -> np.ndarray:
+        """
+        Returns the forecast total sales of the first ``days`` days, of one category or of all products.
+
+        :raises KeyError: If the category has no products in the cube.
+        :raises ValueError: If ``days`` exceeds the cube's horizon.
+        """
+        if not 1 <= days <= self.horizon:
+            raise ValueError(f"days must be between 1 and {self.horizon}")
+        if category is None:
+            return np.asarray(self.global_forecast[:days])
+        return np.asarray(self.category_forecast[self.category_codes[category], :days])
+
+    def sales_forecast(self, days: int, category: Optional[str] = None) -> Dict[str, Any]:
+        """Returns a forecast series with its dates and total, as served by /forecasts/sales."""
+        values = self.series(days, category)
+        return {
+            "forecast_period_days": days,
+            "category": category,
+            "start_date": str(self.start_date),
+            "total_sales": float(values.sum(dtype=np.float64)),
+            "forecast": [
+                {"date": date, "sales": float(value)} for date, value in zip(self.dates(days), values)
+            ],
+        }
+
+
+_forecast_cube: Optional[ForecastCube] = None
+_forecast_cube_version = None
+_forecast_cube_lock = threading.Lock()
+
+
+def get_forecast_cube() -> ForecastCube:
+    """
+    A FastAPI dependency returning the process-wide forecast cube, reopened when the
+    forecaster stage has swapped in a new one.
+
+    :raises OSError: If no cube has been built at ``FORECAST_CUBE_DIR`` yet.
+    """
+    global _forecast_cube, _forecast_cube_version
+    # The directory is a link to the current version; resolved once, so a load reads one version
+    directory = os.path.realpath(settings.FORECAST_CUBE_DIR)
+    stat = os.stat(os.path.join(directory, META_FILE))
+    version = (stat.st_ino, stat.st_mtime_ns)
+    if version != _forecast_cube_version:
+        with _forecast_cube_lock:
+            if version != _forecast_cube_version:
+                _forecast_cube = ForecastCube(directory)
+                _forecast_cube_version = version
+                print(f"Loaded the forecast cube starting {_forecast_cube.start_date}")
+    return _forecast_cube
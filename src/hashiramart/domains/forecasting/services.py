@@ -0,0 +1,161 @@
+import json
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+from hashiramart.domains.forecasting.cube import ForecastCube
+from hashiramart.ml.mlflow_client import ModelManager, get_model_manager
+
+# The forecaster's feature columns, built as ml_pipelines/forecast_features.py builds them
+# for the offline forecast cube; product_code is the product's row in the forecast cube
+FEATURE_COLUMNS = ["product_code", "year", "month", "day_of_week", "day_of_year"]
+
+FORECAST_SCHEMA = pa.schema([
+    ("product_id", pa.string()),
+    ("category", pa.string()),
+    ("date", pa.date32()),
+    ("sales", pa.float32()),
+])
+
+
+def calendar_features(dates: np.ndarray) -> np.ndarray:
+    """
+    Computes year, month, day_of_week (Sunday = 1) and day_of_year of datetime64[D] dates,
+    as get_data.py does for training.
+
+    :return: An int32 (len(dates), 4) array.
+    """
+    days = dates.astype("datetime64[D]")
+    years = days.astype("datetime64[Y]")
+    return np.column_stack([
+        years.astype(np.int64) + 1970,
+        days.astype("datetime64[M]").astype(np.int64) % 12 + 1,
+        # 1970-01-01 was a Thursday, day 5 when counting from Sunday = 1
+        (days.astype(np.int64) + 4) % 7 + 1,
+        (days - years).astype(np.int64) + 1,
+    ]).astype(np.int32)
+
+
+def feature_matrix(product_codes: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    """
+    Builds one feature row per (product, date) pair, product-major.
+
+    :return: A float32 (len(product_codes) * len(dates), len(FEATURE_COLUMNS)) array.
+    """
+    calendar = calendar_features(dates)
+    matrix = np.empty((len(product_codes) * len(dates), len(FEATURE_COLUMNS)), dtype=np.float32)
+    matrix[:, 0] = np.repeat(product_codes, len(dates))
+    matrix[:, 1:] = np.tile(calendar, (len(product_codes), 1))
+    return matrix
+
+
+def resolve_products(
+    cube: ForecastCube,
+    product_ids: Optional[Sequence[str]] = None,
+    categories: Optional[Sequence[str]] = None,
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Turns requested product IDs and categories into product codes, without duplicates.
+
+    :return: The sorted product codes and the requested product IDs or categories that
+        are unknown to the forecaster.
+    """
+    codes, unknown = [], []
+    if product_ids:
+        found = [cube.product_code(product_id) for product_id in product_ids]
+        unknown += [product_id for product_id, code in zip(product_ids, found) if code is None]
+        codes.append(np.array([code for code in found if code is not None], dtype=np.int64))
+    for category in categories or ():
+        if category in cube.category_codes:
+            codes.append(np.flatnonzero(cube.product_categories == cube.category_codes[category]))
+        else:
+            unknown.append(category)
+    return (np.unique(np.concatenate(codes)) if codes else np.empty(0, dtype=np.int64)), unknown
+
+
+def predict_batch(model: Any, product_codes: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    """
+    Forecasts every product for every date with a single model call.
+
+    :return: A float32 (len(product_codes), len(dates)) array.
+    """
+    predictions = np.asarray(model.predict(feature_matrix(product_codes, dates)), dtype=np.float32)
+    return predictions.reshape(len(product_codes), len(dates))
+
+
+def iter_forecast_chunks(
+    model: Any,
+    cube: ForecastCube,
+    product_codes: np.ndarray,
+    dates: np.ndarray,
+    chunk_products: int,
+) -> Iterator[pa.Table]:
+    """
+    Forecasts products ``chunk_products`` at a time, one model call per chunk, and yields
+    each chunk in long format (one row per product and date, see FORECAST_SCHEMA).
+    """
+    for start in range(0, len(product_codes), chunk_products):
+        codes = product_codes[start:start + chunk_products]
+        sales = predict_batch(model, codes, dates)
+        product_ids = pa.array([cube.product_ids[code] for code in codes], type=pa.string())
+        categories = pa.array([cube.categories[code] for code in cube.product_categories[codes]], type=pa.string())
+        rows = pa.array(np.repeat(np.arange(len(codes)), len(dates)))
+        yield pa.Table.from_arrays([
+            product_ids.take(rows),
+            categories.take(rows),
+            pa.array(np.tile(dates.astype("datetime64[D]"), len(codes)), type=pa.date32()),
+            pa.array(sales.ravel(), type=pa.float32()),
+        ], schema=FORECAST_SCHEMA)
+
+
+def iter_ndjson(chunks: Iterator[pa.Table], horizon: int) -> Iterator[bytes]:
+    """
+    Encodes forecast chunks as newline-delimited JSON, one line per product with its
+    first forecast date and its daily forecasts.
+    """
+    for chunk in chunks:
+        firsts = pa.array(np.arange(0, chunk.num_rows, horizon))
+        heads = chunk.take(firsts)
+        sales = chunk["sales"].to_numpy().reshape(-1, horizon)
+        yield "".join(
+            json.dumps({
+                "product_id": product_id,
+                "category": category,
+                "start_date": start_date.isoformat(),
+                "forecast": values.tolist(),
+            }) + "\n"
+            for product_id, category, start_date, values in zip(
+                heads["product_id"].to_pylist(), heads["category"].to_pylist(), heads["date"].to_pylist(), sales
+            )
+        ).encode("utf-8")
+
+
+# Synthetic batch a new forecaster version must predict before it is served
+_WARMUP_PRODUCTS = 8
+_WARMUP_DAYS = 30
+
+
+def warmup_forecaster(model: Any) -> None:
+    """
+    Runs a synthetic batch through a newly loaded forecaster, so the first real request
+    does not pay for lazy initialization, and rejects models returning unusable values.
+    """
+    dates = np.datetime64("today", "D") + np.arange(_WARMUP_DAYS)
+    predictions = predict_batch(model, np.arange(_WARMUP_PRODUCTS), dates)
+    if not np.all(np.isfinite(predictions)):
+        raise ValueError("The forecaster returned non-finite values for the warmup batch")
+
+
+def get_forecaster_manager() -> ModelManager:
+    """Returns the manager serving the forecaster model."""
+    return get_model_manager("forecaster", warmup_forecaster)
+
+
+def get_forecaster() -> Any:
+    """
+    Returns the forecaster version currently served.
+
+    :raises ModelNotLoadedError: If no version could be loaded.
+    """
+    return get_forecaster_manager().get()
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from hashiramart.config.settings import settings
+from hashiramart.infrastructure.database.model.interaction import Interaction
+
+_Key = Tuple[Any, Hashable]
+
+
+class RecommendationCache:
+    """
+    An LRU cache of recommendation results with a TTL, keyed by user plus a variant
+    (e.g. the limit and category of the request).
+
+    Concurrent misses for the same key are coalesced: the first caller computes the
+    result while the others wait for it, so a burst of identical requests runs the
+    recommender once. ``invalidate_user`` drops a user's entries, and also keeps a
+    computation that was already running from caching its now stale result.
+
+    The cache lives in one process; entries of other workers expire after ``ttl``.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        """
+        :param ttl: Seconds a result is served from the cache.
+        :param max_entries: The number of results kept; the least recently used are evicted first.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_Key, Tuple[float, Any]]" = OrderedDict()
+        self._keys_by_user: Dict[Any, Set[_Key]] = {}
+        self._in_flight: Dict[_Key, Future] = {}
+        # In-flight keys invalidated while computing, whose result must not be cached;
+        # bounded by the number of computations running
+        self._stale: Set[_Key] = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, user_id: Any, variant: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result for (user, variant), or computes and caches it.
+
+        :param compute: Produces the result; called at most once per key at a time.
+            Its exceptions reach every waiting caller and nothing is cached.
+        """
+        key = (user_id, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+                self.expirations += 1
+            waiting = self._in_flight.get(key)
+            if waiting is None:
+                self.misses += 1
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+                self._stale.discard(key)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            stale = key in self._stale
+            self._stale.discard(key)
+            if self.ttl > 0 and not stale:
+                self._put(key, value)
+        future.set_result(value)
+        return value
+
+    def invalidate_user(self, user_id: Any) -> None:
+        """Drops every cached result of a user, and any result being computed for them."""
+        with self._lock:
+            self._stale.update(key for key in self._in_flight if key[0] == user_id)
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the hit ratio, size and eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                # Coalesced callers did not compute, so they count as hits here
+                "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "in_flight": len(self._in_flight),
+            }
+
+    def _put(self, key: _Key, value: Any) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._keys_by_user.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: _Key) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+
+_recommendation_cache: Optional[RecommendationCache] = None
+_recommendation_cache_lock = threading.Lock()
+
+
+def get_recommendation_cache() -> RecommendationCache:
+    """
+    A FastAPI dependency returning the process-wide recommendation cache.
+    """
+    global _recommendation_cache
+    if _recommendation_cache is None:
+        with _recommendation_cache_lock:
+            if _recommendation_cache is None:
+                _recommendation_cache = RecommendationCache(
+                    settings.RECOMMENDATION_CACHE_TTL, settings.RECOMMENDATION_CACHE_MAX_ENTRIES
+                )
+    return _recommendation_cache
+
+
+# --- Invalidation on new interactions ---
+# Users whose interactions a session has flushed are collected in session.info and
+# invalidated once the transaction commits, so a recommendation computed in between
+# cannot be cached from data the commit is about to change.
+
+_PENDING_USERS = "recommendation_cache_pending_users"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_interaction_users(session: Session, flush_context: Any) -> None:
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    users = {obj.user_id for obj in changed if isinstance(obj, Interaction)}
+    if users:
+        session.info.setdefault(_PENDING_USERS, set()).update(users)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_interaction_users(session: Session) -> None:
+    users = session.info.pop(_PENDING_USERS, None)
+    if users and _recommendation_cache is not None:
+        for user_id in users:
+            _recommendation_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_interaction_users(session: Session) -> None:
+    session.info.pop(_PENDING_USERS, None)
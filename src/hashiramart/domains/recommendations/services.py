@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+from sqlalchemy.orm import Session
+
+from hashiramart.config.settings import settings
+from hashiramart.domains.recommendations.topk_index import (
+    get_topk_index,
+    index_product_id,
+    index_user_id,
+    lookup_sorted_keys,
+)
+from hashiramart.infrastructure.database.repositories.interaction_repo import InteractionRepository
+from hashiramart.infrastructure.database.repositories.product_repo import ProductRepository
+from hashiramart.ml.mlflow_client import ModelManager, get_model_manager
+
+# Files of the interaction matrix artifact written by ml_pipelines/interaction_matrix.py
+ITEM_VECTORS_FILE = "item_vectors.npy"
+INDICES_FILE = "indices.npy"
+DATA_FILE = "data.npy"
+PRODUCT_IDS_FILE = "product_ids.arrow"
+META_FILE = "meta.json"
+
+
+class ItemSimilarityEngine:
+    """
+    Real-time item-item recommendations from unit-length item vectors.
+
+    A user is represented by the sum of the vectors of the products they interacted
+    with; candidates are scored against it one block of items at a time, with one
+    matrix-vector product and one ``argpartition`` per block, so memory stays bounded
+    by the block size whatever the catalog size.
+    """
+
+    def __init__(self, vectors: np.ndarray, product_ids: pa.Array, popularity: np.ndarray, block_size: int = 65536):
+        """
+        :param vectors: A (products, dim) float32 array of unit-length item vectors.
+        :param product_ids: The product ID of every row, sorted.
+        :param popularity: The total rating of every product, for users without history.
+        :param block_size: Items scored per matrix product.
+        """
+        self.vectors = vectors
+        self.product_ids = product_ids
+        self.popularity = popularity
+        self.block_size = block_size
+        self.product_keys = np.array([value.encode("utf-8") for value in product_ids.to_pylist()], dtype=np.bytes_)
+
+    @classmethod
+    def from_artifact(cls, artifact_dir: str, block_size: int = 65536) -> "ItemSimilarityEngine":
+        """Opens the item vectors of an interaction matrix artifact, memory-mapped."""
+        with open(os.path.join(artifact_dir, META_FILE)) as f:
+            meta = json.load(f)
+        vectors = np.load(os.path.join(artifact_dir, ITEM_VECTORS_FILE), mmap_mode="r")
+        source = pa.memory_map(os.path.join(artifact_dir, PRODUCT_IDS_FILE))
+        product_ids = pa.ipc.open_file(source).read_all().column(0)
+        indices = np.load(os.path.join(artifact_dir, INDICES_FILE), mmap_mode="r")
+        data = np.load(os.path.join(artifact_dir, DATA_FILE), mmap_mode="r")
+        popularity = np.bincount(indices, weights=data, minlength=meta["num_products"]).astype(np.float32)
+        return cls(vectors, product_ids, popularity, block_size)
+
+    def product_indices(self, product_ids: List[str]) -> np.ndarray:
+        """Returns the row of every product, or -1 for products without a vector."""
+        return lookup_sorted_keys(self.product_keys, product_ids)
+
+    def profile(self, items: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Returns the unit-length query vector of a user who interacted with ``items``."""
+        history = np.asarray(self.vectors[items], dtype=np.float32)
+        query = history.sum(axis=0) if weights is None else weights.astype(np.float32) @ history
+        norm = np.linalg.norm(query)
+        return query / norm if norm > 0 else query
+
+    def top_k(
+        self,
+        query: np.ndarray,
+        k: int,
+        candidates: Optional[np.ndarray] = None,
+        exclude: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k items most similar to a query vector.
+
+        :param query: A (dim,) query vector.
+        :param k: The number of items to return.
+        :param candidates: The rows to score, e.g. one category; all items if None.
+        :param exclude: Rows never to return, e.g. the user's own history.
+        :return: The rows and cosine scores of the best items, best first.
+        """
+        return self._select(lambda rows: self.vectors[rows] @ query, k, candidates, exclude)
+
+    def popular(self, k: int, candidates: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Finds the k most bought items, among ``candidates`` if given."""
+        return self._select(lambda rows: self.popularity[rows], k, candidates, None)
+
+    def _select(self, score_rows, k, candidates, exclude):
+        exclude = np.unique(exclude) if exclude is not None else np.empty(0, dtype=np.int64)
+        # Keep enough per block that excluded items dropped at the end still leave k
+        keep = k + len(exclude)
+        total = len(self.vectors) if candidates is None else len(candidates)
+        best_rows, best_scores = [], []
+        for start in range(0, total, self.block_size):
+            stop = min(start + self.block_size, total)
+            rows = np.arange(start, stop) if candidates is None else candidates[start:stop]
+            scores = score_rows(slice(start, stop) if candidates is None else rows)
+            if len(scores) > keep:
+                part = np.argpartition(-scores, keep - 1)[:keep]
+                rows, scores = rows[part], scores[part]
+            best_rows.append(rows)
+            best_scores.append(scores)
+
+        if not best_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        rows, scores = np.concatenate(best_rows), np.concatenate(best_scores)
+        allowed = ~np.isin(rows, exclude)
+        rows, scores = rows[allowed], scores[allowed]
+        if len(scores) > k:
+            part = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[part], scores[part]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def labels(self, rows: np.ndarray) -> List[str]:
+        """Returns the product IDs of rows."""
+        return self.product_ids.take(pa.array(rows, type=pa.int64())).to_pylist()
+
+
+_similarity_engine: Optional[ItemSimilarityEngine] = None
+_similarity_engine_version = None
+_similarity_engine_lock = threading.Lock()
+
+
+def get_similarity_engine() -> ItemSimilarityEngine:
+    """
+    Returns the process-wide item similarity engine, reopened when the interaction
+    matrix stage has written a new artifact.
+
+    :raises OSError: If there is no artifact at ``RECOMMENDATION_MATRIX_DIR`` yet.
+    """
+    global _similarity_engine, _similarity_engine_version
+    # The directory is a link to the current version; resolved once, so a load reads one version
+    directory = os.path.realpath(settings.RECOMMENDATION_MATRIX_DIR)
+    stat = os.stat(os.path.join(directory, META_FILE))
+    version = (stat.st_ino, stat.st_mtime_ns)
+    if version != _similarity_engine_version:
+        with _similarity_engine_lock:
+            if version != _similarity_engine_version:
+                _similarity_engine = ItemSimilarityEngine.from_artifact(
+                    directory, settings.RECOMMENDATION_SCORING_BLOCK
+                )
+                _similarity_engine_version = version
+                print(f"Loaded item vectors for {len(_similarity_engine.vectors)} products")
+    return _similarity_engine
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    # Interaction timestamps are stored without a timezone, in UTC
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
+
+def recommend_realtime(db: Session, user: Any, limit: int = 10, category: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Scores the catalog for a user from their latest interactions.
+
+    :param db: The database session.
+    :param user: The User instance.
+    :param limit: The number of products to return.
+    :param category: Only recommend products of this category.
+    :return: A {"user_id", "source", "recommendations"} entry; ``source`` is "realtime",
+        or "popular" when none of the user's products has a vector yet.
+    """
+    engine = get_similarity_engine()
+    interactions = InteractionRepository().get_recent_by_user(
+        db, user_id=user.id, limit=settings.RECOMMENDATION_HISTORY_LIMIT
+    )
+    history = engine.product_indices([index_product_id(i.product_id) for i in interactions])
+    history = history[history >= 0]
+
+    candidates = None
+    if category is not None:
+        product_ids = ProductRepository().get_ids_by_category(db, category=category)
+        candidates = engine.product_indices([index_product_id(product_id) for product_id in product_ids])
+        candidates = np.unique(candidates[candidates >= 0])
+
+    if len(history):
+        rows, scores = engine.top_k(engine.profile(history), limit, candidates, exclude=history)
+        source = "realtime"
+    else:
+        rows, scores = engine.popular(limit, candidates)
+        source = "popular"
+
+    return {
+        "user_id": index_user_id(user),
+        "source": source,
+        "recommendations": [
+            {"product_id": product_id, "score": float(score)}
+            for product_id, score in zip(engine.labels(rows), scores)
+        ],
+    }
+
+
+def recommend_for_user(db: Session, user: Any, limit: int = 10, category: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Recommends products to a user from the precomputed top-K index, or scores them in
+    real time when a category is requested or the user has interacted with products
+    since the index was built.
+    """
+    index = get_topk_index()
+    if category is None:
+        latest = InteractionRepository().get_recent_by_user(db, user_id=user.id, limit=1)
+        built_at = datetime.fromisoformat(index.meta["built_at"])
+        if not latest or _as_utc(latest[0].timestamp) <= built_at:
+            return index.recommend(index_user_id(user), limit)
+    return recommend_realtime(db, user, limit, category)
+
+
+def warmup_recommender(model: Any) -> None:
+    """
+    Scores a synthetic batch of users with a newly loaded recommender (the
+    ``model.score(dense_user_ids)`` contract of ml_pipelines/topk_index.py) and rejects
+    models returning unusable scores.
+    """
+    scores = np.asarray(model.score(np.zeros(8, dtype=np.int32)), dtype=np.float32)
+    if scores.ndim != 2 or not np.all(np.isfinite(scores)):
+        raise ValueError("The recommender returned unusable scores for the warmup batch")
+
+
+def get_recommender_manager() -> ModelManager:
+    """Returns the manager serving the recommender model."""
+    return get_model_manager("recommender", warmup_recommender)
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from hashiramart.config.settings import settings
+
+# Layout of the index directory written by ml_pipelines/topk_index.py
+FORMAT_VERSION = 1
+PRODUCTS_FILE = "topk_products.npy"
+SCORES_FILE = "topk_scores.npy"
+USER_KEYS_FILE = "user_keys.npy"
+POPULAR_PRODUCTS_FILE = "popular_products.npy"
+POPULAR_SCORES_FILE = "popular_scores.npy"
+PRODUCT_IDS_FILE = "product_ids.arrow"
+META_FILE = "meta.json"
+PAD = -1
+
+
+def lookup_sorted_keys(keys: np.ndarray, values: List[str]) -> np.ndarray:
+    """
+    Finds strings in a sorted fixed-width bytes array with one vectorized binary search.
+
+    :return: The position of every value in ``keys``, or -1 where it is missing.
+    """
+    if not len(keys) or not values:
+        return np.full(len(values), -1, dtype=np.int64)
+    encoded = [value.encode("utf-8") for value in values]
+    needles = np.array(encoded, dtype=keys.dtype)
+    positions = np.searchsorted(keys, needles)
+    found = np.minimum(positions, len(keys) - 1)
+    hit = (positions < len(keys)) & (keys[found] == needles)
+    # Values longer than the keys' fixed width were truncated above and cannot match
+    hit &= np.array([len(value) <= keys.dtype.itemsize for value in encoded], dtype=bool)
+    return np.where(hit, positions, -1)
+
+
+def index_user_id(user: Any) -> str:
+    """Returns the user ID a database user has in the training data ("user_{id}", as in the synthetic datasets)."""
+    return f"user_{user.id}"
+
+
+def index_product_id(product_id: int) -> str:
+    """Returns the product ID a database product has in the training data ("product_{id}")."""
+    return f"product_{product_id}"
+
+
+class TopKIndex:
+    """
+    Precomputed top-K products of every known user, served from memory-mapped files.
+
+    Row ``u`` of the (users, k) product and score arrays holds the recommendations of the
+    user with dense ID ``u``, so a lookup is one binary search over the sorted user keys
+    plus one row read, with no model on the request path. Every worker maps the same
+    files, so they share one copy in the page cache. Unknown users get the most popular
+    products instead.
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        :param index_dir: A directory written by ml_pipelines/topk_index.py.
+        """
+        with open(os.path.join(index_dir, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported top-K index format: {self.meta.get('format_version')}")
+        self.k = self.meta["k"]
+        self.products = np.load(os.path.join(index_dir, PRODUCTS_FILE), mmap_mode="r")
+        self.scores = np.load(os.path.join(index_dir, SCORES_FILE), mmap_mode="r")
+        self.user_keys = np.load(os.path.join(index_dir, USER_KEYS_FILE), mmap_mode="r")
+        self.popular_products = np.load(os.path.join(index_dir, POPULAR_PRODUCTS_FILE))
+        self.popular_scores = np.load(os.path.join(index_dir, POPULAR_SCORES_FILE))
+        source = pa.memory_map(os.path.join(index_dir, PRODUCT_IDS_FILE))
+        self.product_ids = pa.ipc.open_file(source).read_all().column(0)
+
+    def user_indices(self, user_ids: List[str]) -> np.ndarray:
+        """Returns the dense ID of every user, or -1 for users missing from the index."""
+        return lookup_sorted_keys(self.user_keys, user_ids)
+
+    def recommend_many(self, user_ids: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Looks up the recommendations of many users with one gather over the index.
+
+        :param user_ids: User IDs as in the training data.
+        :param limit: Products per user; at most the index's k.
+        :return: One {"user_id", "source", "recommendations"} entry per user, in order;
+            ``source`` is "personalized" or "popular".
+        """
+        limit = max(1, min(limit, self.k))
+        if not user_ids:
+            return []
+        dense = self.user_indices(user_ids)
+        known = dense >= 0
+        products = np.empty((len(user_ids), limit), dtype=np.int32)
+        scores = np.empty((len(user_ids), limit), dtype=np.float32)
+        products[known] = self.products[dense[known], :limit]
+        scores[known] = self.scores[dense[known], :limit]
+        popular = self.popular_products[:limit]
+        products[~known, :len(popular)] = popular
+        products[~known, len(popular):] = PAD
+        scores[~known, :len(popular)] = self.popular_scores[:limit]
+
+        # Users without a single personalized product fall back to popularity as well
+        empty = known & (products[:, 0] == PAD)
+        products[empty, :len(popular)] = popular
+        scores[empty, :len(popular)] = self.popular_scores[:limit]
+
+        labels = self.product_ids.take(pa.array(np.maximum(products, 0).ravel())).to_pylist()
+        results = []
+        for row, user_id in enumerate(user_ids):
+            offset = row * limit
+            results.append({
+                "user_id": user_id,
+                "source": "personalized" if known[row] and not empty[row] else "popular",
+                "recommendations": [
+                    {"product_id": labels[offset + i], "score": float(scores[row, i])}
+                    for i in range(limit) if products[row, i] != PAD
+                ],
+            })
+        return results
+
+    def recommend(self, user_id: str, limit: int = 10) -> Dict[str, Any]:
+        """Looks up the recommendations of one user; see ``recommend_many``."""
+        return self.recommend_many([user_id], limit)[0]
+
+
+_topk_index: Optional[TopKIndex] = None
+_topk_index_version = None
+_topk_index_lock = threading.Lock()
+
+
+def get_topk_index() -> TopKIndex:
+    """
+    A FastAPI dependency returning the process-wide top-K index.
+
+    The index is reopened when the build stage has swapped in a new one, which is
+    detected from the metadata file's inode and modification time.
+
+    :raises OSError: If no index has been built at ``RECOMMENDATION_INDEX_DIR`` yet.
+    """
+    global _topk_index, _topk_index_version
+    # The directory is a link to the current version; resolved once, so a load reads one version
+    directory = os.path.realpath(settings.RECOMMENDATION_INDEX_DIR)
+    stat = os.stat(os.path.join(directory, META_FILE))
+    version = (stat.st_ino, stat.st_mtime_ns)
+    if version != _topk_index_version:
+        with _topk_index_lock:
+            if version != _topk_index_version:
+                _topk_index = TopKIndex(directory)
+                _topk_index_version = version
+                print(f"Loaded the top-K index built at {_topk_index.meta.get('built_at')}")
+    return _topk_index
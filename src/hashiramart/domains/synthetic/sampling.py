@@ -0,0 +1,132 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+from hashiramart.api.schemas.synthetic_schema import RecommenderParams
+
+
+# Scaled weights this close to 1 are treated as exactly full columns; summing in floating
+# point can otherwise leave every column just under 1 with no over-full column to borrow from
+_FULL_COLUMN_TOLERANCE = 1e-9
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table for drawing from a fixed discrete distribution in O(1) per draw.
+
+    Every column ``i`` keeps item ``i`` with probability ``keep[i]`` and otherwise yields
+    ``alias[i]``, so a draw is one uniform column pick plus one coin flip.
+    """
+
+    def __init__(self, weights: np.ndarray):
+        """
+        Builds the table with whole-array operations instead of the usual small/large work queues.
+
+        The deficits of the under-full columns are laid end to end and filled from the
+        excesses of the over-full columns, also laid end to end. A deficit is aliased to the
+        over-full column whose excess range it starts in; an over-full column whose range ends
+        inside a deficit gives away more than its excess and is itself topped up by the next
+        over-full column.
+
+        :param weights: Non-negative weights, one per item; they do not need to sum to 1.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        num_items = len(weights)
+        if num_items == 0 or not np.all(np.isfinite(weights)) or np.any(weights < 0) or not weights.sum() > 0:
+            raise ValueError("An alias table needs finite, non-negative weights with at least one positive.")
+
+        scaled = weights * (num_items / weights.sum())
+        small = np.flatnonzero(scaled < 1.0 - _FULL_COLUMN_TOLERANCE)
+        large = np.flatnonzero(scaled >= 1.0 - _FULL_COLUMN_TOLERANCE)
+
+        self.keep = np.ones(num_items)
+        self.alias = np.arange(num_items, dtype=np.int64)
+        self.keep[small] = scaled[small]
+
+        # An empty ``large`` only happens through rounding; every column is then full
+        if len(small) and len(large):
+            deficit = 1.0 - scaled[small]
+            deficit_end = np.cumsum(deficit)
+            deficit_start = deficit_end - deficit
+            excess_end = np.cumsum(scaled[large] - 1.0)
+
+            # 1. Each under-full column borrows from the over-full column its deficit starts in
+            donor = np.minimum(np.searchsorted(excess_end, deficit_start, side="right"), len(large) - 1)
+            self.alias[small] = large[donor]
+
+            # 2. Over-full columns whose excess runs out mid-deficit are topped up by the next one
+            straddled = np.minimum(np.searchsorted(deficit_end, excess_end, side="right"), len(small) - 1)
+            overdrawn = np.maximum(deficit_end[straddled] - excess_end, 0.0)
+            overdrawn[deficit_start[straddled] >= excess_end] = 0.0
+            next_large = large[np.minimum(np.arange(1, len(large) + 1), len(large) - 1)]
+            self.keep[large] = np.clip(1.0 - overdrawn, 0.0, 1.0)
+            self.alias[large] = np.where(overdrawn > 0.0, next_large, large)
+
+    def __len__(self) -> int:
+        return len(self.keep)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """
+        Draws ``size`` item indices.
+
+        :param rng: The random generator to draw from.
+        :param size: The number of draws.
+        :return: An int32 array of item indices.
+        """
+        column = rng.integers(0, len(self.keep), size)
+        keep = rng.random(size) < self.keep[column]
+        return np.where(keep, column, self.alias[column]).astype(np.int32)
+
+
+def popularity_weights(
+        num_products: int,
+        popularity: str,
+        exponent: float,
+        category_weights: Optional[Dict[str, float]],
+        num_categories: int,
+) -> Optional[np.ndarray]:
+    """
+    Computes the relative purchase weight of every product.
+
+    Under "zipf" the product at index ``i`` has popularity rank ``i``, so ``product_0`` is
+    the best seller. Category weights multiply the weight of every product in that
+    category; categories that are not listed keep a weight of 1.
+
+    :return: The weights, or None when products are uniformly popular.
+    :raises ValueError: If a category weight is negative or no product has a positive weight.
+    """
+    if popularity == "uniform" and not category_weights:
+        return None
+
+    if popularity == "zipf":
+        weights = np.arange(1, num_products + 1, dtype=np.float64) ** -exponent
+    else:
+        weights = np.ones(num_products)
+
+    if category_weights:
+        per_category = np.array([category_weights.get(f"category_{i}", 1.0) for i in range(num_categories)])
+        if np.any(per_category < 0):
+            raise ValueError("Category weights must not be negative.")
+        weights *= per_category[np.arange(num_products) % num_categories]
+
+    if not weights.sum() > 0:
+        raise ValueError("At least one product needs a positive purchase weight.")
+    return weights
+
+
+def product_sampler(params: RecommenderParams, num_categories: int) -> Optional[AliasTable]:
+    """
+    Builds the alias table for the product popularity of a recommender request.
+
+    :param params: The synthetic recommender request.
+    :param num_categories: The number of synthetic product categories.
+    :return: The alias table, or None when products should be drawn uniformly.
+    """
+    weights = popularity_weights(
+        params.num_products,
+        params.popularity,
+        params.popularity_exponent,
+        params.category_weights,
+        num_categories,
+    )
+    return None if weights is None else AliasTable(weights)
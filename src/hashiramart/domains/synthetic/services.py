@@ -0,0 +1,398 @@
+import glob
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from hashiramart.api.schemas.synthetic_schema import RecommenderParams, ForecastingParams
+from hashiramart.domains.synthetic.sampling import AliasTable, product_sampler
+
+# Products are spread round-robin over this many synthetic categories
+NUM_CATEGORIES = 5
+
+# Identifier columns are dictionary-encoded in memory: one small label array
+# plus int32 indices instead of one Python string per row.
+_LABEL_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+RECOMMENDER_SCHEMA = pa.schema([
+    ("user_id", _LABEL_TYPE),
+    ("product_id", _LABEL_TYPE),
+    ("category", _LABEL_TYPE),
+    ("purchase_date", pa.timestamp("ns")),
+    ("quantity", pa.int64()),
+])
+
+FORECASTING_SCHEMA = pa.schema([
+    ("date", pa.timestamp("ns")),
+    ("product_id", _LABEL_TYPE),
+    ("category", _LABEL_TYPE),
+    ("sales", pa.float64()),
+])
+
+# Number of random holidays and (non-holiday) promotion days in a forecasting calendar
+NUM_HOLIDAYS = 10
+NUM_PROMOTION_DAYS = 15
+
+# Generation unit: every chunk draws from its own child seed, so a dataset is
+# the same whether it is built in one go or streamed chunk by chunk.
+RECOMMENDER_CHUNK_USERS = 100_000
+FORECASTING_CHUNK_PRODUCTS = 500
+
+
+def parse_date(value: str) -> pd.Timestamp:
+    """
+    Parses a dd-mm-yyyy date string as used by the synthetic request schemas.
+    """
+    return pd.to_datetime(value, format='%d-%m-%Y')
+
+
+def id_labels(prefix: str, start: int, stop: int) -> pa.Array:
+    """
+    Builds the string labels ``{prefix}_{start}`` .. ``{prefix}_{stop - 1}`` in one vectorized call.
+
+    :param prefix: The label prefix, e.g. "user" or "product".
+    :param start: The first numeric id (inclusive).
+    :param stop: The last numeric id (exclusive).
+    :return: An Arrow string array of length ``stop - start``.
+    """
+    numbers = pc.cast(pa.array(np.arange(start, stop, dtype=np.int64)), pa.string())
+    return pc.binary_join_element_wise(f"{prefix}_", numbers, "")
+
+
+def chunk_rng(seed_sequence: np.random.SeedSequence, chunk_index: int) -> np.random.Generator:
+    """
+    Returns the random generator of one chunk, derived from the request seed and the chunk index.
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed_sequence.entropy, spawn_key=(chunk_index,)))
+
+
+def category_labels() -> pa.Array:
+    """
+    Returns the synthetic category labels; product ``i`` belongs to ``category_{i % NUM_CATEGORIES}``.
+    """
+    return id_labels("category", 0, NUM_CATEGORIES)
+
+
+def recommender_block(
+        params: RecommenderParams,
+        rng: np.random.Generator,
+        user_start: int,
+        user_stop: int,
+        products: pa.Array,
+        sampler: Optional[AliasTable] = None,
+) -> pa.Table:
+    """
+    Generates the purchase events of users ``user_start`` .. ``user_stop - 1`` as whole arrays.
+
+    :param params: The synthetic recommender request.
+    :param rng: The random generator all draws for this block are taken from.
+    :param user_start: The first user index of the block (inclusive).
+    :param user_stop: The last user index of the block (exclusive).
+    :param products: The product labels from ``id_labels("product", 0, num_products)``.
+    :param sampler: The product popularity table; products are drawn uniformly when omitted.
+    :return: An Arrow table following ``RECOMMENDER_SCHEMA``.
+    """
+    start_date = parse_date(params.start_date)
+    end_date = parse_date(params.end_date)
+    date_range_days = (end_date - start_date).days
+    num_users = user_stop - user_start
+
+    # 1. Number of purchases per user (bounded by max_purchases_per_user)
+    purchases = np.minimum(
+        rng.poisson(params.avg_purchases_per_user, num_users),
+        params.max_purchases_per_user or 100,
+    )
+
+    # 2. Sparsity: every purchase event is skipped with probability `sparsity`.
+    # Thinning the counts binomially is the same as masking each event individually.
+    kept = rng.binomial(purchases, 1.0 - params.sparsity)
+    user_idx = np.repeat(np.arange(num_users, dtype=np.int32), kept)
+    num_rows = len(user_idx)
+
+    # 3. Event attributes, one array per column
+    if sampler is None:
+        product_idx = rng.integers(0, params.num_products, num_rows, dtype=np.int32)
+    else:
+        product_idx = sampler.sample(rng, num_rows)
+    day_offsets = rng.integers(0, date_range_days, num_rows, endpoint=True)
+    quantity = rng.integers(1, 5, num_rows)
+    purchase_date = start_date.to_datetime64() + day_offsets.astype("timedelta64[D]")
+
+    return pa.Table.from_arrays([
+        pa.DictionaryArray.from_arrays(user_idx, id_labels("user", user_start, user_stop)),
+        pa.DictionaryArray.from_arrays(product_idx, products),
+        pa.DictionaryArray.from_arrays(product_idx % NUM_CATEGORIES, category_labels()),
+        pa.array(purchase_date.astype("datetime64[ns]")),
+        pa.array(quantity, type=pa.int64()),
+    ], schema=RECOMMENDER_SCHEMA)
+
+
+def num_chunks(total: int, chunk_size: int) -> int:
+    """
+    Returns how many chunks of ``chunk_size`` items are needed to cover ``total`` items.
+    """
+    return -(-total // chunk_size)
+
+
+def iter_recommender_chunks(params: RecommenderParams, chunks: Optional[range] = None) -> Iterator[pa.Table]:
+    """
+    Generates the synthetic recommender dataset in chunks of ``RECOMMENDER_CHUNK_USERS`` users.
+
+    :param params: The synthetic recommender request.
+    :param chunks: The chunk indices to generate; defaults to all of them.
+    :return: An iterator of Arrow tables following ``RECOMMENDER_SCHEMA``.
+    """
+    if chunks is None:
+        chunks = range(num_chunks(params.num_users, RECOMMENDER_CHUNK_USERS))
+
+    seed_sequence = np.random.SeedSequence(params.seed)
+    products = id_labels("product", 0, params.num_products)
+    sampler = product_sampler(params, NUM_CATEGORIES)
+    for chunk_index in chunks:
+        user_start = chunk_index * RECOMMENDER_CHUNK_USERS
+        user_stop = min(user_start + RECOMMENDER_CHUNK_USERS, params.num_users)
+        rng = chunk_rng(seed_sequence, chunk_index)
+        yield recommender_block(params, rng, user_start, user_stop, products, sampler)
+
+
+def generate_recommender_table(params: RecommenderParams) -> pa.Table:
+    """
+    Generates the full synthetic recommender dataset for a request.
+
+    :param params: The synthetic recommender request.
+    :return: An Arrow table following ``RECOMMENDER_SCHEMA``.
+    """
+    return _concat_chunks(iter_recommender_chunks(params), RECOMMENDER_SCHEMA)
+
+
+class ForecastingCalendar(NamedTuple):
+    """
+    The product-independent part of a forecasting dataset, shared by every product block.
+    """
+    dates: np.ndarray  # datetime64[ns], one entry per day
+    seasonality: np.ndarray  # additive seasonal component per day
+    multiplier: np.ndarray  # holiday x promotion sales multiplier per day
+
+
+def forecasting_calendar(params: ForecastingParams, rng: np.random.Generator) -> ForecastingCalendar:
+    """
+    Draws the holidays and promotion days once and folds them into a per-day multiplier.
+
+    :param params: The synthetic forecasting request.
+    :param rng: The random generator used to pick holidays and promotion days.
+    :return: The calendar to broadcast across all products.
+    """
+    dates = pd.date_range(parse_date(params.start_date), parse_date(params.end_date)).values.astype("datetime64[ns]")
+    num_days = len(dates)
+
+    # Pick random holidays, then promotion days among the remaining dates
+    is_holiday = np.zeros(num_days, dtype=bool)
+    is_holiday[rng.choice(num_days, size=NUM_HOLIDAYS, replace=False)] = True
+    is_promotion = np.zeros(num_days, dtype=bool)
+    is_promotion[rng.choice(np.flatnonzero(~is_holiday), size=NUM_PROMOTION_DAYS, replace=False)] = True
+
+    # Seasonality: sinusoidal pattern with adjustable strength
+    seasonality = params.seasonality_strength * 10 * np.sin(np.linspace(0, 2 * np.pi, num_days))
+
+    # Double sales on holidays, apply the promotion effect on promotion days
+    multiplier = np.where(is_holiday, 2.0, 1.0) * np.where(is_promotion, params.promotion_effect, 1.0)
+
+    return ForecastingCalendar(dates=dates, seasonality=seasonality, multiplier=multiplier)
+
+
+def forecasting_block(
+        params: ForecastingParams,
+        rng: np.random.Generator,
+        product_start: int,
+        product_stop: int,
+        calendar: ForecastingCalendar,
+) -> pa.Table:
+    """
+    Generates the daily sales of products ``product_start`` .. ``product_stop - 1`` as a
+    (products x dates) array and flattens it into long format.
+
+    :param params: The synthetic forecasting request.
+    :param rng: The random generator all draws for this block are taken from.
+    :param product_start: The first product index of the block (inclusive).
+    :param product_stop: The last product index of the block (exclusive).
+    :param calendar: The shared calendar from ``forecasting_calendar``.
+    :return: An Arrow table following ``FORECASTING_SCHEMA``, ordered by product then date.
+    """
+    num_products = product_stop - product_start
+    num_days = len(calendar.dates)
+
+    # Base sales multiplier per product, noise per product and day
+    base = rng.uniform(50, 150, num_products) * params.trend_strength
+    noise = rng.normal(0, params.noise_level, (num_products, num_days))
+
+    sales = (base[:, None] + calendar.seasonality[None, :] + noise) * calendar.multiplier[None, :]
+    np.maximum(sales, 0, out=sales)
+
+    product_idx = np.repeat(np.arange(num_products, dtype=np.int32), num_days)
+    category_idx = np.repeat(np.arange(product_start, product_stop, dtype=np.int32) % NUM_CATEGORIES, num_days)
+
+    return pa.Table.from_arrays([
+        pa.array(np.tile(calendar.dates, num_products)),
+        pa.DictionaryArray.from_arrays(product_idx, id_labels("product", product_start, product_stop)),
+        pa.DictionaryArray.from_arrays(category_idx, category_labels()),
+        pa.array(sales.ravel()),
+    ], schema=FORECASTING_SCHEMA)
+
+
+def iter_forecasting_chunks(params: ForecastingParams, chunks: Optional[range] = None) -> Iterator[pa.Table]:
+    """
+    Generates the synthetic forecasting dataset in chunks of ``FORECASTING_CHUNK_PRODUCTS`` products.
+
+    :param params: The synthetic forecasting request.
+    :param chunks: The chunk indices to generate; defaults to all of them.
+    :return: An iterator of Arrow tables following ``FORECASTING_SCHEMA``.
+    """
+    if chunks is None:
+        chunks = range(num_chunks(params.num_products, FORECASTING_CHUNK_PRODUCTS))
+
+    seed_sequence = np.random.SeedSequence(params.seed)
+    calendar = forecasting_calendar(params, np.random.default_rng(seed_sequence))
+    for chunk_index in chunks:
+        product_start = chunk_index * FORECASTING_CHUNK_PRODUCTS
+        product_stop = min(product_start + FORECASTING_CHUNK_PRODUCTS, params.num_products)
+        yield forecasting_block(params, chunk_rng(seed_sequence, chunk_index), product_start, product_stop, calendar)
+
+
+def generate_forecasting_table(params: ForecastingParams) -> pa.Table:
+    """
+    Generates the full synthetic forecasting dataset for a request.
+
+    :param params: The synthetic forecasting request.
+    :return: An Arrow table following ``FORECASTING_SCHEMA``.
+    """
+    return _concat_chunks(iter_forecasting_chunks(params), FORECASTING_SCHEMA)
+
+
+def _concat_chunks(chunks: Iterable[pa.Table], schema: pa.Schema) -> pa.Table:
+    tables = list(chunks)
+    return pa.concat_tables(tables) if tables else schema.empty_table()
+
+
+def write_parquet(table: pa.Table, file_path: str) -> None:
+    """
+    Writes a synthetic table to a single Parquet file.
+
+    The Arrow schema is not embedded, so readers see plain string columns
+    rather than the in-memory dictionary types.
+    """
+    pq.write_table(table, file_path, store_schema=False)
+
+
+def write_parquet_stream(chunks: Iterable[pa.Table], schema: pa.Schema, file_path: str) -> int:
+    """
+    Writes synthetic chunks to a single Parquet file as they are generated, one row group per chunk.
+
+    Only the chunk currently being written is held in memory, so peak memory does not
+    grow with the dataset size.
+
+    :param chunks: The chunk iterator, e.g. from ``iter_recommender_chunks``.
+    :param schema: The schema shared by all chunks.
+    :param file_path: The destination Parquet file.
+    :return: The number of rows written.
+    """
+    num_rows = 0
+    with pq.ParquetWriter(file_path, schema, store_schema=False) as writer:
+        for chunk in chunks:
+            writer.write_table(chunk, row_group_size=max(chunk.num_rows, 1))
+            num_rows += chunk.num_rows
+    return num_rows
+
+
+def iter_arrow_stream(chunks: Iterable[pa.Table], schema: pa.Schema) -> Iterator[bytes]:
+    """
+    Encodes synthetic chunks as an Arrow IPC stream, yielding the bytes of each chunk as soon as it is generated.
+
+    Identifier columns stay dictionary-encoded; every chunk carries its own dictionary.
+
+    :param chunks: The chunk iterator, e.g. from ``iter_recommender_chunks``.
+    :param schema: The schema shared by all chunks.
+    :return: An iterator of IPC stream fragments; concatenated they form one valid stream.
+    """
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield drain()
+        for chunk in chunks:
+            writer.write_table(chunk)
+            yield drain()
+    yield drain()
+
+
+def _write_recommender_shard(params: RecommenderParams, chunks: range, file_path: str) -> int:
+    return write_parquet_stream(iter_recommender_chunks(params, chunks), RECOMMENDER_SCHEMA, file_path)
+
+
+def _write_forecasting_shard(params: ForecastingParams, chunks: range, file_path: str) -> int:
+    return write_parquet_stream(iter_forecasting_chunks(params, chunks), FORECASTING_SCHEMA, file_path)
+
+
+def _write_sharded_dataset(shard_writer, params, total_chunks: int, dir_path: str, workers: int) -> List[str]:
+    """
+    Splits the chunk indices into contiguous shards and writes each shard from a worker process
+    to its own ``part-NNNNN.parquet`` file in ``dir_path``.
+    """
+    # Every shard must derive its chunk seeds from the same entropy, even without an explicit seed
+    if params.seed is None:
+        params = params.model_copy(update={"seed": np.random.SeedSequence().entropy})
+
+    os.makedirs(dir_path, exist_ok=True)
+    for stale_part in glob.glob(os.path.join(dir_path, "part-*.parquet")):
+        os.remove(stale_part)
+
+    num_shards = max(min(workers, total_chunks), 1)
+    shards = [range(total_chunks * i // num_shards, total_chunks * (i + 1) // num_shards) for i in range(num_shards)]
+    file_paths = [os.path.join(dir_path, f"part-{i:05d}.parquet") for i in range(num_shards)]
+
+    # Spawned (not forked) workers, since the API process runs request threads
+    with ProcessPoolExecutor(max_workers=num_shards, mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(shard_writer, [params] * num_shards, shards, file_paths))
+
+    return file_paths
+
+
+def write_recommender_dataset(params: RecommenderParams, dir_path: str, workers: int) -> List[str]:
+    """
+    Generates the synthetic recommender dataset as a partitioned Parquet directory using a process pool.
+
+    Chunk seeds only depend on the request seed, so the dataset content is the same for any worker count.
+
+    :param params: The synthetic recommender request.
+    :param dir_path: The dataset directory to write the part files into.
+    :param workers: The number of worker processes (and shards).
+    :return: The paths of the written part files.
+    """
+    total_chunks = num_chunks(params.num_users, RECOMMENDER_CHUNK_USERS)
+    return _write_sharded_dataset(_write_recommender_shard, params, total_chunks, dir_path, workers)
+
+
+def write_forecasting_dataset(params: ForecastingParams, dir_path: str, workers: int) -> List[str]:
+    """
+    Generates the synthetic forecasting dataset as a partitioned Parquet directory using a process pool.
+
+    Chunk seeds only depend on the request seed, so the dataset content is the same for any worker count.
+
+    :param params: The synthetic forecasting request.
+    :param dir_path: The dataset directory to write the part files into.
+    :param workers: The number of worker processes (and shards).
+    :return: The paths of the written part files.
+    """
+    total_chunks = num_chunks(params.num_products, FORECASTING_CHUNK_PRODUCTS)
+    return _write_sharded_dataset(_write_forecasting_shard, params, total_chunks, dir_path, workers)
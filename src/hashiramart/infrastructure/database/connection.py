@@ -1,4 +1,7 @@
+from typing import Any, AsyncIterator, Dict, Tuple
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -6,8 +9,71 @@ from hashiramart.config.settings import settings
 
 # The import path is updated to point to the new location
 
+# Drivers of the async engine, by the driver of DATABASE_URL's database
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+# libpq query parameters asyncpg does not accept as connect arguments, e.g. those of the
+# Neon URL in .env_copy; sslmode is passed on as asyncpg's ``ssl`` instead
+LIBPQ_ONLY_PARAMS = ("sslmode", "channel_binding", "sslrootcert", "sslcert", "sslkey", "sslcrl", "gssencmode")
+
+
+def _pool_options(url: Any) -> Dict[str, Any]:
+    """
+    The connection pool settings of an engine. Only server databases get a sized pool;
+    SQLite keeps SQLAlchemy's default, which does not accept these options.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        # Replaces connections before the server or a proxy drops them
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+
+
+def _connect_args(url: Any) -> Dict[str, Any]:
+    """
+    Sets the server-side statement timeout on every new PostgreSQL connection, if
+    DATABASE_STATEMENT_TIMEOUT_MS is set. Off by default, since poolers such as PgBouncer
+    can reject startup parameters they do not know.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "postgresql" or not settings.DATABASE_STATEMENT_TIMEOUT_MS:
+        return {}
+    if url.get_driver_name() == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(settings.DATABASE_STATEMENT_TIMEOUT_MS)}}
+    return {"options": f"-c statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT_MS}"}
 
-engine = create_engine(settings.DATABASE_URL)
+
+def async_connection_options() -> Tuple[URL, Dict[str, Any]]:
+    """
+    Returns the URL and connect arguments of the async engine: ASYNC_DATABASE_URL, or
+    DATABASE_URL with its driver replaced by an async one, e.g. postgresql+psycopg2://...
+    becomes postgresql+asyncpg://...
+    """
+    url = make_url(settings.ASYNC_DATABASE_URL or settings.DATABASE_URL)
+    if not settings.ASYNC_DATABASE_URL:
+        url = url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+    connect_args = _connect_args(url)
+    if url.get_driver_name() == "asyncpg":
+        sslmode = url.query.get("sslmode")
+        url = url.difference_update_query(LIBPQ_ONLY_PARAMS)
+        if sslmode:
+            # asyncpg takes the libpq modes ("require", "verify-full", ...) as is
+            connect_args["ssl"] = sslmode
+    return url, connect_args
+
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    connect_args=_connect_args(settings.DATABASE_URL),
+    **_pool_options(settings.DATABASE_URL),
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -18,4 +84,46 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# --- Async engine ---
+# Created on first use, so the sync-only parts of the application and the pipelines do
+# not need the async driver installed
+
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    """
+    Returns the process-wide async engine, created on first use.
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url, connect_args = async_connection_options()
+        _async_engine = create_async_engine(url, connect_args=connect_args, **_pool_options(url))
+        # Objects stay usable after a commit, without a lazy load outside the event loop
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_db() -> AsyncIterator[Any]:
+    """
+    A FastAPI dependency yielding an ``AsyncSession``; the async counterpart of ``get_db``.
+    Waiting on the database does not hold a threadpool thread.
+    """
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def close_async_engine() -> None:
+    """Closes the pooled connections of the async engine, if it was created."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _AsyncSessionLocal = None
@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from hashiramart.infrastructure.database.connection import Base
@@ -7,6 +7,8 @@ from hashiramart.infrastructure.database.connection import Base
 
 class Interaction(Base):
     __tablename__ = "interactions"
+    # Serves "latest interactions of a user" without a scan or a sort
+    __table_args__ = (Index("ix_interactions_user_id_timestamp", "user_id", "timestamp"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
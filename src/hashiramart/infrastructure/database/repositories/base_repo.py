@@ -1,7 +1,12 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import TYPE_CHECKING, Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+if TYPE_CHECKING:
+    # Needs greenlet at import time, which the sync repositories do not
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 from ..connection import Base
 
 # Define custom types for SQLAlchemy model, and Pydantic schemas
@@ -64,4 +69,63 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj = db.query(self.model).get(obj_id)
         db.delete(obj)
         db.commit()
-        return obj
\ No newline at end of file
+        return obj
+
+
+class AsyncBaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    The async counterpart of BaseRepository, over an ``AsyncSession`` from ``get_async_db``.
+    """
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def get(self, db: "AsyncSession", obj_id: Any) -> Optional[ModelType]:
+        return await db.get(self.model, obj_id)
+
+    async def get_all(self, db: "AsyncSession", *, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        result = await db.scalars(select(self.model).order_by(self.model.id).offset(skip).limit(limit))
+        return list(result)
+
+    async def create(self, db: "AsyncSession", *, obj_in: CreateSchemaType) -> ModelType:
+        """
+        Create a new object.
+        """
+        db_obj = self.model(**obj_in.model_dump())
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self,
+        db: "AsyncSession",
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        """
+        Update an existing object.
+        """
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+
+        for field in update_data:
+            setattr(db_obj, field, update_data[field])
+
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: "AsyncSession", *, obj_id: int) -> Optional[ModelType]:
+        """
+        Delete an object by its primary key.
+        """
+        obj = await db.get(self.model, obj_id)
+        if obj is not None:
+            await db.delete(obj)
+            await db.commit()
+        return obj
@@ -0,0 +1,61 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import TYPE_CHECKING, List
+
+from hashiramart.api.schemas.interaction_schema import InteractionCreate, InteractionUpdate
+from hashiramart.infrastructure.database.model.interaction import Interaction
+from hashiramart.infrastructure.database.repositories.base_repo import AsyncBaseRepository, BaseRepository
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class InteractionRepository(BaseRepository[Interaction, InteractionCreate, InteractionUpdate]):
+    """
+    Repository for all database operations related to the Interaction model.
+    """
+
+    def __init__(self):
+        super().__init__(Interaction)
+
+    def get_recent_by_user(self, db: Session, *, user_id: int, limit: int = 200) -> List[Interaction]:
+        """
+        Retrieves the latest interactions of a user, newest first.
+
+        :param db: The database session.
+        :param user_id: The user's primary key.
+        :param limit: The maximum number of interactions to return.
+        :return: A list of Interaction instances.
+        """
+        return (
+            db.query(Interaction)
+            .filter(Interaction.user_id == user_id)
+            .order_by(Interaction.timestamp.desc())
+            .limit(limit)
+            .all()
+        )
+
+
+class AsyncInteractionRepository(AsyncBaseRepository[Interaction, InteractionCreate, InteractionUpdate]):
+    """
+    The async counterpart of InteractionRepository.
+    """
+
+    def __init__(self):
+        super().__init__(Interaction)
+
+    async def get_recent_by_user(self, db: "AsyncSession", *, user_id: int, limit: int = 200) -> List[Interaction]:
+        """
+        Retrieves the latest interactions of a user, newest first.
+
+        :param db: The async database session.
+        :param user_id: The user's primary key.
+        :param limit: The maximum number of interactions to return.
+        :return: A list of Interaction instances.
+        """
+        return list(await db.scalars(
+            select(Interaction)
+            .where(Interaction.user_id == user_id)
+            .order_by(Interaction.timestamp.desc())
+            .limit(limit)
+        ))
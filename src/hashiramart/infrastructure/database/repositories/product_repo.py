@@ -1,9 +1,13 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import TYPE_CHECKING, List
 
 from hashiramart.api.schemas.product_schema import ProductCreate, ProductUpdate
 from hashiramart.infrastructure.database.model.product import Product
-from hashiramart.infrastructure.database.repositories.base_repo import BaseRepository
+from hashiramart.infrastructure.database.repositories.base_repo import AsyncBaseRepository, BaseRepository
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 
 # The import path now points to the new 'product_schema.py' file.
@@ -13,6 +17,10 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
     """
     Repository for all database operations related to the Product model.
     """
+
+    def __init__(self):
+        super().__init__(Product)
+
     def filter_by_category(self, db: Session, *, category: str) -> List[Product]:
         """
         Retrieves all products belonging to a specific category.
@@ -23,3 +31,41 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
         """
         return db.query(Product).filter(Product.category == category).all()
 
+    def get_ids_by_category(self, db: Session, *, category: str) -> List[int]:
+        """
+        Retrieves only the IDs of the products in a category, answered from the category index.
+
+        :param db: The database session.
+        :param category: The category name to filter by.
+        :return: A list of product IDs.
+        """
+        return [row.id for row in db.query(Product.id).filter(Product.category == category)]
+
+
+class AsyncProductRepository(AsyncBaseRepository[Product, ProductCreate, ProductUpdate]):
+    """
+    The async counterpart of ProductRepository.
+    """
+
+    def __init__(self):
+        super().__init__(Product)
+
+    async def filter_by_category(self, db: "AsyncSession", *, category: str) -> List[Product]:
+        """
+        Retrieves all products belonging to a specific category.
+
+        :param db: The async database session.
+        :param category: The category name to filter by.
+        :return: A list of Product instances.
+        """
+        return list(await db.scalars(select(Product).where(Product.category == category)))
+
+    async def get_ids_by_category(self, db: "AsyncSession", *, category: str) -> List[int]:
+        """
+        Retrieves only the IDs of the products in a category, answered from the category index.
+
+        :param db: The async database session.
+        :param category: The category name to filter by.
+        :return: A list of product IDs.
+        """
+        return list(await db.scalars(select(Product.id).where(Product.category == category)))
@@ -1,17 +1,26 @@
+import asyncio
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from hashiramart.api.schemas.user_schema import UserCreate, UserUpdate
 from hashiramart.infrastructure.database.model.user import User
-from hashiramart.infrastructure.database.repositories.base_repo import BaseRepository
+from hashiramart.infrastructure.database.repositories.base_repo import AsyncBaseRepository, BaseRepository
 from hashiramart.security.hashing import Hasher
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 
 class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
     """
     Repository for all database operations related to the User model.
     """
 
+    def __init__(self):
+        super().__init__(User)
+
     def get_by_name(self, db: Session, *, name: str) -> Optional[User]:
         """
         Retrieves a user by their name.
@@ -66,3 +75,54 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         return user
 
 
+class AsyncUserRepository(AsyncBaseRepository[User, UserCreate, UserUpdate]):
+    """
+    The async counterpart of UserRepository. Password hashing is CPU-bound, so it runs
+    in a worker thread rather than on the event loop.
+    """
+
+    def __init__(self):
+        super().__init__(User)
+
+    async def get_by_name(self, db: "AsyncSession", *, name: str) -> Optional[User]:
+        """
+        Retrieves a user by their name.
+
+        :param db: The async database session.
+        :param name: The name of the user.
+        :return: The User instance or None if not found.
+        """
+        return await db.scalar(select(User).where(User.name == name))
+
+    async def create(self, db: "AsyncSession", *, obj_in: UserCreate) -> User:
+        """
+        Creates a new user, hashing the password before saving.
+
+        :param db: The async database session.
+        :param obj_in: The Pydantic schema with the user creation data.
+        :return: The newly created User instance.
+        """
+        create_data = obj_in.model_dump()
+        create_data["hashed_password"] = await asyncio.to_thread(Hasher.get_password_hash, create_data.pop("password"))
+
+        db_obj = self.model(**create_data)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def authenticate(self, db: "AsyncSession", *, name: str, password: str) -> Optional[User]:
+        """
+        Authenticates a user by checking their name and password.
+
+        :param db: The async database session.
+        :param name: The username.
+        :param password: The plain text password.
+        :return: The User instance if authentication is successful, otherwise None.
+        """
+        user = await self.get_by_name(db, name=name)
+        if not user:
+            return None
+        if not await asyncio.to_thread(Hasher.verify_password, password, user.hashed_password):
+            return None
+        return user
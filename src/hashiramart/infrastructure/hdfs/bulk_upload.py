@@ -0,0 +1,188 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
+import os
+import posixpath
+import shutil
+import tarfile
+import zipfile
+from typing import AsyncIterator, BinaryIO, Callable, ContextManager, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from hashiramart.infrastructure.hdfs.client import WebHDFSClient, WebHDFSError
+
+# Extended attribute holding the SHA-256 of a file uploaded through the bulk uploader.
+# HDFS's own GETFILECHECKSUM (MD5 of per-block MD5s of CRC32C chunks) depends on the
+# block layout and cannot be reproduced cheaply on the client side.
+CHECKSUM_XATTR = "user.hashiramart.sha256"
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadSource(NamedTuple):
+    """
+    One local file to upload, addressed by its path relative to the HDFS target directory.
+    """
+    relative_path: str
+    opener: Callable[[], ContextManager[BinaryIO]]  # opens the file only while it is being transferred
+
+    @classmethod
+    def from_fileobj(cls, relative_path: str, fileobj: BinaryIO) -> "UploadSource":
+        """A source for an already open, seekable file that its owner will close."""
+        return cls(relative_path, lambda: contextlib.nullcontext(fileobj))
+
+    @classmethod
+    def from_local_path(cls, relative_path: str, path: str) -> "UploadSource":
+        """A source for a local file, opened on demand."""
+        return cls(relative_path, functools.partial(open, path, "rb"))
+
+
+class BulkUploadReport(NamedTuple):
+    uploaded: List[str]
+    skipped: List[str]
+    failed: Dict[str, str]
+
+
+def safe_relative_path(name: str) -> Optional[str]:
+    """
+    Normalizes a client-supplied relative file name.
+
+    :return: The POSIX relative path, or None if it is empty, absolute or escapes the target directory.
+    """
+    path = posixpath.normpath(name.replace("\\", "/"))
+    if not name or path.startswith("/") or path == "." or path == ".." or path.startswith("../"):
+        return None
+    return path
+
+
+def _sha256_and_size(fileobj: BinaryIO) -> Tuple[str, int]:
+    fileobj.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := fileobj.read(READ_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+async def _iter_file(fileobj: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(fileobj.read, READ_CHUNK_SIZE):
+        yield chunk
+
+
+async def _remote_sizes(client: WebHDFSClient, directory: str) -> Dict[str, int]:
+    """Maps the file names in an HDFS directory to their sizes; empty if the directory does not exist."""
+    try:
+        statuses = await client.list_status(directory)
+    except WebHDFSError as e:
+        if e.status_code == 404:
+            return {}
+        raise
+    return {status["pathSuffix"]: status["length"] for status in statuses if status["type"] == "FILE"}
+
+
+async def bulk_upload(
+        client: WebHDFSClient,
+        sources: List[UploadSource],
+        target_dir: str,
+        *,
+        max_concurrency: int = 8,
+) -> BulkUploadReport:
+    """
+    Uploads many files to HDFS concurrently, skipping files that are already present and identical.
+
+    A file is skipped when the HDFS copy has the same size and carries the same SHA-256 in
+    ``CHECKSUM_XATTR``. Sizes come from one LISTSTATUS per target directory, so the extra
+    GETXATTRS call is only made for same-size candidates.
+
+    :param client: The WebHDFS client.
+    :param sources: The files to upload.
+    :param target_dir: The HDFS directory the relative paths are resolved against.
+    :param max_concurrency: The maximum number of files transferred at the same time.
+    :return: The relative paths that were uploaded, skipped or failed (with the error).
+    """
+    target_dir = target_dir.rstrip("/") or "/"
+    directories = {posixpath.dirname(posixpath.join(target_dir, s.relative_path)) for s in sources}
+    listings = await asyncio.gather(*(_remote_sizes(client, d) for d in directories))
+    remote_sizes = {
+        posixpath.join(directory, name): size
+        for directory, listing in zip(directories, listings)
+        for name, size in listing.items()
+    }
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    report = BulkUploadReport(uploaded=[], skipped=[], failed={})
+
+    async def upload_one(source: UploadSource) -> None:
+        hdfs_path = posixpath.join(target_dir, source.relative_path)
+        async with semaphore:
+            try:
+                with source.opener() as fileobj:
+                    checksum, size = await asyncio.to_thread(_sha256_and_size, fileobj)
+                    if remote_sizes.get(hdfs_path) == size and \
+                            await client.get_xattr(hdfs_path, CHECKSUM_XATTR) == checksum:
+                        report.skipped.append(source.relative_path)
+                        return
+
+                    await client.create(hdfs_path, _iter_file(fileobj), length=size)
+                await client.set_xattr(hdfs_path, CHECKSUM_XATTR, checksum)
+                report.uploaded.append(source.relative_path)
+
+            except (WebHDFSError, httpx.HTTPError, OSError) as e:
+                report.failed[source.relative_path] = str(e)
+
+    await asyncio.gather(*(upload_one(source) for source in sources))
+    return report
+
+
+def directory_sources(root: str) -> List[UploadSource]:
+    """
+    Lists every file below a local directory as an upload source, relative to ``root``.
+    """
+    sources = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            relative_path = os.path.relpath(path, root).replace(os.sep, "/")
+            sources.append(UploadSource.from_local_path(relative_path, path))
+    return sources
+
+
+def extract_archive(fileobj: BinaryIO, filename: str, dest_dir: str) -> None:
+    """
+    Extracts the regular files of a .zip or .tar(.gz/.bz2/.xz) archive into ``dest_dir``.
+
+    Members with absolute paths or ``..`` components are skipped.
+
+    :raises ValueError: If the archive format is not recognized.
+    """
+    fileobj.seek(0)
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            members = ((m.filename, archive.open(m)) for m in archive.infolist() if not m.is_dir())
+            _write_members(members, dest_dir)
+        return
+
+    fileobj.seek(0)
+    try:
+        with tarfile.open(fileobj=fileobj, mode="r:*") as archive:
+            members = ((m.name, archive.extractfile(m)) for m in archive if m.isfile())
+            _write_members(members, dest_dir)
+    except tarfile.TarError:
+        raise ValueError(f"{filename} is not a zip or tar archive.")
+
+
+def _write_members(members, dest_dir: str) -> None:
+    """Copies (name, file object) pairs below ``dest_dir``, one member at a time."""
+    for name, member in members:
+        relative_path = safe_relative_path(name)
+        if relative_path is None:
+            continue
+        path = os.path.join(dest_dir, *relative_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with member, open(path, "wb") as out:
+            shutil.copyfileobj(member, out, READ_CHUNK_SIZE)
@@ -0,0 +1,312 @@
+import asyncio
+import posixpath
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from hashiramart.config.settings import settings
+
+# NameNode/DataNode responses that are worth retrying
+TRANSIENT_STATUS_CODES = {502, 503, 504}
+
+
+class WebHDFSError(Exception):
+    """
+    Raised when WebHDFS answers with an error, carrying its HTTP status code.
+    """
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class WebHDFSClient:
+    """
+    A shared async WebHDFS client with a keep-alive connection pool, timeouts and retries.
+
+    NameNode calls are retried with exponential backoff on connection errors and
+    transient 5xx responses. Writes of streamed content are not retried, since the
+    stream cannot be replayed.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            user: str,
+            *,
+            connect_timeout: float = 5.0,
+            read_timeout: float = 60.0,
+            max_connections: int = 32,
+            max_retries: int = 3,
+            retry_backoff: float = 0.2,
+            transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        :param base_url: The WebHDFS root, e.g. "http://namenode:9870/webhdfs/v1".
+        :param user: The HDFS user name sent as ``user.name``.
+        :param connect_timeout: Seconds to wait for a connection.
+        :param read_timeout: Seconds to wait for data on an open connection.
+        :param max_connections: The connection pool size.
+        :param max_retries: How many times a failed NameNode call is retried.
+        :param retry_backoff: The first retry delay in seconds; it doubles on every retry.
+        :param transport: An optional httpx transport, e.g. one serving a fake WebHDFS in-process.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.user = user
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    def url(self, path: str) -> str:
+        """Returns the WebHDFS URL of an absolute HDFS path."""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def aclose(self) -> None:
+        """Closes all pooled connections."""
+        await self._client.aclose()
+
+    async def request(
+            self,
+            method: str,
+            path: str,
+            op: str,
+            params: Optional[Dict[str, Any]] = None,
+            *,
+            retry: bool = True,
+            **kwargs,
+    ) -> httpx.Response:
+        """
+        Sends a WebHDFS operation to the NameNode.
+
+        :param method: The HTTP method.
+        :param path: The absolute HDFS path.
+        :param op: The WebHDFS operation, e.g. "LISTSTATUS".
+        :param params: Extra query parameters.
+        :param retry: Whether transient failures are retried.
+        :return: The response; redirects are returned as-is, not followed.
+        :raises WebHDFSError: If WebHDFS answers with an error status.
+        :raises httpx.HTTPError: If the request keeps failing at the transport level.
+        """
+        query = {"op": op, "user.name": self.user, **(params or {})}
+        attempts = self.max_retries + 1 if retry else 1
+        return await self._send(method, self.url(path), attempts, params=query, **kwargs)
+
+    async def _send(self, method: str, url: str, attempts: int, **kwargs) -> httpx.Response:
+        """Sends a request, retrying connection errors and transient 5xx responses with exponential backoff."""
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if response.status_code not in TRANSIENT_STATUS_CODES or last_attempt:
+                    _raise_for_error(response)
+                    return response
+            await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def create(
+            self,
+            path: str,
+            content: Union[bytes, AsyncIterator[bytes]],
+            *,
+            overwrite: bool = True,
+            length: Optional[int] = None,
+    ) -> None:
+        """
+        Writes a file: CREATE on the NameNode, then the content to the DataNode it redirects to.
+
+        :param path: The absolute HDFS file path.
+        :param content: The file content, either as bytes or as an async iterator of chunks.
+        :param overwrite: Whether an existing file is replaced.
+        :param length: The content length, if known, for streamed content.
+        :raises WebHDFSError: If either step fails.
+        """
+        create_response = await self.request("PUT", path, "CREATE", {"overwrite": str(overwrite).lower()})
+
+        datanode_url = create_response.headers.get("Location")
+        if not datanode_url:
+            raise WebHDFSError(500, "HDFS did not provide a DataNode URL.")
+
+        headers = {"Content-Length": str(length)} if length is not None else {}
+        attempts = self.max_retries + 1 if isinstance(content, bytes) else 1
+        await self._send("PUT", datanode_url, attempts, content=content, headers=headers)
+
+    async def file_status(self, path: str) -> Dict[str, Any]:
+        """
+        Gets the metadata of a file or directory.
+
+        :param path: The absolute HDFS path.
+        :return: The ``FileStatus`` of the path.
+        :raises WebHDFSError: With status 404 if the path does not exist.
+        """
+        response = await self.request("GET", path, "GETFILESTATUS")
+        return response.json()["FileStatus"]
+
+    async def open(self, path: str, *, offset: int = 0, length: Optional[int] = None) -> httpx.Response:
+        """
+        Opens a file for reading: OPEN on the NameNode, then a streamed GET on the DataNode.
+
+        The returned response body has not been read yet; iterate it with ``aiter_bytes`` and
+        release the connection with ``aclose`` when done.
+
+        :param path: The absolute HDFS file path.
+        :param offset: The byte offset to start reading at.
+        :param length: The number of bytes to read; the rest of the file when omitted.
+        :return: The open DataNode response.
+        :raises WebHDFSError: If either step fails.
+        """
+        params = {"offset": offset}
+        if length is not None:
+            params["length"] = length
+        open_response = await self.request("GET", path, "OPEN", params)
+
+        datanode_url = open_response.headers.get("Location")
+        if not datanode_url:
+            raise WebHDFSError(500, "HDFS did not provide a DataNode URL.")
+
+        response = await self._client.send(self._client.build_request("GET", datanode_url), stream=True)
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            _raise_for_error(response)
+        return response
+
+    async def list_status(self, path: str) -> List[Dict[str, Any]]:
+        """
+        Lists a directory.
+
+        :param path: The absolute HDFS directory path.
+        :return: The ``FileStatus`` entries of the directory.
+        """
+        response = await self.request("GET", path, "LISTSTATUS")
+        return response.json()["FileStatuses"]["FileStatus"]
+
+    async def list_status_batch(self, path: str, start_after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Lists one page of a directory with LISTSTATUS_BATCH; the page size is set by the
+        NameNode (``dfs.ls.limit``).
+
+        :param path: The absolute HDFS directory path.
+        :param start_after: The last ``pathSuffix`` of the previous page, or None for the first page.
+        :return: The ``FileStatus`` entries of the page and the number of entries after it.
+        """
+        params = {"startAfter": start_after} if start_after else {}
+        response = await self.request("GET", path, "LISTSTATUS_BATCH", params)
+        listing = response.json()["DirectoryListing"]
+        return listing["partialListing"]["FileStatuses"]["FileStatus"], listing["remainingEntries"]
+
+    async def iter_list_status(self, path: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Lists a directory page by page, so huge directories are never held in one response.
+        """
+        start_after = None
+        while True:
+            statuses, remaining = await self.list_status_batch(path, start_after)
+            for status in statuses:
+                yield status
+            if not remaining or not statuses:
+                return
+            start_after = statuses[-1]["pathSuffix"]
+
+    async def walk(self, path: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Recursively lists a directory tree, depth first, one page at a time.
+
+        :param path: The absolute HDFS directory path.
+        :return: An async iterator of (full path, ``FileStatus``) pairs.
+        """
+        pending = [path.rstrip("/") or "/"]
+        while pending:
+            directory = pending.pop()
+            async for status in self.iter_list_status(directory):
+                full_path = posixpath.join(directory, status["pathSuffix"]) if status["pathSuffix"] else directory
+                yield full_path, status
+                if status["type"] == "DIRECTORY":
+                    pending.append(full_path)
+
+    async def get_xattr(self, path: str, name: str) -> Optional[str]:
+        """
+        Reads an extended attribute as text.
+
+        :param path: The absolute HDFS path.
+        :param name: The attribute name, e.g. "user.checksum".
+        :return: The attribute value, or None if the path does not carry it.
+        """
+        try:
+            response = await self.request("GET", path, "GETXATTRS", {"xattr.name": name, "encoding": "text"})
+        except WebHDFSError:
+            return None
+        for xattr in response.json().get("XAttrs", []):
+            if xattr["name"] == name and xattr.get("value") is not None:
+                # Text-encoded values come back wrapped in double quotes
+                return xattr["value"].strip('"')
+        return None
+
+    async def set_xattr(self, path: str, name: str, value: str) -> None:
+        """
+        Creates or replaces an extended attribute.
+
+        :param path: The absolute HDFS path.
+        :param name: The attribute name, e.g. "user.checksum".
+        :param value: The text value.
+        """
+        flag = "REPLACE" if await self.get_xattr(path, name) is not None else "CREATE"
+        await self.request("PUT", path, "SETXATTR", {"xattr.name": name, "xattr.value": value, "flag": flag})
+
+    async def delete(self, path: str, *, recursive: bool = False) -> bool:
+        """
+        Deletes a file or directory.
+
+        :param path: The absolute HDFS path.
+        :param recursive: Whether non-empty directories may be deleted.
+        :return: True if HDFS deleted something.
+        """
+        response = await self.request("DELETE", path, "DELETE", {"recursive": str(recursive).lower()})
+        return bool(response.json().get("boolean"))
+
+
+def _raise_for_error(response: httpx.Response) -> None:
+    """Turns a WebHDFS error response into a WebHDFSError, using its RemoteException message if present."""
+    if not response.is_error:
+        return
+    try:
+        message = response.json()["RemoteException"]["message"]
+    except (ValueError, KeyError, TypeError):
+        message = response.text or response.reason_phrase
+    raise WebHDFSError(response.status_code, message)
+
+
+_hdfs_client: Optional[WebHDFSClient] = None
+
+
+def get_hdfs_client() -> WebHDFSClient:
+    """
+    A FastAPI dependency returning the process-wide WebHDFS client, created on first use.
+    """
+    global _hdfs_client
+    if _hdfs_client is None:
+        _hdfs_client = WebHDFSClient(
+            settings.HDFS_API_URL,
+            settings.HDFS_USER,
+            connect_timeout=settings.HDFS_CONNECT_TIMEOUT,
+            read_timeout=settings.HDFS_READ_TIMEOUT,
+            max_connections=settings.HDFS_MAX_CONNECTIONS,
+            max_retries=settings.HDFS_MAX_RETRIES,
+            retry_backoff=settings.HDFS_RETRY_BACKOFF,
+        )
+    return _hdfs_client
+
+
+async def close_hdfs_client() -> None:
+    """Closes the process-wide WebHDFS client, if it was created."""
+    global _hdfs_client
+    if _hdfs_client is not None:
+        await _hdfs_client.aclose()
+        _hdfs_client = None
@@ -0,0 +1,224 @@
+import asyncio
+import bisect
+import posixpath
+import time
+from typing import Dict, Optional
+
+import httpx
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+class FakeWebHDFS:
+    """
+    An in-process, in-memory stand-in for a WebHDFS NameNode and DataNode.
+
+    It implements the two-step write (NameNode redirect, then DataNode PUT) and the
+    metadata operations the API uses, so the HDFS routes and the WebHDFS client can be
+    tested and benchmarked without a Hadoop cluster. Serve ``app`` with uvicorn for
+    real sockets, or pass ``transport()`` to a ``WebHDFSClient`` to skip the network.
+    """
+
+    def __init__(self, latency: float = 0.0, list_limit: int = 1000):
+        """
+        :param latency: Seconds added to every NameNode call, to mimic a remote cluster.
+        :param list_limit: The LISTSTATUS_BATCH page size, like ``dfs.ls.limit``.
+        """
+        self.latency = latency
+        self.list_limit = list_limit
+        self.files: Dict[str, bytes] = {}
+        self.modification_times: Dict[str, int] = {}
+        self.xattrs: Dict[str, Dict[str, str]] = {}
+        self.directories = {"/"}
+        # The next N NameNode calls answer 503, to exercise client retries
+        self.transient_failures = 0
+        self.namenode_calls = 0
+        self.app = self._build_app()
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        """Returns an httpx transport that serves requests straight from this fake."""
+        return httpx.ASGITransport(app=self.app)
+
+    def _build_app(self) -> FastAPI:
+        router = APIRouter()
+        router.add_api_route("/webhdfs/v1/{path:path}", self._namenode, methods=["GET", "PUT", "POST", "DELETE"])
+        router.add_api_route("/datanode/v1/{path:path}", self._datanode, methods=["GET", "PUT"])
+        app = FastAPI(title="Fake WebHDFS")
+        app.include_router(router)
+        return app
+
+    # --- Namespace helpers ---
+
+    def put_file(self, path: str, data: bytes) -> None:
+        """Stores a file and creates its parent directories."""
+        path = _normalize(path)
+        self.files[path] = data
+        self.modification_times[path] = int(time.time() * 1000)
+        self.xattrs.pop(path, None)
+        self.make_directory(posixpath.dirname(path))
+
+    def make_directory(self, path: str) -> None:
+        """Creates a directory and its missing parents."""
+        path = _normalize(path)
+        while path not in self.directories:
+            self.directories.add(path)
+            path = posixpath.dirname(path)
+
+    def file_status(self, path: str, suffix: str = "") -> Optional[dict]:
+        """Builds the WebHDFS ``FileStatus`` of a path, or None if it does not exist."""
+        if path in self.files:
+            kind, length = "FILE", len(self.files[path])
+        elif path in self.directories:
+            kind, length = "DIRECTORY", 0
+        else:
+            return None
+        return {
+            "pathSuffix": suffix,
+            "type": kind,
+            "length": length,
+            "owner": "root",
+            "group": "supergroup",
+            "permission": "644" if kind == "FILE" else "755",
+            "accessTime": 0,
+            "modificationTime": self.modification_times.get(path, 0),
+            "blockSize": 134217728 if kind == "FILE" else 0,
+            "replication": 1 if kind == "FILE" else 0,
+            "childrenNum": len(self._children(path)) if kind == "DIRECTORY" else 0,
+        }
+
+    def _children(self, path: str):
+        prefix = path.rstrip("/") + "/"
+        names = {p[len(prefix):].split("/", 1)[0] for p in list(self.files) + list(self.directories)
+                 if p.startswith(prefix) and p != prefix}
+        return sorted(names)
+
+    # --- NameNode ---
+
+    async def _namenode(self, path: str, request: Request) -> Response:
+        self.namenode_calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.transient_failures > 0:
+            self.transient_failures -= 1
+            return _remote_exception(503, "RetriableException", "NameNode is busy.")
+
+        path = _normalize(path)
+        query = request.query_params
+        op = query.get("op", "").upper()
+
+        if op == "CREATE":
+            if path in self.files and query.get("overwrite", "false") != "true":
+                return _remote_exception(403, "FileAlreadyExistsException", f"{path} already exists")
+            return self._redirect_to_datanode(request)
+
+        if op == "OPEN":
+            if path not in self.files:
+                return _remote_exception(404, "FileNotFoundException", f"File does not exist: {path}")
+            return self._redirect_to_datanode(request)
+
+        if op == "GETFILESTATUS":
+            status = self.file_status(path)
+            if status is None:
+                return _remote_exception(404, "FileNotFoundException", f"File does not exist: {path}")
+            return JSONResponse({"FileStatus": status})
+
+        if op == "LISTSTATUS":
+            if path in self.files:
+                return JSONResponse({"FileStatuses": {"FileStatus": [self.file_status(path)]}})
+            if path not in self.directories:
+                return _remote_exception(404, "FileNotFoundException", f"File {path} does not exist.")
+            statuses = [self.file_status(posixpath.join(path, name), name) for name in self._children(path)]
+            return JSONResponse({"FileStatuses": {"FileStatus": statuses}})
+
+        if op == "LISTSTATUS_BATCH":
+            if path not in self.directories:
+                return _remote_exception(404, "FileNotFoundException", f"File {path} does not exist.")
+            names = self._children(path)
+            start = bisect.bisect_right(names, query.get("startAfter", "")) if query.get("startAfter") else 0
+            page = names[start:start + self.list_limit]
+            statuses = [self.file_status(posixpath.join(path, name), name) for name in page]
+            return JSONResponse({"DirectoryListing": {
+                "partialListing": {"FileStatuses": {"FileStatus": statuses}},
+                "remainingEntries": len(names) - start - len(page),
+            }})
+
+        if op == "GETXATTRS":
+            if self.file_status(path) is None:
+                return _remote_exception(404, "FileNotFoundException", f"File does not exist: {path}")
+            name = query.get("xattr.name")
+            if name not in self.xattrs.get(path, {}):
+                return _remote_exception(403, "IOException", "At least one of the attributes provided was not found.")
+            return JSONResponse({"XAttrs": [{"name": name, "value": f'"{self.xattrs[path][name]}"'}]})
+
+        if op == "SETXATTR":
+            if self.file_status(path) is None:
+                return _remote_exception(404, "FileNotFoundException", f"File does not exist: {path}")
+            self.xattrs.setdefault(path, {})[query["xattr.name"]] = query["xattr.value"]
+            return Response(status_code=200)
+
+        if op == "MKDIRS":
+            self.make_directory(path)
+            return JSONResponse({"boolean": True})
+
+        if op == "DELETE":
+            return JSONResponse({"boolean": self._delete(path, query.get("recursive", "false") == "true")})
+
+        return _remote_exception(400, "IllegalArgumentException", f"Invalid value for webhdfs parameter \"op\": {op}")
+
+    @staticmethod
+    def _redirect_to_datanode(request: Request) -> Response:
+        location = str(request.url).replace("/webhdfs/v1/", "/datanode/v1/", 1)
+        return Response(status_code=307, headers={"Location": location})
+
+    def _delete(self, path: str, recursive: bool) -> bool:
+        if path in self.files:
+            self._forget(path)
+            return True
+        if path not in self.directories or path == "/":
+            return False
+        if self._children(path) and not recursive:
+            return False
+        prefix = path.rstrip("/") + "/"
+        for file_path in [p for p in self.files if p.startswith(prefix)]:
+            self._forget(file_path)
+        self.directories = {d for d in self.directories if d != path and not d.startswith(prefix)}
+        return True
+
+    def _forget(self, path: str) -> None:
+        del self.files[path]
+        self.modification_times.pop(path, None)
+        self.xattrs.pop(path, None)
+
+    # --- DataNode ---
+
+    async def _datanode(self, path: str, request: Request) -> Response:
+        path = _normalize(path)
+        if request.method == "GET":
+            data = self.files.get(path)
+            if data is None:
+                return _remote_exception(404, "FileNotFoundException", f"File does not exist: {path}")
+            offset = int(request.query_params.get("offset", 0))
+            length = request.query_params.get("length")
+            end = len(data) if length is None else offset + int(length)
+            return Response(content=data[offset:end], media_type="application/octet-stream")
+
+        data = bytearray()
+        async for chunk in request.stream():
+            data.extend(chunk)
+        self.put_file(path, bytes(data))
+        return Response(status_code=201)
+
+
+def _normalize(path: str) -> str:
+    return posixpath.normpath("/" + path.strip("/"))
+
+
+def _remote_exception(status_code: int, exception: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"RemoteException": {
+            "exception": exception,
+            "javaClassName": f"org.apache.hadoop.{exception}",
+            "message": message,
+        }},
+    )
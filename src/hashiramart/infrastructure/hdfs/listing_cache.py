@@ -0,0 +1,79 @@
+import posixpath
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from hashiramart.config.settings import settings
+
+
+def normalize_path(path: str) -> str:
+    """Normalizes an absolute HDFS path, e.g. "/user//x/" -> "/user/x"."""
+    return posixpath.normpath("/" + path.strip("/"))
+
+
+class ListingCache:
+    """
+    A short-TTL cache of HDFS directory listings, keyed by directory path plus a variant
+    (e.g. the page cursor), so polling dashboards do not hit the NameNode on every request.
+
+    Writes through the API call ``invalidate`` so their effect is visible immediately.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        """
+        :param ttl: Seconds a listing is served from the cache.
+        :param max_entries: The number of listings kept; the oldest are dropped first.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, path: str, variant: Hashable = None) -> Optional[Any]:
+        """Returns the cached listing, or None if it is missing or expired."""
+        key = (normalize_path(path), variant)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def put(self, path: str, value: Any, variant: Hashable = None) -> None:
+        """Caches a listing for ``ttl`` seconds."""
+        if self.ttl <= 0:
+            return
+        key = (normalize_path(path), variant)
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, path: str) -> None:
+        """
+        Drops every listing a change at ``path`` can affect: the listings of ``path`` itself,
+        of its ancestors (new or removed children) and of its descendants (deleted subtrees).
+        """
+        path = normalize_path(path)
+        prefix = path.rstrip("/") + "/"
+        for key in list(self._entries):
+            cached = key[0]
+            if cached == path or path.startswith(cached.rstrip("/") + "/") or cached.startswith(prefix):
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_listing_cache: Optional[ListingCache] = None
+
+
+def get_listing_cache() -> ListingCache:
+    """
+    A FastAPI dependency returning the process-wide HDFS listing cache.
+    """
+    global _listing_cache
+    if _listing_cache is None:
+        _listing_cache = ListingCache(settings.HDFS_LISTING_CACHE_TTL)
+    return _listing_cache
@@ -0,0 +1,370 @@
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from hashiramart.config.settings import settings
+from hashiramart.infrastructure.minio.client import ObjectInfo, get_object_store
+
+# Bytes hashed per read when verifying a cached file
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Fetches of an object fetch_prefix tries when other processes keep evicting it
+_MATERIALIZE_ATTEMPTS = 3
+# MinIO ETags of single-part uploads are the content's MD5; multipart ones end in "-<parts>"
+_MD5_ETAG = re.compile(r"^[0-9a-f]{32}$")
+# Lock files the per-object locks are hashed into; a fixed set, so locks/ does not grow
+_LOCK_BUCKETS = 64
+
+
+class ArtifactIntegrityError(Exception):
+    """Raised when downloaded content does not match the size or ETag the store reported."""
+
+
+class ArtifactCache:
+    """
+    A local, content-addressed cache of object store downloads, shared by every process
+    that points at the same directory (API workers, pipeline steps).
+
+    Objects are stored once under the SHA-256 of their content, in ``objects/``; a
+    reference in ``refs/`` maps a bucket, key and ETag to that hash, so an object is only
+    downloaded again when its ETag changes. A per-object file lock, hashed into one of
+    ``_LOCK_BUCKETS`` lock files, makes concurrent processes wait for the one download in
+    progress instead of starting their own. Files are verified against their recorded
+    hash the first time a process reads them, and the least recently used ones are
+    evicted above ``max_bytes``, along with their references.
+    """
+
+    def __init__(self, root: str, store: Any, max_bytes: int):
+        """
+        :param root: The cache directory; created if needed.
+        :param store: A ``MinioObjectStore`` or ``FakeObjectStore``.
+        :param max_bytes: The total size of cached objects kept after each download.
+        """
+        self.root = root
+        self.store = store
+        self.max_bytes = max_bytes
+        for name in ("objects", "refs", "locks", "tmp"):
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+        _remove_legacy_locks(os.path.join(root, "locks"))
+        # Files this process has already hashed: path -> (inode, size)
+        self._verified: Dict[str, Tuple[int, int]] = {}
+        self._verified_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # --- Lookups ---
+
+    def fetch(self, bucket: str, key: str, info: Optional[ObjectInfo] = None) -> str:
+        """
+        Returns the local path of an object's current content, downloading it if needed.
+
+        :param info: The object's stat, if the caller already has it (e.g. from a listing).
+        :return: A path inside the cache; treat it as read-only.
+        """
+        info = info or self.store.stat(bucket, key)
+        ref_name = _ref_name(bucket, key, info.etag)
+
+        path = self._lookup(ref_name)
+        if path is None:
+            with self._lock(_lock_bucket(ref_name)):
+                # Another process may have finished the download while we waited
+                path = self._lookup(ref_name)
+                if path is None:
+                    path = self._download(bucket, key, info, ref_name)
+                    self.misses += 1
+                    self.evict(keep=path)
+                    return path
+        self.hits += 1
+        return path
+
+    def fetch_prefix(self, bucket: str, prefix: str, dest_dir: str) -> List[str]:
+        """
+        Materializes every object under a prefix in ``dest_dir``, keeping the key layout
+        below the prefix, e.g. an MLflow model directory or a partitioned Parquet dataset.
+        The prefix is a directory, so "models/m1" does not match "models/m10/...". Files
+        are hard links into the cache, so the data is stored on disk only once.
+
+        :return: The local paths, in key order.
+        """
+        directory = prefix.rstrip("/")
+        paths = []
+        for info in self.store.list(bucket, prefix):
+            if info.key != directory and not info.key.startswith(directory + "/"):
+                continue
+            relative = info.key[len(directory):].lstrip("/") or os.path.basename(info.key)
+            target = os.path.join(dest_dir, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            self._materialize(bucket, info, target)
+            paths.append(target)
+        return paths
+
+    def _materialize(self, bucket: str, info: ObjectInfo, target: str) -> None:
+        """Links (or copies) an object's cached file to ``target``."""
+        if os.path.exists(target):
+            os.remove(target)
+        for attempt in range(_MATERIALIZE_ATTEMPTS):
+            source = self.fetch(bucket, info.key, info)
+            try:
+                try:
+                    os.link(source, target)
+                except OSError as e:
+                    if isinstance(e, FileNotFoundError):
+                        raise
+                    # Across file systems; fall back to a copy
+                    with open(source, "rb") as src, open(target, "wb") as dst:
+                        while chunk := src.read(_HASH_CHUNK_SIZE):
+                            dst.write(chunk)
+                return
+            except FileNotFoundError:
+                # Another process evicted the file between fetch() and the link; fetch it
+                # again. Once linked or opened, eviction no longer affects the file.
+                if attempt == _MATERIALIZE_ATTEMPTS - 1:
+                    raise
+
+    def _lookup(self, ref_name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, "refs", ref_name)) as f:
+                ref = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        path = self._object_path(ref["sha256"])
+        if not self._verify(path, ref):
+            return None
+        # Mark as recently used for eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def _verify(self, path: str, ref: Dict[str, Any]) -> bool:
+        """Checks a cached file against its reference; hashed once per process."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if stat.st_size != ref["size"]:
+            print(f"Cached artifact {path} has the wrong size; downloading it again")
+            _remove(path)
+            return False
+        # mtime changes on every use (LRU), so a file is identified by inode and size
+        identity = (stat.st_ino, stat.st_size)
+        with self._verified_lock:
+            if self._verified.get(path) == identity:
+                return True
+        if _sha256(path) != ref["sha256"]:
+            print(f"Cached artifact {path} is corrupt; downloading it again")
+            _remove(path)
+            return False
+        with self._verified_lock:
+            self._verified[path] = identity
+        return True
+
+    # --- Downloads ---
+
+    def _download(self, bucket: str, key: str, info: ObjectInfo, ref_name: str) -> str:
+        print(f"Downloading {bucket}/{key} ({info.size} bytes) into the artifact cache")
+        sha256, md5, size = hashlib.sha256(), hashlib.md5(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, "tmp"))
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                sink = _HashingWriter(tmp, (sha256, md5))
+                self.store.download(bucket, key, sink)
+                size = sink.size
+            if size != info.size:
+                raise ArtifactIntegrityError(f"{bucket}/{key}: expected {info.size} bytes, got {size}")
+            if _MD5_ETAG.match(info.etag) and md5.hexdigest() != info.etag:
+                raise ArtifactIntegrityError(f"{bucket}/{key}: content does not match ETag {info.etag}")
+
+            digest = sha256.hexdigest()
+            path = self._object_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Read-only, since fetch_prefix hands out hard links to the same file
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, path)
+        except BaseException:
+            _remove(tmp_path)
+            raise
+
+        ref = {"bucket": bucket, "key": key, "etag": info.etag, "size": size, "sha256": digest}
+        _write_atomic(os.path.join(self.root, "refs", ref_name), json.dumps(ref), os.path.join(self.root, "tmp"))
+        with self._verified_lock:
+            stat = os.stat(path)
+            self._verified[path] = (stat.st_ino, stat.st_size)
+        return path
+
+    # --- Eviction ---
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Deletes the least recently used objects until the cache fits in ``max_bytes``, and
+        the references to them. Processes that already opened an evicted file keep reading it.
+
+        :param keep: A path never to evict, e.g. the object just downloaded.
+        :return: The number of bytes freed.
+        """
+        with self._lock("evict"):
+            entries = []
+            for directory, _, files in os.walk(os.path.join(self.root, "objects")):
+                for name in files:
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            freed = 0
+            for _, size, path in sorted(entries):
+                if total - freed <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                _remove(path)
+                freed += size
+            if freed:
+                removed = self._remove_dangling_refs()
+                print(f"Evicted {freed} bytes and {removed} reference(s) from the artifact cache")
+            return freed
+
+    def _remove_dangling_refs(self) -> int:
+        """Deletes the references whose object is gone; called with the eviction lock held."""
+        removed = 0
+        refs_dir = os.path.join(self.root, "refs")
+        for name in os.listdir(refs_dir):
+            path = os.path.join(refs_dir, name)
+            try:
+                with open(path) as f:
+                    digest = json.load(f)["sha256"]
+            except FileNotFoundError:
+                continue
+            except (ValueError, KeyError):
+                digest = None
+            if digest is None or not os.path.exists(self._object_path(digest)):
+                _remove(path)
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = [
+            os.path.getsize(os.path.join(directory, name))
+            for directory, _, files in os.walk(os.path.join(self.root, "objects"))
+            for name in files
+        ]
+        return {"objects": len(sizes), "bytes": sum(sizes), "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    # --- Helpers ---
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    @contextmanager
+    def _lock(self, name: str) -> Iterator[None]:
+        """An exclusive lock shared by every process using this cache directory."""
+        with open(os.path.join(self.root, "locks", name + ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _HashingWriter:
+    """A write-only file wrapper that hashes and counts what goes through it."""
+
+    def __init__(self, file, hashes):
+        self.file = file
+        self.hashes = hashes
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        for h in self.hashes:
+            h.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+
+def _ref_name(bucket: str, key: str, etag: str) -> str:
+    return hashlib.sha256(f"{bucket}\0{key}\0{etag}".encode("utf-8")).hexdigest()
+
+
+def _lock_bucket(ref_name: str) -> str:
+    """The lock file name of a reference: one of ``_LOCK_BUCKETS``, by its hash."""
+    return f"ref-{int(ref_name[:8], 16) % _LOCK_BUCKETS}"
+
+
+def _remove_legacy_locks(locks_dir: str) -> None:
+    """Deletes the per-reference lock files earlier versions of the cache created."""
+    for name in os.listdir(locks_dir):
+        if re.fullmatch(r"[0-9a-f]{64}\.lock", name):
+            _remove(os.path.join(locks_dir, name))
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, text: str, tmp_dir: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def parse_s3_uri(uri: str) -> Tuple[str, str]:
+    """Splits "s3://bucket/some/key" (or s3a://) into ("bucket", "some/key")."""
+    scheme, _, rest = uri.partition("://")
+    if scheme not in ("s3", "s3a") or not rest:
+        raise ValueError(f"Not an S3 URI: {uri}")
+    bucket, _, key = rest.partition("/")
+    return bucket, key
+
+
+_artifact_cache: Optional[ArtifactCache] = None
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """
+    Returns the process-wide artifact cache over MinIO, created on first use.
+    """
+    global _artifact_cache
+    if _artifact_cache is None:
+        _artifact_cache = ArtifactCache(
+            settings.ARTIFACT_CACHE_DIR,
+            get_object_store(),
+            int(settings.ARTIFACT_CACHE_MAX_GB * 1024 ** 3),
+        )
+    return _artifact_cache
+
+
+if __name__ == "__main__":
+    # For pipeline steps, e.g.
+    # python -m hashiramart.infrastructure.minio.artifact_cache s3://dvc-storage/processed/forecasting_features.parquet data/processed/forecasting_features.parquet
+    parser = argparse.ArgumentParser(description="Fetch an object or a prefix from MinIO through the shared artifact cache.")
+    parser.add_argument("uri", help="s3://bucket/key or s3://bucket/prefix/")
+    parser.add_argument("dest", help="The local file or directory to create.")
+    args = parser.parse_args()
+
+    cache = get_artifact_cache()
+    source_bucket, source_key = parse_s3_uri(args.uri)
+    fetched = cache.fetch_prefix(source_bucket, source_key, args.dest)
+    print(f"Fetched {len(fetched)} file(s) into {args.dest}")
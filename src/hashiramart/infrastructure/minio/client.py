@@ -0,0 +1,66 @@
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+
+from hashiramart.config.settings import settings
+
+# Bytes read from the object store per chunk when downloading
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ObjectInfo(NamedTuple):
+    key: str
+    size: int
+    etag: str
+
+
+class MinioObjectStore:
+    """
+    The object store operations the artifact cache needs, over a MinIO client.
+    ``FakeObjectStore`` implements the same methods in process.
+    """
+
+    def __init__(self, client):
+        """
+        :param client: A ``minio.Minio`` client.
+        """
+        self.client = client
+
+    def stat(self, bucket: str, key: str) -> ObjectInfo:
+        """Returns the size and ETag of an object; a HEAD request, no data is read."""
+        info = self.client.stat_object(bucket, key)
+        return ObjectInfo(key, info.size, info.etag.strip('"'))
+
+    def list(self, bucket: str, prefix: str) -> Iterator[ObjectInfo]:
+        """Lists the objects under a prefix, recursively."""
+        for obj in self.client.list_objects(bucket, prefix=prefix, recursive=True):
+            if not obj.is_dir:
+                yield ObjectInfo(obj.object_name, obj.size, obj.etag.strip('"'))
+
+    def download(self, bucket: str, key: str, sink: BinaryIO) -> None:
+        """Streams an object into ``sink`` chunk by chunk."""
+        response = self.client.get_object(bucket, key)
+        try:
+            for chunk in response.stream(DOWNLOAD_CHUNK_SIZE):
+                sink.write(chunk)
+        finally:
+            response.close()
+            response.release_conn()
+
+
+_object_store: Optional[MinioObjectStore] = None
+
+
+def get_object_store() -> MinioObjectStore:
+    """
+    Returns the process-wide MinIO object store, created on first use.
+    """
+    global _object_store
+    if _object_store is None:
+        from minio import Minio
+
+        _object_store = MinioObjectStore(Minio(
+            settings.MINIO_ENDPOINT,
+            access_key=settings.MINIO_ROOT_USER,
+            secret_key=settings.MINIO_ROOT_PASSWORD,
+            secure=settings.MINIO_SECURE,
+        ))
+    return _object_store
@@ -0,0 +1,53 @@
+import hashlib
+import time
+from typing import BinaryIO, Dict, Iterator, Tuple
+
+from hashiramart.infrastructure.minio.client import DOWNLOAD_CHUNK_SIZE, ObjectInfo
+
+
+class FakeObjectStore:
+    """
+    An in-process, in-memory stand-in for MinIO with the methods of ``MinioObjectStore``.
+
+    ETags are the MD5 of the content, as MinIO computes them for single-part uploads.
+    The call and byte counters show how much a piece of code downloads, e.g. to check
+    that several cache users share one download.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        :param latency: Seconds added to every download, to mimic a remote store.
+        """
+        self.latency = latency
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+        self.stat_calls = 0
+        self.downloads = 0
+        self.bytes_downloaded = 0
+
+    def put_object(self, bucket: str, key: str, data: bytes) -> None:
+        self.objects[(bucket, key)] = data
+
+    def stat(self, bucket: str, key: str) -> ObjectInfo:
+        self.stat_calls += 1
+        data = self._get(bucket, key)
+        return ObjectInfo(key, len(data), hashlib.md5(data).hexdigest())
+
+    def list(self, bucket: str, prefix: str) -> Iterator[ObjectInfo]:
+        for (object_bucket, key), data in sorted(self.objects.items()):
+            if object_bucket == bucket and key.startswith(prefix):
+                yield ObjectInfo(key, len(data), hashlib.md5(data).hexdigest())
+
+    def download(self, bucket: str, key: str, sink: BinaryIO) -> None:
+        data = self._get(bucket, key)
+        if self.latency:
+            time.sleep(self.latency)
+        self.downloads += 1
+        for start in range(0, len(data), DOWNLOAD_CHUNK_SIZE):
+            sink.write(data[start:start + DOWNLOAD_CHUNK_SIZE])
+            self.bytes_downloaded += len(data[start:start + DOWNLOAD_CHUNK_SIZE])
+
+    def _get(self, bucket: str, key: str) -> bytes:
+        try:
+            return self.objects[(bucket, key)]
+        except KeyError:
+            raise FileNotFoundError(f"No such object: {bucket}/{key}")
@@ -0,0 +1,68 @@
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Application states after which YARN never changes the application again
+TERMINAL_STATES = {"FINISHED", "FAILED", "KILLED"}
+
+
+class YarnClient:
+    """
+    An async client for the YARN ResourceManager REST API with a pooled connection.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            *,
+            timeout: float = 10.0,
+            transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        :param base_url: The cluster API root, e.g. "http://resourcemanager:8088/ws/v1/cluster".
+        :param timeout: Seconds to wait for the ResourceManager.
+        :param transport: An optional httpx transport, e.g. one serving a fake ResourceManager in-process.
+        """
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.AsyncClient(timeout=timeout, transport=transport)
+
+    async def aclose(self) -> None:
+        """Closes all pooled connections."""
+        await self._client.aclose()
+
+    async def submit(self, payload: Dict[str, Any]) -> str:
+        """
+        Submits an application.
+
+        :param payload: The application submission context.
+        :return: The application ID, taken from the Location header of the 202 response.
+        :raises httpx.HTTPError: If the ResourceManager rejects the submission or cannot be reached.
+        """
+        response = await self._client.post(f"{self.base_url}/apps", json=payload)
+        response.raise_for_status()
+        return response.headers.get("Location", "").split("/")[-1]
+
+    async def list_apps(self, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Lists applications in one call.
+
+        :param filters: ResourceManager query filters, e.g. ``applicationTypes="SPARK"`` or
+            ``startedTimeBegin=<epoch ms>``.
+        :return: The application reports.
+        """
+        response = await self._client.get(f"{self.base_url}/apps", params=filters)
+        response.raise_for_status()
+        # YARN answers {"apps": null} when nothing matches
+        return (response.json().get("apps") or {}).get("app", [])
+
+    async def get_app(self, app_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Gets one application report.
+
+        :return: The report, or None if the ResourceManager does not know the application.
+        """
+        response = await self._client.get(f"{self.base_url}/apps/{app_id}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()["app"]
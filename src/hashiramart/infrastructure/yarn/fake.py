@@ -0,0 +1,82 @@
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+class FakeResourceManager:
+    """
+    An in-process stand-in for the YARN ResourceManager REST API (``/ws/v1/cluster/apps``).
+
+    Submitted applications start as ACCEPTED and only move when a test calls ``advance``.
+    ``calls`` counts the requests received, to check how often the API hits the ResourceManager.
+    """
+
+    def __init__(self):
+        self.apps: Dict[str, Dict[str, Any]] = {}
+        self.calls = 0
+        self._counter = 0
+        self.app = self._build_app()
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        """Returns an httpx transport that serves requests straight from this fake."""
+        return httpx.ASGITransport(app=self.app)
+
+    def advance(self, app_id: str, state: str, final_status: str = "UNDEFINED", progress: Optional[float] = None) -> None:
+        """Moves an application to a new state, e.g. ("RUNNING") or ("FINISHED", "SUCCEEDED")."""
+        app = self.apps[app_id]
+        app.update(state=state, finalStatus=final_status)
+        app["progress"] = progress if progress is not None else (100.0 if state == "FINISHED" else app["progress"])
+        if state in ("FINISHED", "FAILED", "KILLED"):
+            app["finishedTime"] = int(time.time() * 1000)
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake YARN ResourceManager")
+        app.add_api_route("/ws/v1/cluster/apps", self._submit, methods=["POST"])
+        app.add_api_route("/ws/v1/cluster/apps", self._list, methods=["GET"])
+        app.add_api_route("/ws/v1/cluster/apps/{app_id}", self._get, methods=["GET"])
+        return app
+
+    async def _submit(self, request: Request) -> Response:
+        self.calls += 1
+        payload = await request.json()
+        self._counter += 1
+        app_id = f"application_1700000000000_{self._counter:04d}"
+        self.apps[app_id] = {
+            "id": app_id,
+            "name": payload.get("application-name"),
+            "applicationType": payload.get("application-type", "MAPREDUCE"),
+            "state": "ACCEPTED",
+            "finalStatus": "UNDEFINED",
+            "progress": 0.0,
+            "startedTime": int(time.time() * 1000),
+            "finishedTime": 0,
+            "trackingUrl": f"http://resourcemanager:8088/proxy/{app_id}/",
+            "diagnostics": "",
+        }
+        return Response(status_code=202, headers={"Location": f"{request.url}/{app_id}"})
+
+    async def _list(self, request: Request) -> JSONResponse:
+        self.calls += 1
+        query = request.query_params
+        apps = list(self.apps.values())
+        if "applicationTypes" in query:
+            types = {t.strip().upper() for t in query["applicationTypes"].split(",")}
+            apps = [app for app in apps if app["applicationType"].upper() in types]
+        if "states" in query:
+            states = {s.strip().upper() for s in query["states"].split(",")}
+            apps = [app for app in apps if app["state"] in states]
+        if "startedTimeBegin" in query:
+            apps = [app for app in apps if app["startedTime"] >= int(query["startedTimeBegin"])]
+        return JSONResponse({"apps": {"app": apps} if apps else None})
+
+    async def _get(self, app_id: str) -> JSONResponse:
+        self.calls += 1
+        if app_id not in self.apps:
+            return JSONResponse(status_code=404, content={"RemoteException": {
+                "exception": "NotFoundException",
+                "message": f"app with id: {app_id} not found",
+            }})
+        return JSONResponse({"app": self.apps[app_id]})
@@ -0,0 +1,283 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+from hashiramart.config.settings import settings
+from hashiramart.infrastructure.yarn.client import TERMINAL_STATES, YarnClient
+
+# Look this far before the oldest tracked submission when asking YARN for recent applications
+_STARTED_TIME_MARGIN_MS = 60_000
+# The state of an application the ResourceManager no longer knows, e.g. after a restart
+# or once finished applications were purged; final like TERMINAL_STATES
+LOST_STATE = "LOST"
+
+
+class JobTracker:
+    """
+    Registry of submitted YARN applications with cached statuses.
+
+    Statuses are refreshed by one background poller that issues a single bulk
+    ``/apps`` call per interval for every unfinished tracked application, so status
+    queries never hit the ResourceManager directly. Identical submissions (same dedup
+    key) are not resubmitted while the earlier application is still unfinished. An
+    application that disappears from the ResourceManager is marked LOST, which frees its key.
+    Finished applications, and those only looked up, are forgotten after ``retention`` seconds.
+    """
+
+    def __init__(
+            self,
+            client: YarnClient,
+            poll_interval: float = 5.0,
+            application_type: str = "SPARK",
+            missing_polls: int = 3,
+            miss_ttl: float = 30.0,
+            retention: float = 3600.0,
+    ):
+        """
+        :param client: The ResourceManager client.
+        :param poll_interval: Seconds between two bulk status refreshes.
+        :param application_type: The YARN application type the bulk refresh is filtered on.
+        :param missing_polls: Bulk refreshes an unfinished application may be absent from
+            before it is looked up on its own, and marked LOST if YARN does not know it.
+        :param miss_ttl: Seconds an ID YARN does not know is answered as unknown without asking again.
+        :param retention: Seconds a finished application is kept after its last update, and an
+            application not submitted through this tracker after it was last requested.
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self.application_type = application_type
+        self.missing_polls = missing_polls
+        self.miss_ttl = miss_ttl
+        self.retention = retention
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._active_by_key: Dict[str, str] = {}
+        # Consecutive bulk refreshes each unfinished application was absent from
+        self._missing: Dict[str, int] = {}
+        # IDs YARN did not know when last asked: app_id -> monotonic expiry
+        self._misses: Dict[str, float] = {}
+        # When each application not submitted through this tracker was last requested (ms)
+        self._requested_at: Dict[str, int] = {}
+        self._submit_locks: Dict[str, asyncio.Lock] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    # --- Submission ---
+
+    async def submit(self, dedup_key: str, build_payload: Callable[[], Dict[str, Any]], **metadata: Any) -> Dict[str, Any]:
+        """
+        Submits an application unless an identical one is still unfinished.
+
+        :param dedup_key: Submissions with the same key are identical, e.g. the task name.
+        :param build_payload: Builds the submission context; only called when actually submitting.
+        :param metadata: Extra fields stored with the job record, e.g. ``task_name``.
+        :return: The job record, with ``deduplicated`` set if an existing application was returned.
+        :raises httpx.HTTPError: If the submission fails.
+        """
+        self._prune()
+        lock = self._submit_locks.setdefault(dedup_key, asyncio.Lock())
+        async with lock:
+            existing_id = self._active_by_key.get(dedup_key)
+            if existing_id and not self._is_finished(self._jobs[existing_id]):
+                return {**self._jobs[existing_id], "deduplicated": True}
+
+            app_id = await self.client.submit(build_payload())
+            self._jobs[app_id] = {
+                "application_id": app_id,
+                "dedup_key": dedup_key,
+                **metadata,
+                "submitted_at": int(time.time() * 1000),
+                "state": "SUBMITTED",
+                "final_status": "UNDEFINED",
+                "progress": 0.0,
+                "started_time": None,
+                "tracking_url": None,
+                "diagnostics": None,
+                "updated_at": None,
+            }
+            self._active_by_key[dedup_key] = app_id
+            self._ensure_poller()
+            return {**self._jobs[app_id], "deduplicated": False}
+
+    # --- Status queries (served from the cache) ---
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Returns every tracked job, most recent submission first."""
+        self._prune()
+        return sorted(self._jobs.values(), key=lambda job: job["submitted_at"], reverse=True)
+
+    async def statuses(self, app_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Returns the cached status of many applications.
+
+        Applications not submitted through this tracker are looked up one by one, after
+        which the poller keeps them up to date as well. IDs YARN does not know are
+        remembered for ``miss_ttl`` seconds, so polling a stale ID does not hit the
+        ResourceManager on every request.
+
+        :return: The job record per requested ID, or None for IDs YARN does not know or
+            rejects, e.g. a malformed one.
+        """
+        self._prune()
+        app_ids = list(dict.fromkeys(app_ids))
+        now = time.monotonic()
+        self._misses = {app_id: expiry for app_id, expiry in self._misses.items() if expiry > now}
+        unknown = [app_id for app_id in app_ids if app_id not in self._jobs and app_id not in self._misses]
+        if unknown:
+            reports = await asyncio.gather(*(self._lookup(app_id) for app_id in unknown))
+            now_ms = int(time.time() * 1000)
+            for app_id, report in zip(unknown, reports):
+                if report is None:
+                    self._misses[app_id] = now + self.miss_ttl
+                    continue
+                self._jobs[app_id] = {
+                    "application_id": app_id, "dedup_key": None, "submitted_at": now_ms,
+                    "state": None, "final_status": None, "progress": None, "started_time": None,
+                    "tracking_url": None, "diagnostics": None, "updated_at": None,
+                }
+                self._apply_report(self._jobs[app_id], report, now_ms)
+            self._ensure_poller()
+        now_ms = int(time.time() * 1000)
+        for app_id in app_ids:
+            if app_id in self._jobs and self._jobs[app_id]["dedup_key"] is None:
+                self._requested_at[app_id] = now_ms
+        return {app_id: self._jobs.get(app_id) for app_id in app_ids}
+
+    async def _lookup(self, app_id: str) -> Optional[Dict[str, Any]]:
+        """Fetches one application's report; None if YARN does not know the ID or rejects it."""
+        try:
+            return await self.client.get_app(app_id)
+        except httpx.HTTPStatusError as e:
+            if 400 <= e.response.status_code < 500:
+                print(f"YARN rejected the lookup of application {app_id} (HTTP {e.response.status_code})")
+                return None
+            raise
+
+    # --- Polling ---
+
+    async def refresh(self, lookback_ms: int = _STARTED_TIME_MARGIN_MS) -> None:
+        """
+        Refreshes every unfinished tracked application with one bulk ``/apps`` call.
+
+        :param lookback_ms: How far before the oldest unfinished submission to ask YARN for
+            applications.
+        """
+        self._prune()
+        active = [job for job in self._jobs.values() if not self._is_finished(job)]
+        if not active:
+            return
+
+        oldest = min(job["started_time"] or job["submitted_at"] for job in active)
+        filters = {"applicationTypes": self.application_type, "startedTimeBegin": oldest - lookback_ms}
+
+        now = int(time.time() * 1000)
+        reported = set()
+        for report in await self.client.list_apps(**filters):
+            job = self._jobs.get(report["id"])
+            if job is not None:
+                self._apply_report(job, report, now)
+                reported.add(report["id"])
+
+        # An application can drop out of the listing without ever reaching a final state;
+        # after a few absences, ask for it directly and give it up if YARN does not know it
+        for job in active:
+            app_id = job["application_id"]
+            if app_id in reported:
+                self._missing.pop(app_id, None)
+                continue
+            self._missing[app_id] = self._missing.get(app_id, 0) + 1
+            if self._missing[app_id] < self.missing_polls:
+                continue
+            report = await self.client.get_app(app_id)
+            if report is not None:
+                self._apply_report(job, report, now)
+                self._missing.pop(app_id, None)
+            else:
+                job.update({
+                    "state": LOST_STATE,
+                    "diagnostics": "The ResourceManager no longer reports this application.",
+                    "updated_at": now,
+                })
+                self._missing.pop(app_id, None)
+                print(f"YARN application {app_id} is no longer known to the ResourceManager; marked {LOST_STATE}")
+
+    def _prune(self) -> None:
+        """Forgets the applications past their retention, and the submit locks of freed keys."""
+        cutoff = int((time.time() - self.retention) * 1000)
+        for app_id, job in list(self._jobs.items()):
+            if job["dedup_key"] is None:
+                expired = self._requested_at.get(app_id, job["submitted_at"]) < cutoff
+            else:
+                expired = self._is_finished(job) and (job["updated_at"] or job["submitted_at"]) < cutoff
+            if not expired:
+                continue
+            del self._jobs[app_id]
+            self._missing.pop(app_id, None)
+            self._requested_at.pop(app_id, None)
+            if self._active_by_key.get(job["dedup_key"]) == app_id:
+                del self._active_by_key[job["dedup_key"]]
+        for key, lock in list(self._submit_locks.items()):
+            # A lock nobody holds or waits for is recreated on the next submission
+            if not lock.locked() and key not in self._active_by_key:
+                del self._submit_locks[key]
+
+    @staticmethod
+    def _apply_report(job: Dict[str, Any], report: Dict[str, Any], now: int) -> None:
+        job.update({
+            "state": report.get("state"),
+            "final_status": report.get("finalStatus"),
+            "progress": report.get("progress"),
+            "started_time": report.get("startedTime") or None,
+            "tracking_url": report.get("trackingUrl"),
+            "diagnostics": report.get("diagnostics"),
+            "updated_at": now,
+        })
+
+    def _ensure_poller(self) -> None:
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+
+    async def _poll(self) -> None:
+        """Refreshes statuses every poll interval until no tracked application is unfinished."""
+        while any(not self._is_finished(job) for job in self._jobs.values()):
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except (httpx.HTTPError, ValueError) as e:
+                # Keep serving the last known statuses; the next round retries
+                print(f"YARN status refresh failed: {e}")
+
+    @staticmethod
+    def _is_finished(job: Dict[str, Any]) -> bool:
+        return job["state"] in TERMINAL_STATES or job["state"] == LOST_STATE
+
+    async def aclose(self) -> None:
+        """Stops the poller and closes the ResourceManager client."""
+        if self._poller is not None:
+            self._poller.cancel()
+        await self.client.aclose()
+
+
+_job_tracker: Optional[JobTracker] = None
+
+
+def get_job_tracker() -> JobTracker:
+    """
+    A FastAPI dependency returning the process-wide YARN job tracker.
+    """
+    global _job_tracker
+    if _job_tracker is None:
+        _job_tracker = JobTracker(
+            YarnClient(settings.YARN_API_URL, timeout=settings.YARN_TIMEOUT),
+            poll_interval=settings.YARN_POLL_INTERVAL,
+            retention=settings.YARN_JOB_RETENTION,
+        )
+    return _job_tracker
+
+
+async def close_job_tracker() -> None:
+    """Stops the process-wide job tracker, if it was created."""
+    global _job_tracker
+    if _job_tracker is not None:
+        await _job_tracker.aclose()
+        _job_tracker = None
@@ -0,0 +1,312 @@
+import asyncio
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from hashiramart.config.settings import settings
+from hashiramart.infrastructure.minio.artifact_cache import get_artifact_cache, parse_s3_uri
+
+
+class ModelNotLoadedError(RuntimeError):
+    """Raised when a model is requested before any version could be loaded."""
+
+
+class LoadedModel(NamedTuple):
+    version: str
+    model: Any
+    loaded_at: float
+
+
+class LocalModelSource:
+    """
+    A pickled model file, e.g. models/forecaster.pkl as written by the DVC pipeline.
+    A version is the file's identity and modification time, so replacing or rewriting
+    the file is a new version.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def latest_version(self) -> Optional[str]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+    def load(self, version: str) -> Any:
+        with open(self.path, "rb") as f:
+            return pickle.load(f)
+
+    def __str__(self) -> str:
+        return self.path
+
+
+class MlflowModelSource:
+    """
+    A model of the MLflow model registry; the latest version in ``stage`` is served.
+    """
+
+    def __init__(self, model_name: str, stage: str, tracking_uri: str):
+        self.model_name = model_name
+        self.stage = stage
+        self.tracking_uri = tracking_uri
+
+    def latest_version(self) -> Optional[str]:
+        from mlflow.tracking import MlflowClient
+
+        versions = MlflowClient(tracking_uri=self.tracking_uri).get_latest_versions(self.model_name, stages=[self.stage])
+        return versions[0].version if versions else None
+
+    def load(self, version: str) -> Any:
+        import mlflow
+        import mlflow.sklearn
+        from mlflow.tracking import MlflowClient
+
+        mlflow.set_tracking_uri(self.tracking_uri)
+        # The registered models are pickled scikit-learn-style estimators; load the
+        # estimator itself so model-specific methods stay available
+        source = MlflowClient(tracking_uri=self.tracking_uri).get_model_version(self.model_name, version).source
+        location = _minio_location(source)
+        if location is None:
+            return mlflow.sklearn.load_model(f"models:/{self.model_name}/{version}")
+
+        # Artifacts in MinIO go through the artifact cache shared by the workers, so a
+        # version is downloaded once per host rather than once per worker and restart
+        cache = get_artifact_cache()
+        with tempfile.TemporaryDirectory(dir=os.path.join(cache.root, "tmp")) as model_dir:
+            cache.fetch_prefix(*location, model_dir)
+            return mlflow.sklearn.load_model(model_dir)
+
+    def __str__(self) -> str:
+        return f"models:/{self.model_name}@{self.stage}"
+
+
+def _minio_location(uri: str) -> Optional[Tuple[str, str]]:
+    """
+    Returns the MinIO bucket and prefix of an artifact URI, or None if it is not stored
+    in MinIO. The tracking server proxies "mlflow-artifacts:/" to s3://mlflow-artifacts/.
+    """
+    if uri.startswith("mlflow-artifacts:"):
+        path = uri[len("mlflow-artifacts:"):].lstrip("/")
+        # "mlflow-artifacts://host:port/path" names the proxying server first
+        if uri.startswith("mlflow-artifacts://"):
+            path = path.partition("/")[2]
+        return "mlflow-artifacts", path.rstrip("/") + "/"
+    if uri.startswith(("s3://", "s3a://")):
+        bucket, key = parse_s3_uri(uri)
+        return bucket, key.rstrip("/") + "/"
+    return None
+
+
+class ModelManager:
+    """
+    Serves the current version of a model and swaps in new versions without blocking
+    requests.
+
+    The active and previous versions live in a two-slot state that is replaced by one
+    assignment, so readers never take a lock and a request that already holds a model
+    keeps using it until it finishes. New versions are found by polling the source,
+    loaded and warmed up in a worker thread, and only swapped in once the warmup
+    succeeds. A version failing its warmup is skipped; one failing to load is retried
+    with backoff. ``rollback`` swaps the previous version back and skips the rolled-back
+    version until a newer one appears.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        source: Any,
+        warmup: Optional[Callable[[Any], None]] = None,
+        poll_interval: float = 30.0,
+        max_load_attempts: int = 5,
+    ):
+        """
+        :param name: The model name, e.g. "forecaster".
+        :param source: A LocalModelSource or MlflowModelSource.
+        :param warmup: Called with each newly loaded model before it is swapped in, e.g.
+            to run synthetic requests; a failure rejects the version.
+        :param poll_interval: Seconds between two checks for a new version.
+        :param max_load_attempts: Failed loads of a version before it is skipped; retries
+            back off exponentially from ``poll_interval``.
+        """
+        self.name = name
+        self.source = source
+        self.warmup = warmup
+        self.poll_interval = poll_interval
+        self.max_load_attempts = max_load_attempts
+        # (active, previous); replaced as a whole, never mutated
+        self._state: tuple = (None, None)
+        self._refresh_lock = threading.Lock()
+        self._skipped_versions: set = set()
+        # Versions whose load failed: version -> (failures, monotonic time of the next attempt)
+        self._load_failures: Dict[str, Tuple[int, float]] = {}
+        self._last_error: Optional[str] = None
+        self._poller: Optional[asyncio.Task] = None
+
+    def get(self) -> Any:
+        """
+        Returns the active model, loading the latest version first if none is loaded yet.
+
+        :raises ModelNotLoadedError: If no version could be loaded.
+        """
+        active = self._state[0]
+        if active is None:
+            self.refresh()
+            active = self._state[0]
+            if active is None:
+                raise ModelNotLoadedError(f"No {self.name} model is loaded: {self._last_error or 'none published'}")
+        return active.model
+
+    def refresh(self) -> bool:
+        """
+        Loads, warms up and swaps in the latest version if it is new.
+
+        :return: Whether a new version was swapped in.
+        """
+        with self._refresh_lock:
+            version = self.source.latest_version()
+            active = self._state[0]
+            if version is None or version in self._skipped_versions or (active and active.version == version):
+                return False
+
+            failures, retry_at = self._load_failures.get(version, (0, 0.0))
+            if time.monotonic() < retry_at:
+                return False
+
+            print(f"Loading {self.name} model version {version} from {self.source}")
+            try:
+                model = self.source.load(version)
+            except Exception as e:
+                # Often transient (object store, registry, network): retry with backoff,
+                # and give the version up only after max_load_attempts failures
+                failures += 1
+                self._last_error = f"version {version}: {e}"
+                if failures >= self.max_load_attempts:
+                    self._skipped_versions.add(version)
+                    self._load_failures.pop(version, None)
+                    print(f"Gave up loading {self.name} model version {version} after {failures} attempts: {e}")
+                else:
+                    delay = self.poll_interval * 2 ** (failures - 1)
+                    self._load_failures[version] = (failures, time.monotonic() + delay)
+                    print(f"Loading {self.name} model version {version} failed, retrying in {delay:.0f}s: {e}")
+                return False
+            self._load_failures.pop(version, None)
+
+            if self.warmup is not None:
+                try:
+                    started = time.perf_counter()
+                    self.warmup(model)
+                    print(f"Warmed up {self.name} model version {version} in {time.perf_counter() - started:.2f}s")
+                except Exception as e:
+                    # The model itself is unusable; keep serving the active version and
+                    # never retry this one
+                    self._skipped_versions.add(version)
+                    self._last_error = f"version {version}: {e}"
+                    print(f"Rejected {self.name} model version {version}: {e}")
+                    return False
+
+            self._state = (LoadedModel(version, model, time.time()), active)
+            self._last_error = None
+            print(f"Serving {self.name} model version {version}")
+            return True
+
+    def rollback(self) -> str:
+        """
+        Swaps the previous version back in and skips the active one. Only one rollback is
+        possible until a new version is swapped in.
+
+        :return: The version now served.
+        :raises ModelNotLoadedError: If there is no previous version, or it is skipped.
+        """
+        with self._refresh_lock:
+            active, previous = self._state
+            if previous is None or previous.version in self._skipped_versions:
+                raise ModelNotLoadedError(f"No previous {self.name} model to roll back to")
+            self._skipped_versions.add(active.version)
+            # Restored on purpose, so no longer skipped; the rolled-back version is not kept
+            # as the previous one, so a second rollback cannot bring it back
+            self._skipped_versions.discard(previous.version)
+            self._state = (previous, None)
+            print(f"Rolled back {self.name} model from version {active.version} to {previous.version}")
+            return previous.version
+
+    def status(self) -> Dict[str, Any]:
+        active, previous = self._state
+        return {
+            "name": self.name,
+            "source": str(self.source),
+            "active_version": active.version if active else None,
+            "active_loaded_at": active.loaded_at if active else None,
+            "previous_version": previous.version if previous else None,
+            "skipped_versions": sorted(self._skipped_versions),
+            "load_failures": {version: failures for version, (failures, _) in self._load_failures.items()},
+            "last_error": self._last_error,
+        }
+
+    # --- Background polling ---
+
+    def start(self) -> None:
+        """Starts polling for new versions on the running event loop."""
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                # Loading and warming up block, so they run off the event loop
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"Checking for a new {self.name} model failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def aclose(self) -> None:
+        """Stops polling."""
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+
+def model_source(name: str) -> Any:
+    """Returns the source of a model as configured by ``MODEL_SOURCE``: "local" or "mlflow"."""
+    if settings.MODEL_SOURCE == "mlflow":
+        return MlflowModelSource(name, settings.MLFLOW_MODEL_STAGE, settings.MLFLOW_TRACKING_URI)
+    paths = {
+        "recommender": settings.RECOMMENDER_MODEL_PATH,
+        "forecaster": settings.FORECASTER_MODEL_PATH,
+    }
+    return LocalModelSource(paths[name])
+
+
+_model_managers: Dict[str, ModelManager] = {}
+_model_managers_lock = threading.Lock()
+
+
+def get_model_manager(name: str, warmup: Optional[Callable[[Any], None]] = None) -> ModelManager:
+    """
+    Returns the process-wide manager of a model, creating it on first use.
+
+    :param warmup: The warmup of the model; only used when the manager is created.
+    """
+    manager = _model_managers.get(name)
+    if manager is None:
+        with _model_managers_lock:
+            manager = _model_managers.get(name)
+            if manager is None:
+                manager = ModelManager(name, model_source(name), warmup, settings.MODEL_POLL_INTERVAL)
+                _model_managers[name] = manager
+    return manager
+
+
+def model_managers() -> List[ModelManager]:
+    """Returns the managers created so far."""
+    return list(_model_managers.values())
+
+
+async def close_model_managers() -> None:
+    """Stops the polling of every model manager."""
+    for manager in model_managers():
+        await manager.aclose()